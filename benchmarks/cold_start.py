@@ -0,0 +1,212 @@
+"""
+Cold-start benchmark of the console scripts.
+
+Each console script of pyproject.toml is spawned like an MCP client launches it, and timed from spawn
+to a successful initialize response and to a successful tools/list response. The peak resident memory
+of the server is recorded, and an extra run with -X importtime breaks down where import time goes.
+Building each server in this process is also timed, from its tool manifest and by introspecting its
+modules, to report the speedup of the manifest.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5] [--output results.json] [script ...]
+    python benchmarks/cold_start.py --compare before.json after.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any
+
+from stdio_client import StdioClient, console_scripts, entry_point_argv
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Return the min, median and max of the measurements, rounded for readability."""
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def measure_start(entry_point: str) -> dict[str, Any]:
+    """Spawn the server once, and time its initialize and tools/list responses."""
+    with StdioClient(entry_point_argv(entry_point)) as client:
+        client.initialize()
+        initialized = time.perf_counter()
+        tools = client.request("tools/list")["tools"]
+        listed = time.perf_counter()
+
+        return {
+            "initialize_ms": (initialized - client.started) * 1000,
+            "tools_list_ms": (listed - client.started) * 1000,
+            "peak_rss_mb": (client.peak_rss() or 0) / 1024 / 1024,
+            "tools": len(tools),
+        }
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Return the (module, self_us, cumulative_us) entries of -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        # Module names are indented by two spaces per level of nesting, after a separating space
+        imports.append((module.rstrip()[1:], int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_imports(entry_point: str, top: int) -> dict[str, Any]:
+    """Spawn the server with -X importtime, and break down the import time until tools/list."""
+    with StdioClient(entry_point_argv(entry_point, ["-X", "importtime"])) as client:
+        client.initialize()
+        client.request("tools/list")
+    imports = parse_importtime(client.stderr)
+
+    # Top-level imports are not indented, their cumulative times add up to the whole import time
+    total_us = sum(cumulative for module, _, cumulative in imports if not module.startswith(" "))
+
+    by_package: defaultdict[str, int] = defaultdict(int)
+    for module, self_us, _ in imports:
+        by_package[module.strip().split(".")[0]] += self_us
+
+    slowest = sorted(imports, key=lambda entry: entry[1], reverse=True)[:top]
+    return {
+        "import_time_ms": round(total_us / 1000, 3),
+        "modules_imported": len(imports),
+        "imports_by_package_ms": {
+            package: round(us / 1000, 3)
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest_imports": [
+            {"module": module.strip(), "self_ms": round(self_us / 1000, 3), "cumulative_ms": round(cum / 1000, 3)}
+            for module, self_us, cum in slowest
+        ],
+    }
+
+
+def measure_build(entry_point: str, runs: int) -> dict[str, Any]:
+    """Time building the server in this process, from its tool manifest and by introspecting its modules."""
+    create_server = importlib.import_module(entry_point.split(":")[0]).create_server
+    previous = os.environ.get("MCP_SERVER_MANIFEST")
+    timings = {}
+    try:
+        for metric, use_manifest in (("manifest_build_ms", "1"), ("introspection_build_ms", "0")):
+            os.environ["MCP_SERVER_MANIFEST"] = use_manifest
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                create_server()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[metric] = summarize(samples)
+    finally:
+        if previous is None:
+            os.environ.pop("MCP_SERVER_MANIFEST", None)
+        else:
+            os.environ["MCP_SERVER_MANIFEST"] = previous
+
+    manifest_ms = timings["manifest_build_ms"]["median"]
+    speedup = timings["introspection_build_ms"]["median"] / manifest_ms if manifest_ms else 0.0
+    return {**timings, "manifest_speedup": round(speedup, 1)}
+
+
+def benchmark(scripts: dict[str, str], runs: int, top: int) -> dict[str, Any]:
+    results = {}
+    for name, entry_point in scripts.items():
+        print(f"Benchmarking {name} ({runs} runs)...", file=sys.stderr)
+        samples = [measure_start(entry_point) for _ in range(runs)]
+
+        results[name] = {
+            "entry_point": entry_point,
+            "tools": samples[0]["tools"],
+            **{
+                metric: summarize([sample[metric] for sample in samples])
+                for metric in ("initialize_ms", "tools_list_ms", "peak_rss_mb")
+            },
+            **measure_imports(entry_point, top),
+            **measure_build(entry_point, runs),
+        }
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Print the change of the median metrics of each script between two result files."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    print(f"{'script':<24}{'metric':<18}{'before':>12}{'after':>12}{'change':>10}")
+    for name in sorted(before["scripts"].keys() & after["scripts"].keys()):
+        old, new = before["scripts"][name], after["scripts"][name]
+        for metric in ("initialize_ms", "tools_list_ms", "peak_rss_mb", "import_time_ms", "manifest_build_ms"):
+            if metric not in old or metric not in new:
+                continue
+            old_value, new_value = _median(old[metric]), _median(new[metric])
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            print(f"{name:<24}{metric:<18}{old_value:>12.1f}{new_value:>12.1f}{change:>+9.1f}%")
+
+
+def _median(value: float | dict[str, float]) -> float:
+    return value["median"] if isinstance(value, dict) else value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the console scripts.")
+    parser.add_argument("scripts", nargs="*", help="Console scripts to benchmark, all of them by default")
+    parser.add_argument("--runs", type=int, default=5, help="Number of timed starts of each script")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports and packages reported")
+    parser.add_argument("--output", help="File to write the JSON results to, stdout by default")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scripts = console_scripts(PROJECT_DIR)
+    unknown = set(args.scripts) - scripts.keys()
+    if unknown:
+        parser.error(f"unknown scripts: {', '.join(sorted(unknown))}")
+    if args.scripts:
+        scripts = {name: scripts[name] for name in args.scripts}
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "scripts": benchmark(scripts, args.runs, args.top),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end load generator for the stdio servers.
+
+A server from minimcp_servers/servers is spawned, and tools/call requests are sent over stdio keeping a fixed
+number of them in flight. Latency is measured from sending a request to reading its response, so it covers the
+whole mcp.handle round-trip, JSON encoding and transport included.
+
+Requests come from a JSONL trace, one tools/call params object ({"name": ..., "arguments": ...}) or whole
+JSON-RPC request per line, or are synthesized from the input schemas of the tools: the first array or string
+argument of a tool holds --size items, other arguments get small random values.
+
+Synthetic payloads are replayed, so the result cache and the single-flight of the server are turned off unless
+--cache is given, so that calls are computed rather than served from the cache. The memo store stays off unless
+MCP_SERVER_MEMO_PATH is set.
+
+Usage:
+    python benchmarks/load.py statistics_math_utils --tool mean --size 10,1000,100000,1000000
+    python benchmarks/load.py text_utils --concurrency 1,8,32 --requests 2000
+    python benchmarks/load.py math_utils --trace calls.jsonl --output results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from stdio_client import StdioClient, entry_point_argv
+
+
+def random_value(schema: dict[str, Any], size: int) -> Any:
+    """Return a random value matching a JSON schema, with size items for arrays and strings."""
+    kind = schema.get("type")
+    if kind is None and "anyOf" in schema:
+        return random_value(schema["anyOf"][0], size)
+
+    if kind == "array":
+        return [random_value(schema.get("items", {"type": "number"}), 8) for _ in range(size)]
+    if kind == "string":
+        return "".join(random.choices(string.ascii_lowercase + " ", k=size))
+    if kind == "integer":
+        return random.randint(1, 20)
+    if kind == "boolean":
+        return random.random() < 0.5
+    return round(random.uniform(1, 100), 3)
+
+
+def synthetic_arguments(tool: dict[str, Any], size: int) -> dict[str, Any]:
+    """Return random arguments for a tool, its first array or string argument holding size items."""
+    schema = tool["inputSchema"]
+    arguments = {}
+    sized = False
+    for name, prop in schema.get("properties", {}).items():
+        if name not in schema.get("required", []):
+            continue
+        scalable = prop.get("type") in ("array", "string")
+        arguments[name] = random_value(prop, size if scalable and not sized else 3)
+        sized = sized or scalable
+    return arguments
+
+
+def load_trace(path: str) -> list[str]:
+    """Return the JSON encoded tools/call params of a JSONL trace."""
+    calls = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            calls.append(json.dumps(message["params"] if "method" in message else message))
+    return calls
+
+
+def synthetic_calls(tools: list[dict[str, Any]], size: int) -> list[str]:
+    """Return the JSON encoded params of a mix of calls spread over the given tools."""
+    # Large payloads are not varied, to bound the memory of the load generator
+    count = max(len(tools), 64 if size < 100_000 else 1)
+    calls = [{"name": tool["name"], "arguments": synthetic_arguments(tool, size)} for tool in tools * count][:count]
+    return [json.dumps(call) for call in calls]
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    if len(latencies) < 2:
+        latencies = latencies * 2
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "mean": round(statistics.fmean(latencies), 3),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(max(latencies), 3),
+    }
+
+
+def run_load(client: StdioClient, calls: Iterator[str], requests: int, concurrency: int) -> dict[str, Any]:
+    """Send tools/call requests with the given params, keeping concurrency of them in flight, and time them."""
+    sent_at: dict[int, float] = {}
+    latencies: list[float] = []
+    errors = 0
+    sent = 0
+
+    started = time.perf_counter()
+    while sent < requests or sent_at:
+        if sent < requests and len(sent_at) < concurrency:
+            request_id = client.next_id()
+            line = f'{{"jsonrpc": "2.0", "id": {request_id}, "method": "tools/call", "params": {next(calls)}}}'
+            sent_at[request_id] = time.perf_counter()
+            client.send_line(line)
+            sent += 1
+            continue
+
+        received_at, response = client.receive()
+        if not isinstance(response, dict) or response.get("id") not in sent_at:
+            continue
+        latencies.append((received_at - sent_at.pop(response["id"])) * 1000)
+        if "error" in response or response.get("result", {}).get("isError"):
+            errors += 1
+    duration = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "rps": round(requests / duration, 1),
+        "latency_ms": percentiles(latencies),
+    }
+
+
+def cycle(calls: list[str]) -> Iterator[str]:
+    while True:
+        yield from calls
+
+
+def parse_ladder(value: str) -> list[int]:
+    return [int(float(item)) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of a stdio server.")
+    parser.add_argument("server", help="Server module in minimcp_servers.servers, e.g. statistics_math_utils")
+    parser.add_argument("--trace", help="JSONL file of tools/call requests to replay, instead of a synthetic mix")
+    parser.add_argument("--tool", action="append", help="Tools of the synthetic mix, all of them by default")
+    parser.add_argument("--size", type=parse_ladder, default=[10], help="Payload sizes to sweep, e.g. 10,1e3,1e6")
+    parser.add_argument("--concurrency", type=parse_ladder, default=[1], help="In-flight requests to sweep")
+    parser.add_argument("--requests", type=int, default=500, help="Requests measured per run")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before each run, not measured")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic payloads")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache and single-flight of the server")
+    parser.add_argument("--output", help="File to write the JSON results to, stdout by default")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = []
+    env = None
+    if not args.cache:
+        env = {**os.environ, "MCP_SERVER_CACHE_SIZE": "0", "MCP_SERVER_SINGLE_FLIGHT": "0"}
+    with StdioClient(entry_point_argv(f"minimcp_servers.servers.{args.server}:main"), env) as client:
+        client.initialize()
+        tools = client.request("tools/list")["tools"]
+        if args.tool:
+            unknown = set(args.tool) - {tool["name"] for tool in tools}
+            if unknown:
+                parser.error(f"unknown tools: {', '.join(sorted(unknown))}")
+            tools = [tool for tool in tools if tool["name"] in args.tool]
+
+        sizes: list[int | None] = [None] if args.trace else args.size
+        for size in sizes:
+            calls = load_trace(args.trace) if args.trace or size is None else synthetic_calls(tools, size)
+            for concurrency in args.concurrency:
+                run_load(client, cycle(calls), args.warmup, concurrency)
+                measured = run_load(client, cycle(calls), args.requests, concurrency)
+                result = {"size": size, "concurrency": concurrency, **measured}
+                results.append(result)
+
+                latency = result["latency_ms"]
+                print(
+                    f"size={size} concurrency={concurrency}: {result['rps']} req/s, "
+                    f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms, {result['errors']} errors",
+                    file=sys.stderr,
+                )
+
+    output = json.dumps({"server": args.server, "trace": args.trace, "cache": args.cache, "runs": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
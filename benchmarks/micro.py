@@ -0,0 +1,272 @@
+"""
+Microbenchmarks of every public function of minimcp_servers.modules, with regression gates.
+
+Each function is timed directly, without the MCP layer, across a ladder of input sizes: the size is the length
+of its list or string argument, the number of digits or the magnitude of its integer argument, or the length
+of its output. Functions with only scalar arguments are timed once. Arguments are derived from the function
+signatures, with explicit cases for functions that need particular inputs.
+
+Timings are stored relative to a fixed pure-Python reference workload timed in the same run, so a baseline
+recorded on one machine stays meaningful on a similar one. No baseline is committed, save one first, then check
+against it: the check fails, with exit code 1, when a function slows down past the tolerance.
+
+Usage:
+    python benchmarks/micro.py --save-baseline
+    python benchmarks/micro.py --check [--tolerance 0.25]
+    python benchmarks/micro.py --filter stats. --sizes 10,1e4 --output results.json
+"""
+
+import argparse
+import base64
+import importlib
+import inspect
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from cold_start import git_commit
+
+MODULES = [
+    "minimcp_servers.modules.math.arithmetic",
+    "minimcp_servers.modules.math.continuous",
+    "minimcp_servers.modules.math.discrete",
+    "minimcp_servers.modules.math.stats",
+    "minimcp_servers.modules.text",
+    "minimcp_servers.modules.datetime",
+    "minimcp_servers.modules.random_generator",
+]
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+# Slowdowns smaller than this, in reference-normalized nanoseconds, are considered noise
+NOISE_FLOOR_NS = 200
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore".split()
+
+
+def floats(size: int, low: float = 0.1, high: float = 1.0) -> list[float]:
+    rng = random.Random(size)
+    return [rng.uniform(low, high) for _ in range(size)]
+
+
+def text(size: int) -> str:
+    rng = random.Random(size)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def digits(size: int) -> int:
+    """Return an integer of size decimal digits, without converting from a string."""
+    return 7 * (10**size - 1) // 9
+
+
+@dataclass
+class Case:
+    """The arguments of a function by input size, and whether they scale with it."""
+
+    arguments: Callable[[int], dict[str, Any]]
+    sized: bool = True
+
+
+def fixed(**kwargs: Any) -> Case:
+    return Case(lambda size: kwargs, sized=False)
+
+
+# Cases of the functions whose arguments cannot be derived from their signature
+CASES: dict[str, Case] = {
+    "continuous.acosh": fixed(x=1.5),
+    "continuous.dist": Case(lambda size: {"p": floats(size), "q": floats(size + 1)[1:]}),
+    "discrete.combination": Case(lambda size: {"n": size, "k": size // 2}),
+    "discrete.factorial": Case(lambda size: {"x": size}),
+    "discrete.gcd": Case(lambda size: {"a": digits(size), "b": digits(size) // 7 * 3}),
+    "discrete.isqrt": Case(lambda size: {"x": digits(size)}),
+    "discrete.lcm": Case(lambda size: {"a": digits(size), "b": digits(size) // 7 * 3}),
+    "discrete.permutation": Case(lambda size: {"n": size, "k": size // 2}),
+    "stats.correlation": Case(lambda size: {"x": floats(size), "y": floats(size + 1)[1:]}),
+    "stats.covariance": Case(lambda size: {"x": floats(size), "y": floats(size + 1)[1:]}),
+    "stats.linear_regression": Case(lambda size: {"x": floats(size), "y": floats(size + 1)[1:]}),
+    "text.base64_decode": Case(lambda size: {"data": base64.b64encode(text(size).encode()).decode()}),
+    "text.base64_urlsafe_decode": Case(lambda size: {"data": base64.urlsafe_b64encode(text(size).encode()).decode()}),
+    "text.hex_decode": Case(lambda size: {"data": text(size).encode().hex()}),
+    "text.most_common_words": Case(lambda size: {"text": text(size), "k": 10}),
+    "text.replace_substr": Case(lambda size: {"text": text(size), "old": "or", "new": "OR"}),
+    "datetime.days_in_month": fixed(year=2024, month=2),
+    "datetime.epoch_to_iso_utc": fixed(epoch_seconds=1_700_000_000),
+    "datetime.format_duration": fixed(seconds=3_723_456),
+    "datetime.is_valid_iso_format": fixed(iso_str="2024-02-29T12:30:00+00:00"),
+    "datetime.isleap": fixed(year=2024),
+    "datetime.iso_utc_to_epoch": fixed(iso_utc="2024-02-29T12:30:00+00:00"),
+    "random_generator.generate_random_text": Case(lambda size: {"length": size}),
+}
+
+
+def public_functions() -> dict[str, Callable]:
+    """Return the public functions of the modules by "namespace.name", as registered as tools."""
+    functions = {}
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        namespace = module_name.rsplit(".", 1)[-1]
+        for name in dir(module):
+            attr = getattr(module, name)
+            if not name.startswith("_") and (inspect.isfunction(attr) or inspect.isbuiltin(attr)):
+                functions[f"{namespace}.{name}"] = attr
+    return functions
+
+
+def derived_case(func: Callable) -> Case:
+    """
+    Return the case of a function derived from its signature. The first list or string argument has size
+    items, the other arguments get small values.
+    """
+    parameters = inspect.signature(func).parameters.values()
+    annotations = [(param.name, param.annotation) for param in parameters if param.default is param.empty]
+
+    sized_param = next((name for name, annotation in annotations if annotation in (list[float], str)), None)
+
+    def arguments(size: int) -> dict[str, Any]:
+        values = {}
+        for name, annotation in annotations:
+            if annotation == list[float]:
+                values[name] = floats(size if name == sized_param else 10)
+            elif annotation is str:
+                values[name] = text(size) if name == sized_param else "or"
+            elif annotation is float:
+                values[name] = 0.5
+            elif annotation is int:
+                values[name] = 3
+            else:
+                raise TypeError(f"No benchmark arguments for {func.__name__}({name}: {annotation})")
+        return values
+
+    return Case(arguments, sized=sized_param is not None)
+
+
+def time_call(func: Callable, kwargs: dict[str, Any], min_time: float, repeat: int) -> float:
+    """Return the best time of a call in nanoseconds, over repeat batches lasting at least min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(**kwargs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(**kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e9
+
+
+def reference_workload() -> int:
+    """A fixed pure-Python workload, timed to normalize the timings of the machine it runs on."""
+    total = 0
+    for i in range(10_000):
+        total += i * i % 7
+    return total
+
+
+def run(sizes: list[int], name_filter: str | None, min_time: float, repeat: int) -> dict[str, Any]:
+    reference_ns = time_call(reference_workload, {}, min_time, repeat)
+
+    results: dict[str, dict[str, float]] = {}
+    for name, func in public_functions().items():
+        if name_filter and name_filter not in name:
+            continue
+
+        case = CASES.get(name) or derived_case(func)
+
+        results[name] = {}
+        for size in sizes if case.sized else [1]:
+            timing = time_call(func, case.arguments(size), min_time, repeat)
+            results[name][str(size)] = round(timing, 1)
+            print(f"{name:<40}{size:>10}{timing:>16.1f} ns", file=sys.stderr)
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reference_ns": round(reference_ns, 1),
+        "results": results,
+    }
+
+
+def check(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return the regressions of results against the baseline, in reference-normalized time."""
+    scale = baseline["reference_ns"] / results["reference_ns"]
+    regressions = []
+    for name, timings in results["results"].items():
+        for size, timing in timings.items():
+            expected = baseline["results"].get(name, {}).get(size)
+            if expected is None:
+                continue
+            normalized = timing * scale
+            if normalized > expected * (1 + tolerance) and normalized - expected > NOISE_FLOOR_NS:
+                change = (normalized / expected - 1) * 100
+                regressions.append(f"{name} (size {size}): {expected:.1f} ns -> {normalized:.1f} ns, {change:+.0f}%")
+    return regressions
+
+
+def parse_ladder(value: str) -> list[int]:
+    return [int(float(item)) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark the public functions of the modules.")
+    parser.add_argument("--sizes", type=parse_ladder, default=DEFAULT_SIZES, help="Input sizes, e.g. 10,1e3,1e5")
+    parser.add_argument("--filter", help="Only benchmark functions whose namespace.name contains this")
+    parser.add_argument("--min-time", type=float, default=0.02, help="Minimum duration in seconds of a batch")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of batches, the best one is kept")
+    parser.add_argument("--output", help="File to write the JSON results to")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Fail if a function regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Accepted slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    # Fail before running the benchmarks, which take minutes
+    if args.check and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline} to check against, record one first with --save-baseline")
+
+    results = run(args.sizes, args.filter, args.min_time, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        with open(args.baseline) as f:
+            regressions = check(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regression past {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Minimal MCP client over stdio, driving a server process the way an MCP client launches it."""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+
+PROTOCOL_VERSION = "2025-06-18"
+
+# Pushed on the stdout queue when the server closes its stdout
+_EOF = object()
+
+
+def entry_point_argv(entry_point: str, python_options: list[str] | None = None) -> list[str]:
+    """Return the command running an entry point ("module:function") like its console script."""
+    module, _, function = entry_point.partition(":")
+    code = f"import sys; from {module} import {function}; sys.exit({function}())"
+    return [sys.executable, *(python_options or []), "-c", code]
+
+
+def console_scripts(project_dir: str) -> dict[str, str]:
+    """
+    Return the console scripts of the project, by name, as "module:function" entry points.
+    They are read from pyproject.toml, or from the installed distribution before Python 3.11.
+    """
+    try:
+        import tomllib  # pyright: ignore[reportMissingImports]
+    except ModuleNotFoundError:
+        from importlib.metadata import distribution
+
+        scripts = distribution("minimcp-servers").entry_points
+        return {script.name: script.value for script in scripts if script.group == "console_scripts"}
+
+    with open(os.path.join(project_dir, "pyproject.toml"), "rb") as f:
+        return dict(tomllib.load(f)["project"]["scripts"])
+
+
+class StdioClient:
+    """
+    Spawns a server and exchanges newline delimited JSON-RPC messages with it.
+
+    Responses are read by a background thread, stamped with their arrival time, and handed over
+    through a queue. stderr is drained continuously, so that a verbose server never blocks on it.
+    """
+
+    process: subprocess.Popen
+    started: float
+
+    def __init__(self, argv: list[str], env: dict[str, str] | None = None) -> None:
+        """
+        Args:
+            argv: Command starting the server
+            env: Environment of the server, defaults to the current environment
+        """
+        self._next_id = 0
+        self._messages: queue.Queue[Any] = queue.Queue()
+        self._stderr: list[str] = []
+
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            text=True,
+            encoding="utf-8",
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self) -> None:
+        assert self.process.stdout is not None
+        for line in self.process.stdout:
+            if line.strip():
+                self._messages.put((time.perf_counter(), json.loads(line)))
+        self._messages.put(_EOF)
+
+    def _read_stderr(self) -> None:
+        assert self.process.stderr is not None
+        self._stderr.extend(self.process.stderr)
+
+    @property
+    def stderr(self) -> str:
+        """Everything the server wrote to stderr so far."""
+        return "".join(self._stderr)
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def send(self, message: dict[str, Any] | list[Any]) -> None:
+        """Send a JSON-RPC message to the server."""
+        self.send_line(json.dumps(message))
+
+    def send_line(self, line: str) -> None:
+        """Send an already encoded JSON-RPC message to the server."""
+        assert self.process.stdin is not None
+        self.process.stdin.write(line + "\n")
+        self.process.stdin.flush()
+
+    def receive(self, timeout: float = 60.0) -> tuple[float, Any]:
+        """Return the next message from the server, with the perf_counter time it arrived at."""
+        try:
+            item = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No message from the server within {timeout}s") from None
+
+        if item is _EOF:
+            self.process.wait()
+            raise RuntimeError(f"Server exited with code {self.process.returncode}:\n{self.stderr[-2000:]}")
+        return item
+
+    def request(self, method: str, params: dict[str, Any] | None = None, timeout: float = 60.0) -> dict[str, Any]:
+        """Send a request and wait for its response, skipping any other message."""
+        request_id = self.next_id()
+        message: dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        self.send(message)
+
+        while True:
+            _, response = self.receive(timeout)
+            if isinstance(response, dict) and response.get("id") == request_id:
+                if "error" in response:
+                    raise RuntimeError(f"{method} failed: {response['error']}")
+                return response["result"]
+
+    def initialize(self) -> dict[str, Any]:
+        """Run the MCP initialization handshake, and return the initialize result."""
+        client_info = {"name": "minimcp-servers-benchmarks", "version": "1.0.0"}
+        params = {"protocolVersion": PROTOCOL_VERSION, "capabilities": {}, "clientInfo": client_info}
+        result = self.request("initialize", params)
+        self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return result
+
+    def peak_rss(self) -> int | None:
+        """Return the peak resident memory of the server in bytes, None if it cannot be read."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Close stdin so that the server shuts down, killing it if it does not in time."""
+        if self.process.stdin is not None and not self.process.stdin.closed:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self) -> "StdioClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,385 @@
+import functools
+import inspect
+import json
+import logging
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import anyio
+
+logger = logging.getLogger(__name__)
+
+# Lanes of the tools, by cost:
+# - fast: O(1) tools, whose calls take microseconds.
+# - default: Tools whose cost grows with their input.
+# - heavy: Tools known to be expensive, such as those running in worker processes.
+FAST_LANE = "fast"
+DEFAULT_LANE = "default"
+HEAVY_LANE = "heavy"
+LANES = (FAST_LANE, DEFAULT_LANE, HEAVY_LANE)
+
+# Calls of the fast lane running longer than this are slow, and tools with this many slow calls leave the lane.
+# A strike is forgiven after this many calls in budget, and tools with no strike left are moved back.
+FAST_LANE_BUDGET_NS = 10_000_000
+FAST_LANE_STRIKES = 3
+FAST_LANE_RECOVERY_CALLS = 100
+
+# Implementation defined JSON-RPC server error, returned when a tool call is rejected as the server is busy.
+# Clients may retry the call later.
+SERVER_BUSY = -32003
+
+# JSON-RPC error returned for messages over the maximum frame size
+INVALID_REQUEST = -32600
+
+# Characters of an oversized message searched for its id
+_ID_SEARCH_CHARS = 1024
+_ID_PATTERN = re.compile(r'"id"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+
+
+class ServerBusyError(Exception):
+    """Raised when a tool call cannot run nor wait, as the server is busy."""
+
+    tool_name: str
+
+    def __init__(self, tool_name: str) -> None:
+        super().__init__(f"Server is busy, tool '{tool_name}' cannot be called now. Retry later.")
+        self.tool_name = tool_name
+
+
+def message_id(message: str) -> str | int | None:
+    """
+    Return the id of a message without decoding it, from its first characters, None if not found there.
+    The search stops at its params, whose arguments may hold an id of their own.
+    """
+    head = message[:_ID_SEARCH_CHARS].split('"params"', 1)[0]
+    match = _ID_PATTERN.search(head)
+    if match is None:
+        return None
+    return json.loads(match.group(1))
+
+
+class _Slots:
+    """
+    Counted slots, like a semaphore, except that taking a free slot does not yield to the event loop, which
+    would cost more than a small tool call. Released slots are handed over to the longest waiting call.
+    """
+
+    __slots__ = ("limit", "used", "waiters")
+
+    limit: int
+    used: int
+    waiters: deque[anyio.Event]
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self.waiters = deque()
+
+    async def acquire(self) -> None:
+        if self.used < self.limit:
+            self.used += 1
+            return
+
+        event = anyio.Event()
+        self.waiters.append(event)
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                # Slot was handed over just as the call was cancelled, pass it on
+                self.release()
+            else:
+                self.waiters.remove(event)
+            raise
+
+    def release(self) -> None:
+        if self.waiters:
+            self.waiters.popleft().set()
+        else:
+            self.used -= 1
+
+
+class _Lane:
+    """Slots of a lane, with the calls waiting for them."""
+
+    __slots__ = ("name", "slots", "pending")
+
+    name: str
+    slots: _Slots | None
+    pending: int
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.slots = _Slots(limit) if limit > 0 else None
+        self.pending = 0
+
+
+class AdmissionControl:
+    """
+    Bounds the work a server accepts, so that its memory stays predictable under bursts of calls.
+    - Messages over max_frame_bytes are rejected before being decoded.
+    - Tools are scheduled in lanes by cost, each with its own limit of calls running at the same time, so that
+      cheap calls never wait behind expensive ones: FAST_LANE for O(1) tools, DEFAULT_LANE, and HEAVY_LANE
+      for tools known to be expensive. Tools are in the default lane unless assigned another one.
+    - Each tool runs at most tool_concurrency calls at the same time, so that the calls of one tool cannot
+      take every slot of its lane.
+    - Calls that cannot run wait for a slot, up to max_pending of them in each lane. Past that, calls are
+      rejected at once with ServerBusyError, a retryable error, instead of queueing without bound.
+    - Tools of the fast lane whose calls run slow FAST_LANE_STRIKES times are moved to the default lane, and
+      moved back once their strikes are forgiven by calls in budget. Calls are timed by the wrappers of timed,
+      so that only the run time of the tools counts, not the time they wait for a slot or for the event loop.
+    - Calls of scheduling tools, such as the batch tool, only make calls of other tools, admitted on their
+      own. They take no slot of their lane, so that the calls they wait for never wait for their slot.
+
+    Calls are admitted on the event loop only, the counters are not thread-safe.
+    """
+
+    max_frame_bytes: int
+    max_pending: int
+    running: int
+    rejected: int
+    tool_lanes: dict[str, str]
+    schedulers: set[str]
+
+    _lanes: dict[str, _Lane]
+    _tool_concurrency: int
+    _tool_limits: dict[str, int]
+    _tool_slots: dict[str, _Slots]
+    _observed: set[str]
+    _strikes: dict[str, int]
+    _recovery: dict[str, int]
+
+    def __init__(
+        self,
+        max_frame_bytes: int = 0,
+        max_calls: int = 0,
+        max_pending: int = 0,
+        tool_concurrency: int = 0,
+        tool_limits: Mapping[str, int] | None = None,
+        lane_limits: Mapping[str, int] | None = None,
+        tool_lanes: Mapping[str, str] | None = None,
+    ) -> None:
+        """
+        Args:
+            max_frame_bytes: Maximum size of a message in bytes, 0 for no limit
+            max_calls: Maximum number of tool calls of the default lane running at the same time, 0 for no limit
+            max_pending: Maximum number of tool calls of a lane waiting for a slot
+            tool_concurrency: Maximum number of calls of a tool running at the same time, 0 for no limit
+            tool_limits: Maximum number of calls running at the same time by tool name, overriding
+                tool_concurrency
+            lane_limits: Maximum number of calls running at the same time by lane, 0 for no limit. Lanes
+                not set have no limit, except for the default lane limited by max_calls.
+            tool_lanes: Lane by tool name, for tools not in the default lane
+        """
+        limits = dict.fromkeys(LANES, 0) | {DEFAULT_LANE: max_calls} | dict(lane_limits or {})
+        unknown_lanes = set(limits) - set(LANES)
+        if unknown_lanes:
+            raise ValueError(f"Unknown lanes {sorted(unknown_lanes)}, must be one of {LANES}")
+
+        self.max_frame_bytes = max_frame_bytes
+        self.max_pending = max_pending
+        self.running = 0
+        self.rejected = 0
+        self.tool_lanes = {}
+        self.schedulers = set()
+        self._lanes = {lane: _Lane(lane, limit) for lane, limit in limits.items()}
+        self._tool_concurrency = tool_concurrency
+        self._tool_limits = dict(tool_limits or {})
+        self._tool_slots = {}
+        self._observed = set()
+        self._strikes = {}
+        self._recovery = {}
+        for tool_name, lane in (tool_lanes or {}).items():
+            self.assign(tool_name, lane)
+
+    @property
+    def pending(self) -> int:
+        """Number of calls waiting for a slot, in every lane."""
+        return sum(lane.pending for lane in self._lanes.values())
+
+    def oversized(self, message: str | bytes) -> bool:
+        """
+        Return whether a message is over the maximum frame size. Strings are measured in characters, a lower
+        bound of their size in bytes, so that they need not be encoded.
+        """
+        return 0 < self.max_frame_bytes < len(message)
+
+    def assign(self, tool_name: str, lane: str, scheduler: bool = False) -> None:
+        """
+        Run the calls of a tool in the given lane. Calls of a scheduling tool, only making calls of other
+        tools, take no slot of the lane and stay in it however slow.
+        """
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown lane '{lane}', must be one of {LANES}")
+        if scheduler:
+            self.schedulers.add(tool_name)
+        else:
+            self.schedulers.discard(tool_name)
+        if lane == FAST_LANE and not scheduler:
+            self._observed.add(tool_name)
+        else:
+            self._observed.discard(tool_name)
+        self._strikes.pop(tool_name, None)
+        self._recovery.pop(tool_name, None)
+        if lane == DEFAULT_LANE:
+            self.tool_lanes.pop(tool_name, None)
+        else:
+            self.tool_lanes[tool_name] = lane
+
+    def lane(self, tool_name: str | None) -> str:
+        """Return the lane of a tool."""
+        return self.tool_lanes.get(tool_name, DEFAULT_LANE) if tool_name is not None else DEFAULT_LANE
+
+    def admit(self, tool_name: str | None, wait: bool = False) -> "_Admission":
+        """
+        Return an async context manager running a call of the given tool in its context, once a slot is free.
+        Calls of unknown tools, named None, only take a slot of the default lane. Entering it raises
+        ServerBusyError when no slot is free and max_pending calls of the lane are already waiting, unless
+        wait is set: the call then waits for a slot however many calls are waiting. It is meant for calls
+        bounded by their caller, such as the entries of a JSON-RPC batch.
+        """
+        lane = self._lanes[self.lane(tool_name)]
+        slots = []
+        if tool_name is not None:
+            limit = self._tool_limits.get(tool_name, self._tool_concurrency)
+            if limit > 0:
+                if tool_name not in self._tool_slots:
+                    self._tool_slots[tool_name] = _Slots(limit)
+                slots.append(self._tool_slots[tool_name])
+        if lane.slots is not None and tool_name not in self.schedulers:
+            slots.append(lane.slots)
+        return _Admission(self, tool_name, lane, slots, wait)
+
+    def timed(self, tool_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of func whose run time is observed while the tool is assigned to the fast lane, or
+        moved out of it as slow. The wrapper keeps the signature and docstring of func, so tool schemas are
+        unaffected. Tools are called with keyword arguments only.
+        """
+        observed = self._observed
+        observe = self._observe_fast_call
+        clock = time.perf_counter_ns
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def timed_async(**kwargs: Any) -> Any:
+                if tool_name not in observed:
+                    return await func(**kwargs)
+                start = clock()
+                try:
+                    return await func(**kwargs)
+                finally:
+                    observe(tool_name, clock() - start)
+
+            return timed_async
+
+        @functools.wraps(func)
+        def timed(**kwargs: Any) -> Any:
+            if tool_name not in observed:
+                return func(**kwargs)
+            start = clock()
+            try:
+                return func(**kwargs)
+            finally:
+                observe(tool_name, clock() - start)
+
+        return timed
+
+    def _observe_fast_call(self, tool_name: str, elapsed_ns: int) -> None:
+        strikes = self._strikes.get(tool_name, 0)
+        if elapsed_ns < FAST_LANE_BUDGET_NS:
+            if not strikes:
+                return
+            calls = self._recovery[tool_name] = self._recovery.get(tool_name, 0) + 1
+            if calls < FAST_LANE_RECOVERY_CALLS:
+                return
+            self._recovery[tool_name] = 0
+            strikes = self._strikes[tool_name] = strikes - 1
+            if not strikes and self.lane(tool_name) == DEFAULT_LANE:
+                logger.info("Moving tool '%s' back to the fast lane, its calls are fast again", tool_name)
+                self.tool_lanes[tool_name] = FAST_LANE
+            return
+
+        self._recovery[tool_name] = 0
+        strikes = self._strikes[tool_name] = min(strikes + 1, FAST_LANE_STRIKES)
+        if strikes >= FAST_LANE_STRIKES and self.lane(tool_name) == FAST_LANE:
+            logger.info("Moving tool '%s' to the default lane, %d of its calls were slow", tool_name, strikes)
+            # Not assigned, so that the tool stays observed
+            del self.tool_lanes[tool_name]
+
+    def stats(self) -> dict[str, Any]:
+        """Return the counters of admission control, and the calls running and waiting in each lane."""
+        lanes = {
+            lane.name: {
+                "running": lane.slots.used if lane.slots is not None else None,
+                "pending": lane.pending,
+                "limit": lane.slots.limit if lane.slots is not None else None,
+            }
+            for lane in self._lanes.values()
+        }
+        return {"running": self.running, "pending": self.pending, "rejected": self.rejected, "lanes": lanes}
+
+
+class _Admission:
+    """Context of an admitted call. A class rather than a generator, as it is entered on every call."""
+
+    __slots__ = ("control", "tool_name", "lane", "slots", "wait", "acquired")
+
+    control: AdmissionControl
+    tool_name: str | None
+    lane: _Lane
+    slots: list[_Slots]
+    wait: bool
+    acquired: list[_Slots]
+
+    def __init__(
+        self, control: AdmissionControl, tool_name: str | None, lane: _Lane, slots: list[_Slots], wait: bool
+    ) -> None:
+        self.control = control
+        self.tool_name = tool_name
+        self.lane = lane
+        self.slots = slots
+        self.wait = wait
+        self.acquired = []
+
+    async def __aenter__(self) -> None:
+        control = self.control
+        lane = self.lane
+        if all(slot.used < slot.limit for slot in self.slots):
+            for slot in self.slots:
+                slot.used += 1
+            self.acquired = self.slots
+        else:
+            if lane.pending >= control.max_pending and not self.wait:
+                control.rejected += 1
+                logger.debug(
+                    "Rejected call of tool '%s', %d calls of its lane are already waiting", self.tool_name, lane.pending
+                )
+                raise ServerBusyError(self.tool_name or "")
+
+            lane.pending += 1
+            try:
+                # Slot of the tool first, so that calls waiting for it do not hold a slot of the lane
+                for slot in self.slots:
+                    await slot.acquire()
+                    self.acquired.append(slot)
+            except BaseException:
+                self._release()
+                raise
+            finally:
+                lane.pending -= 1
+
+        control.running += 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.control.running -= 1
+        self._release()
+
+    def _release(self) -> None:
+        for slot in self.acquired:
+            slot.release()
+        self.acquired = []
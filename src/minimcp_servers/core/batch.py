@@ -0,0 +1,121 @@
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import anyio
+from pydantic import BaseModel, Field
+
+from minimcp_servers.core.server import ToolServer
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOOL_NAME = "batch"
+
+# Maximum number of steps of a batch, to bound the tasks and memory of one call
+MAX_BATCH_STEPS = 256
+
+# Key of the JSON object standing for the result of an earlier step in the arguments of a step
+REF_KEY = "$ref"
+
+
+class BatchStep(BaseModel):
+    """A tool call of a batch."""
+
+    tool: str = Field(description="Name of the tool to call")
+    arguments: dict[str, Any] = Field(
+        default_factory=dict,
+        description='Arguments of the tool. {"$ref": i} stands for the result of the earlier step i.',
+    )
+
+
+class DependencyError(Exception):
+    """Raised when a step references a step that failed or is not an earlier one."""
+
+
+def step_references(value: Any) -> set[int]:
+    """Return the indices of the steps referenced in the arguments of a step."""
+    if isinstance(value, dict):
+        if value.keys() == {REF_KEY}:
+            ref = value[REF_KEY]
+            if not isinstance(ref, int) or isinstance(ref, bool):
+                raise DependencyError(f"Invalid reference {ref!r}, the index of an earlier step is expected")
+            return {ref}
+        return {ref for item in value.values() for ref in step_references(item)}
+    if isinstance(value, list):
+        return {ref for item in value for ref in step_references(item)}
+    return set()
+
+
+def resolve_references(value: Any, results: list[Any]) -> Any:
+    """Return the arguments of a step, with references replaced by the results of the steps."""
+    if isinstance(value, dict):
+        if value.keys() == {REF_KEY}:
+            return results[value[REF_KEY]]
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    return value
+
+
+def batch_tool(mcp: ToolServer) -> Callable[[list[BatchStep]], Awaitable[list[dict[str, Any]]]]:
+    """
+    Create the batch tool of a server, running several of its tool calls in one request.
+
+    Steps run concurrently, except for steps referencing the result of earlier ones, which wait for them.
+    Each step is admitted in the lane of its tool, waiting for a slot, and is subject to the deadline of its
+    tool. A failing step does not stop the others, its error is reported in its result and the steps
+    referencing it fail too.
+    """
+
+    async def batch(steps: list[BatchStep]) -> list[dict[str, Any]]:
+        """
+        Run several tool calls in one request, and return their results in order.
+        Steps run concurrently unless their arguments reference the result of an earlier step with
+        {"$ref": index}, e.g. [{"tool": "add", "arguments": {"array": [1, 2]}},
+        {"tool": "multiply", "arguments": {"array": [{"$ref": 0}, 10]}}].
+        Each result is {"result": value}, or {"error": message} when the step failed.
+        """
+        if len(steps) > MAX_BATCH_STEPS:
+            raise ValueError(f"A batch has at most {MAX_BATCH_STEPS} steps, got {len(steps)}")
+
+        results: list[Any] = [None] * len(steps)
+        outcomes: list[dict[str, Any]] = [{} for _ in steps]
+        done = [anyio.Event() for _ in steps]
+
+        async def run_step(index: int, step: BatchStep) -> None:
+            try:
+                if step.tool == BATCH_TOOL_NAME:
+                    raise ValueError("Batches cannot be nested")
+
+                references = step_references(step.arguments)
+                for ref in sorted(references):
+                    if not 0 <= ref < index:
+                        raise DependencyError(f"Step {index} references step {ref}, which is not an earlier step")
+                    await done[ref].wait()
+                    if "error" in outcomes[ref]:
+                        raise DependencyError(f"Step {index} depends on step {ref}, which failed")
+
+                arguments = resolve_references(step.arguments, results)
+                with anyio.fail_after(mcp.tool_timeout(step.tool)):
+                    if mcp.admission is None:
+                        results[index] = await mcp.tool.call_function(step.tool, arguments)
+                    else:
+                        # Steps wait for a slot of their lane, as the batch already bounds how many of them run
+                        async with mcp.admission.admit(step.tool if step.tool in mcp.tool else None, wait=True):
+                            results[index] = await mcp.tool.call_function(step.tool, arguments)
+                outcomes[index] = {"result": results[index]}
+            except TimeoutError:
+                outcomes[index] = {"error": f"Tool '{step.tool}' timed out after {mcp.tool_timeout(step.tool)} seconds"}
+            except Exception as e:
+                logger.debug("Step %d of batch failed: %s", index, e)
+                outcomes[index] = {"error": str(e)}
+            finally:
+                done[index].set()
+
+        async with anyio.create_task_group() as tg:
+            for index, step in enumerate(steps):
+                tg.start_soon(run_step, index, step)
+
+        return outcomes
+
+    return batch
@@ -1,75 +1,636 @@
+import argparse
+import importlib
 import inspect
 import logging
-from collections.abc import Awaitable, Callable
+import os
+import tempfile
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from functools import partial
 from types import ModuleType
+from typing import Any
 
+import anyio
 from minimcp import MiniMCP, stdio
 
+from minimcp_servers.core.admission import DEFAULT_LANE, FAST_LANE, HEAVY_LANE, LANES, AdmissionControl
+from minimcp_servers.core.cache import ResultCache
+from minimcp_servers.core.codec import get_codec
+from minimcp_servers.core.config import env_bool, env_choice_map, env_float, env_float_map, env_int
+from minimcp_servers.core.executor import OffloadPolicy, ProcessPool, ThreadOffloader
+from minimcp_servers.core.logger import get_profile_mode
+from minimcp_servers.core.manifest import LazyTool, Manifest, ToolEntry, load_manifest, manifest_fingerprint
+from minimcp_servers.core.metadata import TOOL_METADATA, module_metadata
+from minimcp_servers.core.server import ToolServer
+from minimcp_servers.core.singleflight import SingleFlight
+from minimcp_servers.core.stats import STATS_TOOL_NAME, ServerStats, server_stats_tool, size_parameter
+from minimcp_servers.core.transport import bounded_lines, concurrent_transport
+from minimcp_servers.core.vectorize import MANY_SUFFIX, is_unary_scalar, many_tool
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_IN_FLIGHT = 32
+DEFAULT_OFFLOAD_THRESHOLD = 10_000
+DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_PROCESS_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+DEFAULT_PROCESS_TIMEOUT = 30.0
+DEFAULT_TOOL_TIMEOUT = 30.0
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = 8000
+HTTP_KEEP_ALIVE_TIMEOUT = 30
+DEFAULT_WORKER_MAX_MEMORY_MB = 0
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_MAX_MB = 64
+DEFAULT_CACHE_TTL = 0.0
+DEFAULT_MEMO_MAX_MB = 256
+DEFAULT_MEMO_MIN_TIME = 0.1
+DEFAULT_STATS_INTERVAL = 0.0
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "minimcp-profiles")
+DEFAULT_PROFILE_THRESHOLD = 0.1
+DEFAULT_PROFILE_RATE = 1.0
+DEFAULT_PROFILE_INTERVAL = 0.005
+DEFAULT_MAX_FRAME_MB = 64
+DEFAULT_MAX_CALLS = 32
+# As many calls as messages handled concurrently can wait, so that calls within the in-flight limit are not rejected
+DEFAULT_MAX_PENDING = DEFAULT_MAX_IN_FLIGHT
+DEFAULT_TOOL_CONCURRENCY = 8
+DEFAULT_FAST_LANE_CALLS = 64
+DEFAULT_HEAVY_LANE_CALLS = max(2, (os.cpu_count() or 1) // 2)
+
+# JSON schema types of the arguments of O(1) tools. Integers are excluded, as they have arbitrary precision
+_SCALAR_TYPES = ("number", "boolean")
+
+# Offload policy and lane of the tools of each declared cost class
+COST_POLICIES: dict[str, OffloadPolicy] = {"constant": "inline", "linear": "auto", "superlinear": "process"}
+COST_LANES = {"constant": FAST_LANE, "linear": DEFAULT_LANE, "superlinear": HEAVY_LANE}
 
-def mcp_from_module(name: str, version: str, instructions: str, modules: list[ModuleType]) -> MiniMCP:
+
+def mcp_from_module(
+    name: str,
+    version: str,
+    instructions: str,
+    modules: Sequence[ModuleType | str],
+    offload: Mapping[str, OffloadPolicy] | None = None,
+    offload_threshold: int | None = None,
+    thread_workers: int | None = None,
+    process_workers: int | None = None,
+    process_timeout: float | None = None,
+    timeout: float | None = None,
+    tool_timeouts: Mapping[str, float] | None = None,
+    namespaced: bool = False,
+    use_manifest: bool | None = None,
+    cache_size: int | None = None,
+    cache_max_bytes: int | None = None,
+    cache_ttl: float | None = None,
+    memo_path: str | None = None,
+    memo_max_bytes: int | None = None,
+    memo_min_time: float | None = None,
+    batch: bool | None = None,
+    codec: str | None = None,
+    stats: bool | None = None,
+    stats_tool: bool | None = None,
+    profile: str | None = None,
+    profile_dir: str | None = None,
+    profile_threshold: float | None = None,
+    max_frame_bytes: int | None = None,
+    max_calls: int | None = None,
+    max_pending: int | None = None,
+    tool_concurrency: int | None = None,
+    tool_concurrency_limits: Mapping[str, int] | None = None,
+    lanes: Mapping[str, str] | None = None,
+    lane_limits: Mapping[str, int] | None = None,
+    single_flight: bool | None = None,
+    many_tools: bool | None = None,
+) -> ToolServer:
     """
     Create a MiniMCP server from a Python module by automatically registering
     all public callable functions as tools.
 
+    With namespaced set, tool names are prefixed by the namespace of their module, the last part of the
+    module name. For instance mean from minimcp_servers.modules.math.stats is registered as stats_mean.
+
+    When a manifest generated by minimcp_servers.core.manifest matches the modules, tools are registered
+    from their precomputed definitions. Their module is imported, and their validators built, only when
+    they are first called.
+
+    Modules declare the metadata of their functions in their __tools__ attribute, see
+    minimcp_servers.core.metadata. It is read once, when the tools are registered, and kept in the manifest.
+
+    Results of pure tools are cached, keyed on their canonical arguments. Tools declared impure, such as the
+    ones returning the current time or random values, are never cached. Merging identical concurrent calls
+    into one keys on idempotent instead: impure tools are merged too, unless they are also declared not
+    idempotent, like the ones returning random values. Persistent tools, whose results can take seconds to
+    compute, also keep their results in a persistent memo store on disk when memo_path is set, shared by every
+    server process using it. Tools declaring a timeout get it as their deadline, unless tool_timeouts sets another one.
+
+    Tool calls are scheduled in lanes by cost, each with its own limit of calls running at the same time, so
+    that cheap calls never wait behind expensive ones. Tools run in the lane of their declared cost class:
+    the fast lane for constant tools, the default lane for linear ones, and the heavy lane for superlinear
+    ones and tools with the "process" offload policy. Without a declared cost, tools whose arguments are all
+    floats or booleans run in the fast lane, and other tools in the default lane.
+
+    With many_tools set, each function taking a single float and returning a float or an integer, such as sin
+    or ceil, also gets a twin tool applying it to each element of a list, such as sin_many. A series is then
+    computed in one call, instead of one call per element.
+
+    Tools are run as per their offload policy, which defaults to the one of their declared cost class:
+    "inline" for constant tools, "process" for superlinear ones, and "auto" otherwise. With "auto", a tool
+    runs on the event loop and is moved to a worker thread when its input size reaches the offload threshold.
+
     Args:
         name: The name of the MCP server
         version: The version of the MCP server
         instructions: The instructions for the MCP server
-        module: The Python module to expose as MCP tools
+        modules: The Python modules to expose as MCP tools, or their names. Named modules are only imported
+            when they are introspected, or when one of their tools is first called.
+        offload: Offload policy ("inline", "auto", "thread" or "process") by tool or function name, overriding
+            the policy of the declared cost of the tools.
+            Tools with the "process" policy run in worker threads when the process pool is disabled.
+        offload_threshold: Input size from which "auto" tools run in a worker thread. Defaults to
+            MCP_SERVER_OFFLOAD_THRESHOLD environment variable, or 10000 if not set.
+        thread_workers: Maximum number of worker threads running tools. Defaults to
+            MCP_SERVER_THREAD_WORKERS environment variable, or min(32, cpu_count + 4) if not set.
+        process_workers: Maximum number of worker processes running tools, 0 disables the process pool.
+            Workers are only spawned when a "process" tool is first called. Defaults to
+            MCP_SERVER_PROCESS_WORKERS environment variable, or half the CPU count (at least 1) if not set.
+        process_timeout: Wall-clock budget in seconds of a call in a worker process, after which the worker
+            is killed. Defaults to MCP_SERVER_PROCESS_TIMEOUT environment variable, or 30 if not set.
+        timeout: Deadline in seconds of a tool call, 0 for no deadline. Calls past their deadline are cancelled
+            and a JSON-RPC error is returned. Defaults to MCP_SERVER_TOOL_TIMEOUT environment variable, or 30
+            if not set.
+        tool_timeouts: Deadline in seconds by tool name, overriding timeout and the declared timeout of the tool.
+            Defaults to MCP_SERVER_TOOL_TIMEOUTS environment variable, in the format "tool1=seconds,tool2=seconds".
+        namespaced: Prefix tool names with the namespace of their module
+        use_manifest: Register the tools from the precomputed tool manifest of the server when it matches
+            the modules, instead of introspecting them. Defaults to MCP_SERVER_MANIFEST environment variable,
+            or True if not set.
+        cache_size: Maximum number of results of pure tools kept in memory, 0 disables the cache. Defaults to
+            MCP_SERVER_CACHE_SIZE environment variable, or 1024 if not set.
+        cache_max_bytes: Maximum estimated memory in bytes held by cached results. Defaults to
+            MCP_SERVER_CACHE_MAX_MB environment variable in MB, or 64 MB if not set.
+        cache_ttl: Time in seconds after which cached results expire, 0 for no expiry. Defaults to
+            MCP_SERVER_CACHE_TTL environment variable, or 0 if not set.
+        memo_path: Path of the sqlite database of the persistent memo store, empty to disable it. Defaults to
+            MCP_SERVER_MEMO_PATH environment variable, or disabled if not set.
+        memo_max_bytes: Maximum size in bytes of the results in the memo store. Defaults to
+            MCP_SERVER_MEMO_MAX_MB environment variable in MB, or 256 MB if not set.
+        memo_min_time: Minimum duration in seconds of a call for its result to be stored in the memo store.
+            Defaults to MCP_SERVER_MEMO_MIN_TIME environment variable, or 0.1 if not set.
+        batch: Register the batch tool, running several tool calls of the server in one request. Defaults to
+            MCP_SERVER_BATCH_TOOL environment variable, or False if not set.
+        codec: JSON codec decoding messages, "auto", "msgspec", "orjson" or "json". "auto" picks msgspec or
+            orjson when installed, and the standard library otherwise. Defaults to MCP_SERVER_CODEC environment
+            variable, or "auto" if not set.
+        stats: Count and time the calls of every tool, at a cost below a microsecond per call. Defaults to
+            MCP_SERVER_STATS environment variable, or True if not set.
+        stats_tool: Register the server_stats tool, reporting the counters of the tools. Defaults to
+            MCP_SERVER_STATS_TOOL environment variable, or False if not set.
+        profile: Per-request profiling mode, "off", "cprofile" or "sample". Profiles of the calls lasting at
+            least profile_threshold are saved per tool in profile_dir. Defaults to MCP_SERVER_PROFILE environment
+            variable, or "off" if not set. The fraction of the calls profiled, and the sampling interval, are
+            set by MCP_SERVER_PROFILE_RATE and MCP_SERVER_PROFILE_INTERVAL.
+        profile_dir: Directory of the profile files. Defaults to MCP_SERVER_PROFILE_DIR environment variable, or
+            minimcp-profiles in the temporary directory if not set.
+        profile_threshold: Minimum duration in seconds of a call for its profile to be saved. Defaults to
+            MCP_SERVER_PROFILE_THRESHOLD environment variable, or 0.1 if not set.
+        max_frame_bytes: Maximum size of a message in bytes, 0 for no limit. Larger messages are rejected before
+            being decoded. Defaults to MCP_SERVER_MAX_FRAME_MB environment variable in MB, or 64 MB if not set.
+        max_calls: Maximum number of tool calls running at the same time, 0 for no limit. Defaults to
+            MCP_SERVER_MAX_CALLS environment variable, or 32 if not set.
+        max_pending: Maximum number of tool calls waiting for a slot. Past that, calls are rejected with a
+            retryable SERVER_BUSY error. Defaults to MCP_SERVER_MAX_PENDING environment variable, or 32 if not set.
+        tool_concurrency: Maximum number of calls of one tool running at the same time, 0 for no limit, so
+            that an expensive tool cannot take every slot. Defaults to MCP_SERVER_TOOL_CONCURRENCY environment
+            variable, or 8 if not set.
+        tool_concurrency_limits: Maximum number of calls running at the same time by tool name, overriding
+            tool_concurrency. Defaults to MCP_SERVER_TOOL_CONCURRENCY_LIMITS environment variable, in the format
+            "tool1=calls,tool2=calls".
+        lanes: Lane ("fast", "default" or "heavy") by tool or function name, for tools not in the lane of their
+            declared cost. Defaults to MCP_SERVER_TOOL_LANES environment variable, in the format
+            "tool1=lane,tool2=lane".
+        lane_limits: Maximum number of calls running at the same time by lane, overriding max_calls for the
+            default lane. Defaults to MCP_SERVER_LANE_LIMITS environment variable, in the format "lane1=calls",
+            with 64 calls in the fast lane and half the CPU count in the heavy lane if not set.
+        single_flight: Merge identical concurrent calls of idempotent tools, so that they run once and share their
+            result. Defaults to MCP_SERVER_SINGLE_FLIGHT environment variable, or True if not set.
+        many_tools: Register the *_many twin of each unary scalar function, applying it to each element of a
+            list. Defaults to MCP_SERVER_MANY_TOOLS environment variable, or False if not set.
 
     Returns:
-        MiniMCP server instance with all module functions registered as tools
+        ToolServer, a MiniMCP server instance with all module functions registered as tools
     """
 
-    mcp = MiniMCP(name.strip(), version=version.strip(), instructions=instructions.strip())
+    offload = offload or {}
+    if offload_threshold is None:
+        offload_threshold = env_int("MCP_SERVER_OFFLOAD_THRESHOLD", DEFAULT_OFFLOAD_THRESHOLD)
+    if thread_workers is None:
+        thread_workers = env_int("MCP_SERVER_THREAD_WORKERS", DEFAULT_THREAD_WORKERS, minimum=1)
+    if process_workers is None:
+        process_workers = env_int("MCP_SERVER_PROCESS_WORKERS", DEFAULT_PROCESS_WORKERS)
+    if process_timeout is None:
+        process_timeout = env_float("MCP_SERVER_PROCESS_TIMEOUT", DEFAULT_PROCESS_TIMEOUT)
+
+    module_names = [module_name(module) for module in modules]
+    offloader = ThreadOffloader(thread_workers, offload_threshold)
+    process_pool = None
+    if process_workers > 0:
+        process_pool = ProcessPool(process_workers, process_timeout, module_names)
+
+    def wrap(func: Callable, policy: OffloadPolicy) -> Callable:
+        if policy == "process":
+            if process_pool is not None:
+                return process_pool.wrap(func)
+            policy = "thread"
+        return offloader.wrap(func, policy)
+
+    if timeout is None:
+        timeout = env_float("MCP_SERVER_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT)
+    if tool_timeouts is None:
+        tool_timeouts = env_float_map("MCP_SERVER_TOOL_TIMEOUTS")
+
+    name = name.strip()
+    if many_tools is None:
+        many_tools = env_bool("MCP_SERVER_MANY_TOOLS", False)
+    fingerprint = manifest_fingerprint(module_names, namespaced, many_tools)
+    if use_manifest is None:
+        use_manifest = env_bool("MCP_SERVER_MANIFEST", True)
+    manifest = load_manifest(name, fingerprint) if use_manifest else None
+
+    functions: list[tuple[ToolEntry, Callable | None]]
+    if manifest is not None:
+        # Fast path, tools are registered from their precomputed definitions, and bound to their
+        # function on first call. Modules are only imported then.
+        functions = [(entry, None) for entry in manifest.tools]
+        logger.info("Registering %d functions from the tool manifest of '%s'", len(functions), name)
+    else:
+        # Get all public callable functions from the modules, with their tool names
+        functions = []
+        for module in map(importlib.import_module, module_names):
+            prefix = f"{module_namespace(module)}_" if namespaced else ""
+            metadata = module_metadata(module)
+            module_functions = []
+            for attr_name in dir(module):
+                # Skip private/dunder methods
+                if attr_name.startswith("_"):
+                    continue
+
+                attr = getattr(module, attr_name)
+
+                # Check if it's a callable function (regular function or builtin function)
+                if callable(attr) and (inspect.isfunction(attr) or inspect.isbuiltin(attr)):
+                    entry = ToolEntry(
+                        prefix + attr_name, module.__name__, attr_name, {}, **metadata.get(attr_name, TOOL_METADATA)
+                    )
+                    module_functions.append((entry, attr))
+                    if many_tools and is_unary_scalar(attr) and not hasattr(module, attr_name + MANY_SUFFIX):
+                        twin = ToolEntry(
+                            entry.name + MANY_SUFFIX,
+                            module.__name__,
+                            attr_name,
+                            {},
+                            pure=entry.pure,
+                            idempotent=entry.idempotent,
+                            cost="linear",
+                            size="xs",
+                            timeout=entry.timeout,
+                            many=True,
+                        )
+                        module_functions.append((twin, attr))
+
+            logger.info(
+                "Registering %d functions from module '%s' as MCP tools", len(module_functions), module.__name__
+            )
+            functions.extend(module_functions)
+
+    # Declared deadlines are the defaults of their tools, overridden by the ones set by tool name
+    declared_timeouts = {entry.name: entry.timeout for entry, _ in functions if entry.timeout is not None}
+    mcp = ToolServer(
+        name,
+        version=version.strip(),
+        instructions=instructions.strip(),
+        timeout=timeout,
+        tool_timeouts=declared_timeouts | dict(tool_timeouts),
+        codec=get_codec(codec or os.environ.get("MCP_SERVER_CODEC", "auto")),
+    )
 
-    # Get all public callable functions from the module
-    functions = []
-    for module in modules:
-        for attr_name in dir(module):
-            # Skip private/dunder methods
-            if attr_name.startswith("_"):
-                continue
+    if cache_size is None:
+        cache_size = env_int("MCP_SERVER_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+    if cache_max_bytes is None:
+        cache_max_bytes = env_int("MCP_SERVER_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB) * 1024 * 1024
+    if cache_ttl is None:
+        cache_ttl = env_float("MCP_SERVER_CACHE_TTL", DEFAULT_CACHE_TTL)
+    if cache_size > 0 and cache_max_bytes > 0:
+        mcp.result_cache = ResultCache(cache_size, cache_max_bytes, cache_ttl)
 
-            attr = getattr(module, attr_name)
+    if memo_path is None:
+        memo_path = os.environ.get("MCP_SERVER_MEMO_PATH", "").strip()
+    if memo_max_bytes is None:
+        memo_max_bytes = env_int("MCP_SERVER_MEMO_MAX_MB", DEFAULT_MEMO_MAX_MB) * 1024 * 1024
+    if memo_min_time is None:
+        memo_min_time = env_float("MCP_SERVER_MEMO_MIN_TIME", DEFAULT_MEMO_MIN_TIME)
+    if memo_path and memo_max_bytes > 0:
+        # Imported here, as sqlite3 is only needed by the memo store
+        from minimcp_servers.core.memo import MemoStore
 
-            # Check if it's a callable function (regular function or builtin function)
-            if callable(attr) and (inspect.isfunction(attr) or inspect.isbuiltin(attr)):
-                functions.append((attr_name, attr))
+        mcp.memo_store = MemoStore(os.path.expanduser(memo_path), memo_max_bytes, memo_min_time)
 
-        logger.info("Registering %d functions from module '%s' as MCP tools", len(functions), module.__name__)
+    if stats is None:
+        stats = env_bool("MCP_SERVER_STATS", True)
+    if stats:
+        mcp.stats = ServerStats()
+
+    if profile is None:
+        profile = get_profile_mode()
+    if profile_dir is None:
+        profile_dir = os.environ.get("MCP_SERVER_PROFILE_DIR", "").strip() or DEFAULT_PROFILE_DIR
+    if profile_threshold is None:
+        profile_threshold = env_float("MCP_SERVER_PROFILE_THRESHOLD", DEFAULT_PROFILE_THRESHOLD)
+    if profile != "off":
+        # Imported here, as cProfile and pstats are only needed by the profiler
+        from minimcp_servers.core.profiler import CallProfiler
+
+        mcp.profiler = CallProfiler(
+            profile,
+            os.path.expanduser(profile_dir),
+            profile_threshold,
+            rate=env_float("MCP_SERVER_PROFILE_RATE", DEFAULT_PROFILE_RATE),
+            interval=env_float("MCP_SERVER_PROFILE_INTERVAL", DEFAULT_PROFILE_INTERVAL, minimum=0.0001),
+        )
+
+    if max_frame_bytes is None:
+        max_frame_bytes = env_int("MCP_SERVER_MAX_FRAME_MB", DEFAULT_MAX_FRAME_MB) * 1024 * 1024
+    if max_calls is None:
+        max_calls = env_int("MCP_SERVER_MAX_CALLS", DEFAULT_MAX_CALLS)
+    if max_pending is None:
+        max_pending = env_int("MCP_SERVER_MAX_PENDING", DEFAULT_MAX_PENDING)
+    if tool_concurrency is None:
+        tool_concurrency = env_int("MCP_SERVER_TOOL_CONCURRENCY", DEFAULT_TOOL_CONCURRENCY)
+    if tool_concurrency_limits is None:
+        limits = env_float_map("MCP_SERVER_TOOL_CONCURRENCY_LIMITS")
+        tool_concurrency_limits = {tool: int(limit) for tool, limit in limits.items()}
+    if lanes is None:
+        lanes = env_choice_map("MCP_SERVER_TOOL_LANES", LANES)
+    if lane_limits is None:
+        limits = env_float_map("MCP_SERVER_LANE_LIMITS")
+        lane_limits = {lane: int(limit) for lane, limit in limits.items() if lane in LANES}
+    mcp.admission = admission = AdmissionControl(
+        max_frame_bytes,
+        max_calls,
+        max_pending,
+        tool_concurrency,
+        tool_concurrency_limits,
+        lane_limits={FAST_LANE: DEFAULT_FAST_LANE_CALLS, HEAVY_LANE: DEFAULT_HEAVY_LANE_CALLS, **lane_limits},
+    )
+
+    if single_flight is None:
+        single_flight = env_bool("MCP_SERVER_SINGLE_FLIGHT", True)
+    if single_flight:
+        mcp.single_flight = SingleFlight(mcp.codec.dumps)
+
+    def bind(func: Callable, entry: ToolEntry, policy: OffloadPolicy) -> Callable:
+        if entry.many:
+            func = many_tool(func)
+        if mcp.profiler is not None and not (policy == "process" and process_pool is not None):
+            # Profiled before offloading, in the thread running the function. Functions sent to worker
+            # processes are left as is, as they are pickled by reference
+            func = mcp.profiler.wrap(entry.name, func)
+        handler = wrap(func, policy)
+        if mcp.memo_store is not None and entry.persistent:
+            # Keyed on the function rather than the tool, so that servers naming it differently share results
+            handler = mcp.memo_store.wrap(f"{entry.module}.{entry.function}", handler)
+        if mcp.single_flight is not None and entry.idempotent and inspect.iscoroutinefunction(handler):
+            # Calls of tools without sized arguments run inline, and are too short to overlap
+            if size_parameter(func, entry.size) is not None:
+                handler = mcp.single_flight.wrap(entry.name, handler)
+        if mcp.result_cache is not None and entry.pure:
+            handler = mcp.result_cache.wrap(entry.name, handler)
+        if mcp.stats is not None:
+            handler = mcp.stats.wrap(entry.name, handler, entry.size)
+        # Timed while in the fast lane, which is only known once the tool is registered
+        return admission.timed(entry.name, handler)
 
     # Register each function as a tool
-    registered_count = 0
-    for func_name, func in functions:
+    tools = []
+    for entry, func in functions:
         try:
-            mcp.tool.add(func)
-            registered_count += 1
-            logger.debug("Registered function '%s' as tool", func_name)
+            # Twins do not share the policy of their function, set by function name
+            policy = offload.get(entry.name) or (None if entry.many else offload.get(entry.function))
+            policy = policy or cost_policy(entry.cost)
+            if func is None:
+                handler = LazyTool(entry.module, entry.function, partial(bind, entry=entry, policy=policy))
+                mcp.tool.add_definition(handler, entry.definition)
+            else:
+                tool = mcp.tool.add(bind(func, entry, policy), name=entry.name)
+                entry.definition = tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+            tools.append(entry)
+            lane = lanes.get(entry.name) or (None if entry.many else lanes.get(entry.function))
+            lane = lane or tool_lane(entry.definition, policy, entry.cost)
+            mcp.admission.assign(entry.name, lane)
+            logger.debug(
+                "Registered function '%s' as tool '%s' with offload policy '%s' in the %s lane%s",
+                entry.function,
+                entry.name,
+                policy,
+                lane,
+                "" if entry.pure else ", impure",
+            )
         except Exception as e:  # noqa: PERF203
-            logger.warning("Failed to register function '%s': %s", func_name, str(e))
+            logger.warning("Failed to register function '%s': %s", entry.function, str(e))
+
+    mcp.manifest = Manifest(fingerprint, tools)
+
+    if batch is None:
+        batch = env_bool("MCP_SERVER_BATCH_TOOL", False)
+    if batch:
+        # Imported here, as pydantic models are only needed by the batch tool
+        from minimcp_servers.core.batch import BATCH_TOOL_NAME, batch_tool
+
+        mcp.tool.add(batch_tool(mcp), name=BATCH_TOOL_NAME)
+        # Steps are admitted on their own, the batch only schedules them
+        mcp.admission.assign(BATCH_TOOL_NAME, FAST_LANE, scheduler=True)
+
+    if stats_tool is None:
+        stats_tool = env_bool("MCP_SERVER_STATS_TOOL", False)
+    if stats_tool:
+        mcp.tool.add(server_stats_tool(mcp), name=STATS_TOOL_NAME)
+        mcp.admission.assign(STATS_TOOL_NAME, FAST_LANE)
+
+    known_names = {name for entry, _ in functions for name in (entry.name, entry.function)}
+    for unknown_name in offload.keys() - known_names:
+        logger.warning("Offload policy set for unknown tool '%s'", unknown_name)
 
     return mcp
 
 
-def stdio_server(mcp: MiniMCP) -> Callable[[], Awaitable[None]]:
+def cost_policy(cost: str | None) -> OffloadPolicy:
+    """Return the offload policy of the tools of a cost class, "auto" for tools not declaring their cost."""
+    return COST_POLICIES[cost] if cost is not None else "auto"
+
+
+def tool_lane(definition: dict[str, Any], policy: OffloadPolicy, cost: str | None = None) -> str:
+    """
+    Return the lane of a tool: the heavy lane for tools run in worker processes, and the lane of its cost
+    class when declared. Otherwise the fast lane for tools whose arguments are all floats or booleans, and
+    the default lane for others.
+    """
+    if policy == "process":
+        return HEAVY_LANE
+    if cost is not None:
+        return COST_LANES[cost]
+
+    properties = definition.get("inputSchema", {}).get("properties", {})
+    if all(isinstance(schema, dict) and schema.get("type") in _SCALAR_TYPES for schema in properties.values()):
+        return FAST_LANE
+    return DEFAULT_LANE
+
+
+def module_name(module: ModuleType | str) -> str:
+    """Return the name of a module, given the module or its name."""
+    return module if isinstance(module, str) else module.__name__
+
+
+def module_namespace(module: ModuleType | str) -> str:
+    """Return the namespace of the tools of a module, the last part of its name."""
+    return module_name(module).rsplit(".", 1)[-1]
+
+
+def stdio_server(mcp: MiniMCP, max_in_flight: int | None = None) -> Callable[[], Awaitable[None]]:
     """
     Create a function that starts a MiniMCP server over stdio.
 
+    Messages are handled concurrently, so a slow tool call does not hold up the ones queued behind it.
+    With max_in_flight set to 1, messages are handled sequentially in the order they arrive.
+
     Args:
         mcp: The MiniMCP server instance
+        max_in_flight: Maximum number of messages handled at the same time. Defaults to
+            MCP_SERVER_MAX_IN_FLIGHT environment variable, or 32 if not set.
 
     Returns:
         A function that starts the MiniMCP server over stdio
     """
 
+    if max_in_flight is None:
+        max_in_flight = env_int("MCP_SERVER_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT, minimum=1)
+
+    admission = getattr(mcp, "admission", None)
+    max_frame_bytes = admission.max_frame_bytes if isinstance(admission, AdmissionControl) else 0
+
     async def stdio_server():
         logger.info("MiniMCP: Started %s server, listening for messages...", mcp.name)
         try:
-            await stdio.sequential_transport(mcp.handle)
+            if max_frame_bytes > 0:
+                # Oversized lines are cut while being read, so that they are never held whole in memory
+                lines = bounded_lines(stdio.stdin, max_frame_bytes)
+                await concurrent_transport(mcp.handle, max_in_flight, stdin=lines)
+            elif max_in_flight == 1:
+                await stdio.sequential_transport(mcp.handle)
+            else:
+                await concurrent_transport(mcp.handle, max_in_flight)
         except KeyboardInterrupt:
             logger.info("%s server shutting down gracefully...", mcp.name)
 
     return stdio_server
+
+
+def http_server(
+    mcp: MiniMCP, host: str = DEFAULT_HTTP_HOST, port: int = DEFAULT_HTTP_PORT, reuse_port: bool = False
+) -> Callable[[], Awaitable[None]]:
+    """
+    Create a function that starts a MiniMCP server over Streamable HTTP.
+
+    One long-lived process can serve many clients: requests are handled concurrently and
+    connections are kept alive between requests. Messages are received on the /mcp path.
+
+    Args:
+        mcp: The MiniMCP server instance
+        host: The interface to bind to
+        port: The port to listen on
+        reuse_port: Bind with SO_REUSEPORT, so that several worker processes can share the port
+
+    Returns:
+        A function that starts the MiniMCP server over HTTP
+    """
+
+    async def http_server():
+        # Imported here, so that stdio servers do not pay for loading the HTTP stack
+        import uvicorn
+
+        from minimcp_servers.core.http import create_app
+
+        config = uvicorn.Config(
+            create_app(mcp),
+            host=host,
+            port=port,
+            timeout_keep_alive=HTTP_KEEP_ALIVE_TIMEOUT,
+            log_config=None,  # Use the logging configured by configure_logging
+        )
+        logger.info("MiniMCP: Starting %s server on http://%s:%d", mcp.name, host, port)
+
+        if reuse_port:
+            from minimcp_servers.core.prefork import reuse_port_socket
+
+            await uvicorn.Server(config).serve(sockets=[reuse_port_socket(host, port)])
+        else:
+            await uvicorn.Server(config).serve()
+
+    return http_server
+
+
+def with_stats_dump(mcp: MiniMCP, serve: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """
+    Wrap a function starting a server, so that the tool stats of the server are appended to the file set by
+    MCP_SERVER_LOG_FILE every MCP_SERVER_STATS_INTERVAL seconds while it runs, and once more when it stops.
+    The function is returned as is when either variable is not set, or when the server has no stats.
+    """
+    stats = getattr(mcp, "stats", None)
+    path = os.environ.get("MCP_SERVER_LOG_FILE")
+    interval = env_float("MCP_SERVER_STATS_INTERVAL", DEFAULT_STATS_INTERVAL)
+    if not isinstance(stats, ServerStats) or not path or interval <= 0:
+        return serve
+
+    async def serve_with_stats_dump():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(stats.dump_periodically, path, mcp.name, interval)
+            try:
+                await serve()
+            finally:
+                tg.cancel_scope.cancel()
+
+    return serve_with_stats_dump
+
+
+def run_server(mcp: MiniMCP, argv: list[str] | None = None) -> None:
+    """
+    Run a MiniMCP server over the transport selected by the command line arguments.
+
+    Args:
+        mcp: The MiniMCP server instance
+        argv: The command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(prog=mcp.name, description=f"Run the {mcp.name} MCP server.")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio", help="Transport to serve over")
+    parser.add_argument("--host", default=DEFAULT_HTTP_HOST, help="Interface to bind to, with http transport")
+    parser.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT, help="Port to listen on, with http transport")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of pre-forked worker processes, with http transport"
+    )
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.workers > 1 and args.transport != "http":
+        parser.error("--workers requires --transport http")
+
+    if args.workers > 1:
+        from minimcp_servers.core.prefork import Supervisor, WorkerStartupError
+
+        max_memory_mb = env_int("MCP_SERVER_WORKER_MAX_MEMORY_MB", DEFAULT_WORKER_MAX_MEMORY_MB)
+        worker = with_stats_dump(mcp, http_server(mcp, args.host, args.port, reuse_port=True))
+        try:
+            Supervisor(lambda: anyio.run(worker), args.workers, max_memory_mb * 1024 * 1024).run()
+        except WorkerStartupError as e:
+            parser.exit(1, f"{parser.prog}: {e}\n")
+    elif args.transport == "http":
+        anyio.run(with_stats_dump(mcp, http_server(mcp, args.host, args.port)))
+    else:
+        anyio.run(with_stats_dump(mcp, stdio_server(mcp)))
@@ -0,0 +1,191 @@
+import functools
+import inspect
+import json
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from minimcp_servers.core.executor import input_size
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float | None
+
+
+def result_size(value: Any) -> int:
+    """Return an estimate in bytes of the memory held by a tool result."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(result_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(result_size(key) + result_size(item) for key, item in value.items())
+    return size
+
+
+def cache_key(tool_name: str, kwargs: dict[str, Any]) -> str | None:
+    """
+    Return the key of a call, from the tool name and the canonical JSON of its arguments.
+    Arguments are validated before the call, so equal values have the same JSON.
+
+    Returns:
+        The key, None if the arguments cannot be serialized
+    """
+    try:
+        arguments = json.dumps(kwargs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return f"{tool_name}:{arguments}"
+
+
+class ResultCache:
+    """
+    Memoizes the results of pure tools, keyed on the tool name and canonical arguments.
+    - At most max_entries results are kept, the least recently used ones are evicted first.
+    - Keys and results together hold at most max_bytes, results larger than that are not cached.
+    - Results expire ttl seconds after they are computed, when ttl is set.
+
+    Calls with an input size above max_input_size are not cached, as building their key costs as much as
+    their input is large, and they are unlikely to be repeated exactly.
+
+    Errors are not cached. The cache is used from the event loop only, and is not thread-safe.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+
+    _max_entries: int
+    _max_bytes: int
+    _ttl: float | None
+    _max_input_size: int
+    _entries: OrderedDict[str, _Entry]
+    _bytes: int
+
+    def __init__(
+        self, max_entries: int, max_bytes: int, ttl: float | None = None, max_input_size: int = 10_000
+    ) -> None:
+        """
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum estimated memory in bytes held by keys and results
+            ttl: Time in seconds after which a result expires, None or 0 to keep results until evicted
+            max_input_size: Largest input size of a cached call, as measured by input_size
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl or None
+        self._max_input_size = max_input_size
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated memory in bytes held by the cached keys and results."""
+        return self._bytes
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the cache."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return whether a result is cached for key, and the result."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry.value
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache a result, evicting the least recently used ones as needed."""
+        size = sys.getsizeof(key) + result_size(value)
+        if size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires_at = time.monotonic() + self._ttl if self._ttl else None
+        self._entries[key] = _Entry(value, size, expires_at)
+        self._bytes += size
+
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def key(self, tool_name: str, kwargs: dict[str, Any]) -> str | None:
+        """Return the key of a call, None if it is not to be cached."""
+        if input_size((), kwargs) > self._max_input_size:
+            return None
+        return cache_key(tool_name, kwargs)
+
+    def wrap(self, tool_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of func whose results are cached. The wrapper keeps the signature and docstring
+        of func, so tool schemas are unaffected. Tools are called with keyword arguments only.
+        """
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def cached_async(**kwargs: Any) -> Any:
+                key = self.key(tool_name, kwargs)
+                if key is not None:
+                    found, value = self.get(key)
+                    if found:
+                        return value
+
+                result = await func(**kwargs)
+                if key is not None:
+                    self.put(key, result)
+                return result
+
+            return cached_async
+
+        @functools.wraps(func)
+        def cached(**kwargs: Any) -> Any:
+            key = self.key(tool_name, kwargs)
+            if key is not None:
+                found, value = self.get(key)
+                if found:
+                    return value
+
+            result = func(**kwargs)
+            if key is not None:
+                self.put(key, result)
+            return result
+
+        return cached
@@ -0,0 +1,134 @@
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Codecs tried by "auto", fastest first. msgspec comes first, as it decodes integers of any size exactly
+AUTO_CODECS = ("msgspec", "orjson", "json")
+
+# Integers from this magnitude are decoded as floats by orjson
+_WIDE_INT = 2**63
+
+
+@dataclass(frozen=True)
+class Codec:
+    """
+    JSON decoder and encoder of the messages of a server.
+    - loads accepts str or bytes, and raises ValueError on invalid JSON.
+    - dumps returns compact JSON, raising TypeError or ValueError when the value cannot be encoded.
+    """
+
+    name: str
+    loads: Callable[[str | bytes], Any]
+    dumps: Callable[[Any], str]
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_codec() -> Codec:
+    """Return the codec of the standard library."""
+    return Codec("json", json.loads, _json_dumps)
+
+
+def msgspec_codec() -> Codec:
+    """
+    Return the codec of msgspec. Messages it rejects, such as those holding NaN, are decoded by the
+    standard library, which also reports the errors of invalid messages.
+
+    Raises:
+        ImportError: If msgspec is not installed
+    """
+    import msgspec  # pyright: ignore[reportMissingImports]
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError:
+            return json.loads(data)
+
+    def dumps(value: Any) -> str:
+        return encoder.encode(value).decode()
+
+    return Codec("msgspec", loads, dumps)
+
+
+def _has_wide_float(value: Any) -> bool:
+    """Return whether a decoded value holds an integral float beyond 64-bit integers, at any depth."""
+    if isinstance(value, float):
+        return value.is_integer() and abs(value) >= _WIDE_INT
+    if isinstance(value, list):
+        if value and isinstance(value[0], (int, float)):
+            # Fast path for lists of numbers, bounded by their extrema. Mixed lists raise TypeError
+            try:
+                if max(value) < _WIDE_INT and min(value) > -_WIDE_INT:
+                    return False
+            except TypeError:
+                pass
+        return any(_has_wide_float(item) for item in value)
+    if isinstance(value, dict):
+        return any(_has_wide_float(item) for item in value.values())
+    return False
+
+
+def orjson_codec() -> Codec:
+    """
+    Return the codec of orjson. orjson decodes integers beyond 64 bits as floats, losing digits, so
+    messages holding a float that may come from such an integer are decoded again by the standard library.
+    So are the messages it rejects, and values it cannot encode are encoded by the standard library.
+
+    Raises:
+        ImportError: If orjson is not installed
+    """
+    import orjson  # pyright: ignore[reportMissingImports]
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            value = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+        return json.loads(data) if _has_wide_float(value) else value
+
+    def dumps(value: Any) -> str:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            return _json_dumps(value)
+
+    return Codec("orjson", loads, dumps)
+
+
+CODECS: dict[str, Callable[[], Codec]] = {"msgspec": msgspec_codec, "orjson": orjson_codec, "json": json_codec}
+
+
+def _load_codec(name: str) -> Codec | None:
+    try:
+        return CODECS[name]()
+    except ImportError:
+        return None
+
+
+def get_codec(name: str = "auto") -> Codec:
+    """
+    Return the codec of the given name, or with "auto" the fastest installed one. A codec whose library
+    is not installed falls back to the standard library.
+    """
+    name = name.strip().lower()
+    if name != "auto" and name not in CODECS:
+        logger.warning("Unknown codec '%s', using 'auto' instead. Valid codecs: %s", name, ", ".join(CODECS))
+        name = "auto"
+
+    if name != "auto":
+        codec = _load_codec(name)
+        if codec is None:
+            logger.warning("Codec '%s' is not installed, using the standard library instead", name)
+        return codec or json_codec()
+
+    return next(codec for codec in map(_load_codec, AUTO_CODECS) if codec is not None)
@@ -0,0 +1,162 @@
+import logging
+import os
+from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def env_int(name: str, default: int, minimum: int = 0) -> int:
+    """
+    Read an integer setting from the environment.
+
+    Args:
+        name: Name of the environment variable
+        default: Value used when the variable is not set or is invalid
+        minimum: Smallest accepted value
+
+    Returns:
+        The configured value, or default
+    """
+    value = os.environ.get(name, None)
+    if value is None or not value.strip():
+        return default
+
+    try:
+        parsed = int(value)
+    except ValueError:
+        logger.warning("Invalid value '%s' for %s. Using '%s' instead.", value, name, default)
+        return default
+
+    if parsed < minimum:
+        logger.warning("%s must be >= %d, got %d. Using '%s' instead.", name, minimum, parsed, default)
+        return default
+
+    return parsed
+
+
+def env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    """
+    Read a float setting from the environment.
+
+    Args:
+        name: Name of the environment variable
+        default: Value used when the variable is not set or is invalid
+        minimum: Smallest accepted value
+
+    Returns:
+        The configured value, or default
+    """
+    value = os.environ.get(name, None)
+    if value is None or not value.strip():
+        return default
+
+    try:
+        parsed = float(value)
+    except ValueError:
+        logger.warning("Invalid value '%s' for %s. Using '%s' instead.", value, name, default)
+        return default
+
+    if parsed < minimum:
+        logger.warning("%s must be >= %s, got %s. Using '%s' instead.", name, minimum, parsed, default)
+        return default
+
+    return parsed
+
+
+def env_float_map(name: str) -> dict[str, float]:
+    """
+    Read a mapping of keys to float values from the environment, in the format "key1=1.5,key2=3".
+    Invalid entries are skipped.
+
+    Args:
+        name: Name of the environment variable
+
+    Returns:
+        The configured mapping, empty if the variable is not set
+    """
+    value = os.environ.get(name, "")
+
+    mapping = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+
+        key, sep, number = entry.partition("=")
+        try:
+            if not sep or not key.strip():
+                raise ValueError(entry)
+            mapping[key.strip()] = float(number)
+        except ValueError:
+            logger.warning("Invalid entry '%s' in %s, expected key=number. Skipping it.", entry, name)
+
+    return mapping
+
+
+def env_choice_map(name: str, choices: Sequence[str]) -> dict[str, str]:
+    """
+    Read a mapping of keys to one of the given choices from the environment, in the format "key1=a,key2=b".
+    Invalid entries are skipped.
+
+    Args:
+        name: Name of the environment variable
+        choices: Accepted values
+
+    Returns:
+        The configured mapping, empty if the variable is not set
+    """
+    value = os.environ.get(name, "")
+
+    mapping = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+
+        key, sep, choice = (part.strip() for part in entry.partition("="))
+        if not sep or not key or choice not in choices:
+            logger.warning("Invalid entry '%s' in %s, expected key=%s. Skipping it.", entry, name, "|".join(choices))
+            continue
+        mapping[key] = choice
+
+    return mapping
+
+
+def env_list(name: str) -> list[str] | None:
+    """
+    Read a comma separated list of names from the environment.
+
+    Args:
+        name: Name of the environment variable
+
+    Returns:
+        The configured names, None if the variable is not set
+    """
+    value = os.environ.get(name, None)
+    if value is None:
+        return None
+
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """
+    Read a boolean setting from the environment, "1", "true", "yes" or "on" for True and
+    "0", "false", "no" or "off" for False.
+
+    Args:
+        name: Name of the environment variable
+        default: Value used when the variable is not set or is invalid
+
+    Returns:
+        The configured value, or default
+    """
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+
+    logger.warning("Invalid value '%s' for %s. Using '%s' instead.", value, name, default)
+    return default
@@ -0,0 +1,302 @@
+import functools
+import importlib
+import logging
+import math
+import signal
+import threading
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, Literal
+
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.context import SpawnContext
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger(__name__)
+
+# How a tool is executed:
+# - inline: Run directly on the event loop. Best for cheap O(1) tools.
+# - auto: Run in a worker thread when the input size reaches the offload threshold, else inline.
+# - thread: Always run in a worker thread.
+# - process: Run in a worker process. Best for pure Python tools that hold the GIL.
+OffloadPolicy = Literal["inline", "auto", "thread", "process"]
+
+THREAD_POLICIES: tuple[OffloadPolicy, ...] = ("inline", "auto", "thread")
+
+
+def input_size(args: tuple[Any, ...], kwargs: dict[str, Any]) -> int:
+    """
+    Return a rough measure of the work implied by the arguments of a call.
+    Strings, bytes and containers count their length, and integers count their 64-bit words.
+    Other values are ignored.
+    """
+    size = 0
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (str, bytes, list, tuple, dict)):
+            size += len(value)
+        elif isinstance(value, int):
+            size += value.bit_length() // 64
+    return size
+
+
+async def run_in_thread(call: Callable[[], Any], limiter: anyio.CapacityLimiter) -> Any:
+    """
+    Run call in a worker thread, holding a token of limiter until the thread returns. A cancelled caller does
+    not wait for the thread, which is abandoned, but the token is only released once the call returns, so
+    that limiter bounds the threads actually running.
+    """
+    token = object()
+    await limiter.acquire_on_behalf_of(token)
+    lock = threading.Lock()
+    started = dropped = False
+
+    def run() -> Any:
+        nonlocal started
+        with lock:
+            if dropped:
+                return None
+            started = True
+        try:
+            return call()
+        finally:
+            try:
+                anyio.from_thread.run_sync(limiter.release_on_behalf_of, token)
+            except RuntimeError:
+                # Event loop is closed, and the limiter with it
+                pass
+
+    try:
+        # Threads are bounded by limiter, not by the default limiter of anyio, released on cancel
+        return await anyio.to_thread.run_sync(run, abandon_on_cancel=True, limiter=_unbounded_limiter())
+    except BaseException:
+        with lock:
+            if not started:
+                # Call was dropped before a thread picked it up
+                dropped = True
+                limiter.release_on_behalf_of(token)
+        raise
+
+
+_UNBOUNDED: anyio.CapacityLimiter | None = None
+
+
+def _unbounded_limiter() -> anyio.CapacityLimiter:
+    global _UNBOUNDED
+    if _UNBOUNDED is None:
+        _UNBOUNDED = anyio.CapacityLimiter(math.inf)
+    return _UNBOUNDED
+
+
+class ThreadOffloader:
+    """
+    Runs synchronous tools in a bounded pool of worker threads, so that long computations
+    do not block the event loop and other messages can be served in the meantime.
+
+    Calls cancelled while running, by their deadline or their client, return at once, but their thread runs
+    to completion and keeps its slot of the pool until then.
+    """
+
+    _limiter: anyio.CapacityLimiter
+    _threshold: int
+
+    def __init__(self, workers: int, threshold: int) -> None:
+        """
+        Args:
+            workers: Maximum number of worker threads running tools at the same time
+            threshold: Input size from which tools with the auto policy are offloaded
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        self._limiter = anyio.CapacityLimiter(workers)
+        self._threshold = threshold
+
+    def wrap(self, func: Callable[..., Any], policy: OffloadPolicy) -> Callable[..., Any]:
+        """
+        Return a version of func that is executed as per the given policy.
+        The wrapper keeps the signature and docstring of func, so tool schemas are unaffected.
+        """
+        if policy not in THREAD_POLICIES:
+            raise ValueError(f"Invalid offload policy '{policy}', must be one of {THREAD_POLICIES}")
+
+        if policy == "inline":
+            return func
+
+        limiter = self._limiter
+        threshold = self._threshold
+        always = policy == "thread"
+
+        @functools.wraps(func)
+        async def offloaded(*args: Any, **kwargs: Any) -> Any:
+            if not always and input_size(args, kwargs) < threshold:
+                return func(*args, **kwargs)
+
+            return await run_in_thread(functools.partial(func, *args, **kwargs), limiter)
+
+        return offloaded
+
+
+def _worker_main(conn: "Connection", preload: Sequence[str]) -> None:
+    """Entry point of a worker process: Run calls received over conn until the parent goes away."""
+    # Interrupts are handled by the parent, which owns the lifecycle of the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for module_name in preload:
+        importlib.import_module(module_name)
+
+    while True:
+        try:
+            func, args, kwargs = conn.recv()
+        except (EOFError, OSError):
+            return
+
+        try:
+            conn.send((True, func(*args, **kwargs)))
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # Exception is not picklable
+                conn.send((False, RuntimeError(f"{e.__class__.__name__}: {e}")))
+
+
+class WorkerExitedError(RuntimeError):
+    """Worker process exited while running a call"""
+
+    pass
+
+
+class _Worker:
+    process: "BaseProcess"
+    conn: "Connection"
+
+    def __init__(self, process: "BaseProcess", conn: "Connection") -> None:
+        self.process = process
+        self.conn = conn
+
+    def call(
+        self, func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any], timeout: float
+    ) -> tuple[bool, Any]:
+        """Run a call in the worker, return a tuple of success flag and the result or exception."""
+        try:
+            self.conn.send((func, args, kwargs))
+            ready = self.conn.poll(timeout)
+            if ready:
+                return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerExitedError(f"Worker process exited with code {self.process.exitcode}") from e
+
+        raise TimeoutError(f"Tool call exceeded its budget of {timeout} seconds")
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+
+
+class ProcessPool:
+    """
+    Runs tools in a pool of warm worker processes, letting GIL-bound tools use every core.
+    - Workers are spawned on first use and kept for later calls, with the given modules preloaded.
+    - Functions and arguments are sent to workers by pickling, so both must be picklable.
+    - A worker running a call past its wall-clock budget, or whose call is cancelled, is killed
+      and replaced by a fresh worker on demand.
+    """
+
+    _preload: tuple[str, ...]
+    _timeout: float
+    _limiter: anyio.CapacityLimiter
+    _idle: list[_Worker]
+    _context: "SpawnContext | None"
+
+    def __init__(self, workers: int, timeout: float, preload: Sequence[str] = ()) -> None:
+        """
+        Args:
+            workers: Maximum number of worker processes
+            timeout: Wall-clock budget of a call in seconds
+            preload: Names of the modules imported by workers on start
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if timeout <= 0:
+            raise ValueError(f"timeout must be > 0, got {timeout}")
+
+        self._preload = tuple(preload)
+        self._timeout = timeout
+        self._limiter = anyio.CapacityLimiter(workers)
+        self._idle = []
+        self._context = None
+
+    def _spawn(self) -> _Worker:
+        if self._context is None:
+            # Imported on first spawn, as most calls never run in a worker process
+            import multiprocessing
+
+            self._context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn, self._preload), daemon=True)
+        process.start()
+        child_conn.close()
+        logger.debug("Started worker process %s", process.pid)
+        return _Worker(process, parent_conn)
+
+    def _pop_idle(self) -> _Worker | None:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.process.is_alive():
+                return worker
+            logger.warning(
+                "Discarding worker process %s, exited with code %s", worker.process.pid, worker.process.exitcode
+            )
+        return None
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run func in a worker process and return its result.
+
+        Raises:
+            TimeoutError: If the call exceeds its budget
+            WorkerExitedError: If the worker process exits while running the call
+        """
+        async with self._limiter:
+            worker = self._pop_idle() or await anyio.to_thread.run_sync(self._spawn)
+
+            try:
+                ok, value = await anyio.to_thread.run_sync(
+                    worker.call, func, args, kwargs, self._timeout, abandon_on_cancel=True
+                )
+            except (TimeoutError, WorkerExitedError, anyio.get_cancelled_exc_class()) as e:
+                logger.warning("Killing worker process %s: %s", worker.process.pid, e.__class__.__name__)
+                with anyio.CancelScope(shield=True):
+                    await anyio.to_thread.run_sync(worker.kill)
+                raise
+            except BaseException:
+                # Call could not be sent, for instance arguments are not picklable. Worker is still usable.
+                self._idle.append(worker)
+                raise
+
+            self._idle.append(worker)
+
+        if not ok:
+            raise value
+        return value
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of func that runs in the pool.
+        The wrapper keeps the signature and docstring of func, so tool schemas are unaffected.
+        """
+
+        @functools.wraps(func)
+        async def pooled(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(func, *args, **kwargs)
+
+        return pooled
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        while self._idle:
+            self._idle.pop().kill()
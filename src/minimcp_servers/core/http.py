@@ -0,0 +1,71 @@
+import logging
+import uuid
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from minimcp import MiniMCP, StreamableHTTPTransport
+from minimcp.server.transports.starlette import TRANSPORT_STATE_OBJ_KEY, streamable_http_transport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from minimcp_servers.core.admission import AdmissionControl
+from minimcp_servers.core.server import current_session
+
+logger = logging.getLogger(__name__)
+
+MCP_PATH = "/mcp"
+
+# Header of the Streamable HTTP transport identifying the session of a client
+SESSION_HEADER = "mcp-session-id"
+
+
+def create_app(mcp: MiniMCP, path: str = MCP_PATH) -> Starlette:
+    """
+    Create a Starlette application serving a MiniMCP server over Streamable HTTP.
+
+    A single StreamableHTTPTransport is shared by all the requests for the lifetime of the application,
+    and requests are handled concurrently.
+
+    Requests are handled in the session named by their Mcp-Session-Id header, so that clients can only cancel
+    their own requests. Requests without one get a new session, returned in the Mcp-Session-Id header of the
+    response, which clients send back from their initialize request on.
+
+    Args:
+        mcp: The MiniMCP server instance
+        path: The URL path on which MCP messages are received
+
+    Returns:
+        The Starlette application
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncGenerator[dict[str, Any], None]:
+        async with StreamableHTTPTransport() as transport:
+            logger.info("MiniMCP: Started %s server, listening for HTTP requests on %s", mcp.name, path)
+            # Lifespan state is exposed to the handlers as request.state
+            yield {TRANSPORT_STATE_OBJ_KEY: transport}
+
+    admission = getattr(mcp, "admission", None)
+    max_frame_bytes = admission.max_frame_bytes if isinstance(admission, AdmissionControl) else 0
+
+    async def handle(request: Request) -> Response:
+        # Oversized bodies announced by their Content-Length are rejected before being read. Others are read,
+        # and rejected by the server before being decoded.
+        content_length = request.headers.get("content-length", "")
+        if max_frame_bytes > 0 and content_length.isdigit() and int(content_length) > max_frame_bytes:
+            logger.warning("Rejected request body of %s bytes, over the maximum frame size", content_length)
+            return Response(status_code=413)
+
+        session = request.headers.get(SESSION_HEADER) or uuid.uuid4().hex
+        token = current_session.set(session)
+        try:
+            response = await streamable_http_transport(mcp.handle, request)
+        finally:
+            current_session.reset(token)
+        response.headers[SESSION_HEADER] = session
+        return response
+
+    return Starlette(routes=[Route(path, handle, methods=["POST"])], lifespan=lifespan)
@@ -1,20 +1,136 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
 import sys
+from datetime import datetime, timezone
+from queue import Full, Queue
+from typing import Any
 
 # Track if logging has been configured to prevent duplicate configurations
 _logging_configured = False
 
+# Listener writing the records of the queue, in queue mode
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: "BoundedQueueHandler | None" = None
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, for log processors."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records over to a QueueListener through a bounded queue, so that logging costs a queue put on
+    the calling thread, and formatting and I/O happen on the thread of the listener.
+
+    When the queue is full, the handler blocks until there is room, or with block unset drops the record.
+    Dropped records are counted, and reported by a warning record once the queue has room again.
+    """
+
+    queue: "Queue[logging.LogRecord]"  # pyright: ignore[reportIncompatibleVariableOverride]
+    block: bool
+    dropped: int
+    _unreported: int
+
+    def __init__(self, records: "Queue[logging.LogRecord]", block: bool = True) -> None:
+        super().__init__(records)
+        self.block = block
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Records are formatted by the listener, they stay in this process and need not be pickled
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+
+        if self._unreported:
+            report = logging.makeLogRecord(
+                {
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Dropped %d log records, the log queue was full",
+                    "args": (self._unreported,),
+                }
+            )
+            try:
+                self.queue.put_nowait(report)
+                self._unreported = 0
+            except Full:
+                pass
+
+
+def _restart_listener_in_child() -> None:
+    # The thread of the listener does not survive a fork, forked workers start their own on a fresh queue
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+
+    _queue_handler.queue = Queue(_queue_handler.queue.maxsize)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Write the records left in the queue and stop its listener, in queue mode. Later records are written
+    directly by the handlers.
+    """
+    global _listener, _queue_handler
+    if _listener is None or _queue_handler is None:
+        return
+
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
+    _queue_handler = None
+
 
 def configure_logging() -> None:
-    """Configure logging globally for stdio MCP server."""
-    global _logging_configured
+    """
+    Configure logging globally for stdio MCP server.
+
+    With MCP_SERVER_LOG_QUEUE_SIZE set, records are handed over to a background thread through a
+    bounded queue, so that they do not cost any I/O on the event loop. MCP_SERVER_LOG_QUEUE_FULL sets
+    whether logging blocks or drops records when the queue is full.
+    """
+    global _logging_configured, _listener, _queue_handler
 
     # Prevent multiple configurations
     if _logging_configured:
         return
 
-    handlers = [
+    handlers: list[logging.Handler] = [
         logging.StreamHandler(stream=sys.stderr),  # Log to stderr
     ]
 
@@ -27,13 +143,52 @@ def configure_logging() -> None:
     log_level = os.environ.get("MCP_SERVER_LOG_LEVEL", "WARNING").upper()
     valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
     if log_level not in valid_levels:
-        print("Warning: Invalid log level '%s'. Using 'WARNING' instead.", log_level, file=sys.stderr)
+        print(f"Warning: Invalid log level '{log_level}'. Using 'WARNING' instead.", file=sys.stderr)
         log_level = "WARNING"
 
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=handlers,
-    )
+    log_format = os.environ.get("MCP_SERVER_LOG_FORMAT", "text").strip().lower()
+    if log_format not in ("text", "json"):
+        print(f"Warning: Invalid log format '{log_format}'. Using 'text' instead.", file=sys.stderr)
+        log_format = "text"
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_size = os.environ.get("MCP_SERVER_LOG_QUEUE_SIZE", "").strip() or "0"
+    if not queue_size.isdigit():
+        print(f"Warning: Invalid log queue size '{queue_size}'. Using '0' instead.", file=sys.stderr)
+        queue_size = "0"
+
+    queue_full = os.environ.get("MCP_SERVER_LOG_QUEUE_FULL", "block").strip().lower()
+    if queue_full not in ("block", "drop"):
+        print(f"Warning: Invalid log queue policy '{queue_full}'. Using 'block' instead.", file=sys.stderr)
+        queue_full = "block"
+
+    if int(queue_size) > 0:
+        records: Queue[logging.LogRecord] = Queue(int(queue_size))
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = BoundedQueueHandler(records, block=queue_full == "block")
+        handlers = [_queue_handler]
+        atexit.register(stop_logging)
+        os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+    logging.basicConfig(level=log_level, handlers=handlers)
 
     _logging_configured = True
+
+
+# Per-request profiling modes:
+# - off: No profiling.
+# - cprofile: Deterministic profile of the selected calls with cProfile, saved as pstats files.
+# - sample: Stacks of the selected calls sampled at a fixed interval, saved as collapsed-stack files.
+PROFILE_MODES = ["off", "cprofile", "sample"]
+
+
+def get_profile_mode() -> str:
+    """Return the per-request profiling mode set by MCP_SERVER_PROFILE, "off" if not set."""
+    profile_mode = os.environ.get("MCP_SERVER_PROFILE", "").strip().lower() or "off"
+    if profile_mode not in PROFILE_MODES:
+        print(f"Warning: Invalid profile mode '{profile_mode}'. Using 'off' instead.", file=sys.stderr)
+        profile_mode = "off"
+    return profile_mode
@@ -0,0 +1,220 @@
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import pkgutil
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import mcp.types as types
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata
+from minimcp.server.managers.tool_manager import ToolManager
+from minimcp.utils.func import FuncDetails, extract_func_details
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the manifest files changes
+MANIFEST_VERSION = 5
+
+MANIFEST_DIR = Path(__file__).parent.parent / "manifests"
+
+
+@dataclass
+class ToolEntry:
+    """
+    A tool of a server manifest, with the function implementing it, its MCP definition, and the metadata
+    declared by its module, see minimcp_servers.core.metadata. With many set, the tool is the twin of a
+    unary scalar function, applying it to each element of a list.
+    """
+
+    name: str
+    module: str
+    function: str
+    definition: dict[str, Any]
+    pure: bool = True
+    idempotent: bool = True
+    cost: str | None = None
+    size: str | None = None
+    timeout: float | None = None
+    persistent: bool = False
+    many: bool = False
+
+
+@dataclass
+class Manifest:
+    """The tools of a server, with the fingerprint of the modules they were generated from."""
+
+    fingerprint: str
+    tools: list[ToolEntry]
+
+
+def manifest_fingerprint(module_names: list[str], namespaced: bool, many: bool = False) -> str:
+    """
+    Return the fingerprint of the tools generated from the given modules. It changes whenever the
+    source of a module changes, so that a stale manifest is never used. Modules are not imported.
+    """
+    digest = hashlib.sha256(f"{MANIFEST_VERSION}:{namespaced}:{many}".encode())
+    for module_name in module_names:
+        digest.update(module_name.encode())
+        spec = importlib.util.find_spec(module_name)
+        if spec is not None and spec.origin and spec.has_location:
+            digest.update(Path(spec.origin).read_bytes())
+    return digest.hexdigest()
+
+
+def manifest_path(server_name: str, directory: Path | None = None) -> Path:
+    """Return the path of the manifest file of the given server."""
+    return (directory or MANIFEST_DIR) / f"{server_name}.json"
+
+
+def load_manifest(server_name: str, fingerprint: str, directory: Path | None = None) -> Manifest | None:
+    """
+    Load the manifest of the given server.
+
+    Returns:
+        The manifest, None if there is none or if it does not match the fingerprint
+    """
+    path = manifest_path(server_name, directory)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Failed to read tool manifest '%s': %s", path, e)
+        return None
+
+    if data.get("fingerprint") != fingerprint:
+        logger.info("Tool manifest '%s' is stale, introspecting the modules instead", path)
+        return None
+
+    return Manifest(fingerprint, [ToolEntry(**entry) for entry in data["tools"]])
+
+
+def write_manifest(server_name: str, manifest: Manifest, directory: Path | None = None) -> Path:
+    """Write the manifest of the given server, and return its path."""
+    path = manifest_path(server_name, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(asdict(manifest), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+class LazyTool:
+    """
+    Handler of a tool bound to its function on first call. The module of the function is only
+    imported then, and the function is wrapped with bind.
+    """
+
+    module: str
+    function: str
+    _bind: Callable[[Callable], Callable]
+    _bound: Callable | None
+
+    def __init__(self, module: str, function: str, bind: Callable[[Callable], Callable]) -> None:
+        """
+        Args:
+            module: Name of the module of the function
+            function: Name of the function in the module
+            bind: Wraps the function into the tool handler
+        """
+        self.module = module
+        self.function = function
+        self._bind = bind
+        self._bound = None
+
+    def resolve(self) -> Callable:
+        """Import the function, and return the tool handler wrapping it."""
+        if self._bound is None:
+            func = getattr(importlib.import_module(self.module), self.function)
+            self._bound = self._bind(func)
+            logger.debug("Bound tool handler to function '%s.%s'", self.module, self.function)
+        return self._bound
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+
+class DeferredFuncDetails(FuncDetails):
+    """
+    FuncDetails of a function, whose argument model and validators are built on first access.
+    A LazyTool is resolved to its handler then.
+    """
+
+    _func: types.AnyFunction
+    _meta: FuncMetadata | None
+
+    def __init__(self, func: types.AnyFunction) -> None:
+        self._func = func
+        self._meta = None
+
+    @property
+    def built(self) -> bool:
+        return self._meta is not None
+
+    @property
+    def meta(self) -> FuncMetadata:  # pyright: ignore[reportIncompatibleVariableOverride]
+        if self._meta is None:
+            func = self._func.resolve() if isinstance(self._func, LazyTool) else self._func
+            self._meta = extract_func_details(func).meta
+        return self._meta
+
+
+class ToolRegistry(ToolManager):
+    """ToolManager that can also register tools from precomputed definitions, without introspection."""
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether a tool of the given name is registered."""
+        return name in self._tools
+
+    def add_definition(self, func: types.AnyFunction, definition: dict[str, Any]) -> types.Tool:
+        """
+        Add a tool with a precomputed MCP definition. The argument model and validators of the function
+        are only built when the tool is first called.
+        """
+        tool = types.Tool.model_validate(definition)
+        if tool.name in self._tools:
+            raise ValueError(f"Tool {tool.name} already registered")
+
+        self._tools[tool.name] = (tool, func, DeferredFuncDetails(func))
+        logger.debug("Tool %s added from its definition", tool.name)
+
+        return tool
+
+    async def call_function(self, name: str, args: dict[str, Any]) -> Any:
+        """Call a tool like call, and return the result of its function as is, without converting it to content."""
+        if name not in self._tools:
+            raise ValueError(f"Tool {name} not found")
+
+        _, handler, details = self._tools[name]
+        validated_args = details.meta.arg_model.model_validate(details.meta.pre_parse_json(args))
+
+        result = handler(**validated_args.model_dump_one_level())
+        if inspect.iscoroutine(result):
+            result = await result
+        return result
+
+
+def main() -> None:
+    """Generate the manifests of every server, by introspecting their modules."""
+    import minimcp_servers.servers
+
+    # Manifests must be generated from the modules, not from the current manifests
+    os.environ["MCP_SERVER_MANIFEST"] = "0"
+    os.environ.pop("MCP_SERVER_NAMESPACES", None)
+
+    for module_info in pkgutil.iter_modules(minimcp_servers.servers.__path__):
+        server_module = importlib.import_module(f"minimcp_servers.servers.{module_info.name}")
+        mcp = server_module.create_server()
+        if mcp.manifest is None:
+            continue
+
+        path = write_manifest(mcp.name, mcp.manifest)
+        print(f"Wrote {len(mcp.manifest.tools)} tools to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import functools
+import inspect
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import anyio
+import anyio.to_thread
+
+from minimcp_servers.core.cache import cache_key
+
+logger = logging.getLogger(__name__)
+
+# Seconds a write waits for another process holding the database lock
+BUSY_TIMEOUT = 5.0
+
+# Compaction evicts entries until the store is back under this fraction of its budget, so that it does not
+# run again on the next write
+COMPACT_TARGET = 0.8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memo_accessed ON memo (accessed);
+"""
+
+
+def encode_int(value: int) -> bytes:
+    """Encode an integer as signed little-endian bytes, in linear time unlike its decimal string."""
+    return value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True)
+
+
+def decode_int(data: bytes) -> int:
+    return int.from_bytes(data, "little", signed=True)
+
+
+class MemoStore:
+    """
+    Persistent store of the integer results of expensive pure tools, in a sqlite database.
+
+    The database is shared by every server process using the same path, so that a newly started stdio
+    server reuses the results computed by earlier ones. Entries are keyed on the function and canonical
+    arguments of a call, so servers exposing a function under different tool names share its results.
+    - Only results that took at least min_time seconds to compute are stored.
+    - Stored results hold at most max_bytes. Past that, the least recently read ones are deleted and
+      the freed pages are returned to the file system.
+
+    Errors of the database are logged and the call is computed as if nothing was stored: the store
+    is an optimization, and never makes a tool fail.
+    """
+
+    path: str
+    hits: int
+    misses: int
+    writes: int
+    evictions: int
+
+    _max_bytes: int
+    _min_time: float
+    _lock: threading.Lock
+    _connection: sqlite3.Connection | None
+
+    def __init__(self, path: str, max_bytes: int, min_time: float = 0.1) -> None:
+        """
+        Args:
+            path: Path of the database file, created on first use
+            max_bytes: Maximum size in bytes of the stored results
+            min_time: Minimum duration in seconds of a call for its result to be stored
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got {max_bytes}")
+
+        self.path = path
+        self._max_bytes = max_bytes
+        self._min_time = min_time
+        self._lock = threading.Lock()
+        self._connection = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use, so that building a server does not touch the disk
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            try:
+                # auto_vacuum only applies to a new database, and must be set before its tables are created
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                # Readers do not block writers of other processes
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute("PRAGMA synchronous = NORMAL")
+                connection.executescript(_SCHEMA)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> int | None:
+        """Return the result stored for key, None if there is none."""
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE memo SET accessed = ? WHERE key = ?", (time.time(), key))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Failed to read memo store '%s': %s", self.path, e)
+            return None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_int(row[0])
+
+    def put(self, key: str, value: int) -> None:
+        """Store a result, deleting the least recently read ones past max_bytes."""
+        data = encode_int(value)
+        if len(data) > self._max_bytes:
+            return
+
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO memo (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time()),
+                )
+                self.writes += 1
+                self._compact(connection)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Failed to write memo store '%s': %s", self.path, e)
+
+    def _compact(self, connection: sqlite3.Connection) -> None:
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM memo").fetchone()
+        if total <= self._max_bytes:
+            return
+
+        target = self._max_bytes * COMPACT_TARGET
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM memo ORDER BY accessed"):
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+
+        connection.executemany("DELETE FROM memo WHERE key = ?", evicted)
+        connection.execute("PRAGMA incremental_vacuum")
+        self.evictions += len(evicted)
+        logger.info("Evicted %d results from memo store '%s'", len(evicted), self.path)
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the store, for this process."""
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def wrap(self, function_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of func whose integer results are stored, keyed on function_name and the
+        arguments. The database is accessed from a worker thread, off the event loop. The wrapper keeps
+        the signature and docstring of func, so tool schemas are unaffected.
+        """
+
+        @functools.wraps(func)
+        async def memoized(**kwargs: Any) -> Any:
+            key = cache_key(function_name, kwargs)
+            if key is not None:
+                value = await anyio.to_thread.run_sync(self.get, key)
+                if value is not None:
+                    return value
+
+            start = time.perf_counter()
+            result = func(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            elapsed = time.perf_counter() - start
+
+            if key is not None and type(result) is int and elapsed >= self._min_time:
+                await anyio.to_thread.run_sync(self.put, key, result)
+            return result
+
+        return memoized
@@ -0,0 +1,53 @@
+import inspect
+from types import ModuleType
+from typing import Any
+
+# Cost classes of the tools, by how the cost of a call grows with its input:
+# - constant: O(1) tools, whose calls take microseconds.
+# - linear: Tools whose cost grows with the size of their input.
+# - superlinear: Tools whose cost grows faster than their input, such as factorial, taking up to seconds.
+COST_CLASSES = ("constant", "linear", "superlinear")
+
+# Metadata a module may declare for each of its functions, with their defaults. The modules of the servers declare
+# every function, with its cost, so that none is cached as pure or inferred as cheap by default
+TOOL_METADATA: dict[str, Any] = {
+    # Same arguments, same result, without side effects. Results of pure tools are cached
+    "pure": True,
+    # Concurrent calls with the same arguments may share one result, even when the tool is impure
+    "idempotent": True,
+    # Cost class of the tool, one of COST_CLASSES. Inferred from its arguments if not declared
+    "cost": None,
+    # Name of the argument driving the input size of a call. Inferred from the signature if not declared
+    "size": None,
+    # Deadline in seconds of a call, overriding the default deadline of the server
+    "timeout": None,
+    # Results take seconds to compute, and are kept in the persistent memo store when it is enabled
+    "persistent": False,
+}
+
+
+def module_metadata(module: ModuleType) -> dict[str, dict[str, Any]]:
+    """
+    Return the metadata of the functions of a module, by function name, from its __tools__ attribute:
+    a dict of the metadata of each function, as declared in TOOL_METADATA. Functions not declared there
+    get the defaults.
+
+    Raises:
+        ValueError: When metadata is declared for an unknown function, or is invalid
+    """
+    metadata = {}
+    for name, fields in getattr(module, "__tools__", {}).items():
+        func = getattr(module, name, None)
+        if not callable(func):
+            raise ValueError(f"Metadata declared for unknown function '{name}' of module '{module.__name__}'")
+
+        unknown_fields = fields.keys() - TOOL_METADATA.keys()
+        if unknown_fields:
+            raise ValueError(f"Unknown metadata {sorted(unknown_fields)} of function '{name}'")
+        if fields.get("cost") not in (None, *COST_CLASSES):
+            raise ValueError(f"Unknown cost class '{fields['cost']}' of function '{name}', must be in {COST_CLASSES}")
+        if fields.get("size") is not None and fields["size"] not in inspect.signature(func).parameters:
+            raise ValueError(f"Size argument '{fields['size']}' is not a parameter of function '{name}'")
+
+        metadata[name] = TOOL_METADATA | fields
+    return metadata
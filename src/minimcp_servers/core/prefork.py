@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable
+from multiprocessing.process import BaseProcess
+
+from minimcp_servers.core.logger import stop_logging
+
+logger = logging.getLogger(__name__)
+
+# Time given to a worker to shut down gracefully before it is killed
+WORKER_SHUTDOWN_GRACE = 10.0
+
+# Workers exiting sooner than this after their start failed to start. They are restarted after a delay doubling
+# with each failure in a row, up to WORKER_RESTART_BACKOFF_MAX, and the supervisor gives up after
+# WORKER_STARTUP_FAILURES of them
+WORKER_MIN_UPTIME = 5.0
+WORKER_RESTART_BACKOFF_MAX = 60.0
+WORKER_STARTUP_FAILURES = 5
+
+
+class WorkerStartupError(RuntimeError):
+    """Raised when a worker process keeps exiting right after its start"""
+
+    pass
+
+
+def reuse_port_socket(host: str, port: int) -> socket.socket:
+    """
+    Return a socket bound to host and port with SO_REUSEPORT, so that several processes can
+    listen on the same port and the kernel balances incoming connections between them.
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def worker_rss(pid: int) -> int | None:
+    """Return the resident memory in bytes of the given process, None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(target: Callable[[], None]) -> None:
+    # Signal handlers are inherited from the supervisor on fork, restore the defaults
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        target()
+    finally:
+        # Workers exit without running atexit handlers, write the queued log records first
+        stop_logging()
+
+
+class Supervisor:
+    """
+    Runs a target in several pre-forked worker processes and keeps them running.
+    - A worker that exits is replaced by a new one. A worker exiting right after its start is replaced after an
+      exponential backoff, and run() raises WorkerStartupError after WORKER_STARTUP_FAILURES such exits in a row.
+    - A worker whose resident memory exceeds max_memory is asked to shut down gracefully and replaced.
+    - On SIGINT or SIGTERM, all the workers are shut down.
+
+    Workers are forked, so the target may use any state prepared by the supervisor before run().
+    """
+
+    _target: Callable[[], None]
+    _workers: int
+    _max_memory: int | None
+    _check_interval: float
+    _min_uptime: float
+    _running: list[BaseProcess]
+    _started_at: list[float]
+    _failures: list[int]
+    _restart_at: list[float | None]
+    _retiring: list[tuple[BaseProcess, float]]
+    _stopping: threading.Event
+
+    def __init__(
+        self,
+        target: Callable[[], None],
+        workers: int,
+        max_memory: int | None = None,
+        check_interval: float = 1.0,
+        min_uptime: float = WORKER_MIN_UPTIME,
+    ) -> None:
+        """
+        Args:
+            target: Function run by each worker process
+            workers: Number of worker processes
+            max_memory: Resident memory ceiling of a worker in bytes, None for no ceiling
+            check_interval: Time in seconds between checks of the workers, and first delay of the backoff
+            min_uptime: Time in seconds under which a worker exiting failed to start
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Pre-forking workers is not supported on this platform")
+
+        self._target = target
+        self._workers = workers
+        self._max_memory = max_memory or None
+        self._check_interval = check_interval
+        self._min_uptime = min_uptime
+        self._context = multiprocessing.get_context("fork")
+        self._running = []
+        self._started_at = []
+        self._failures = []
+        self._restart_at = []
+        self._retiring = []
+        self._stopping = threading.Event()
+
+    def _start_worker(self) -> BaseProcess:
+        process = self._context.Process(target=_worker_main, args=(self._target,))
+        process.start()
+        logger.info("Started worker process %s", process.pid)
+        return process
+
+    def _replace_worker(self, index: int) -> None:
+        self._running[index] = self._start_worker()
+        self._started_at[index] = time.monotonic()
+
+    def _check_workers(self) -> None:
+        for index, process in enumerate(self._running):
+            if not process.is_alive():
+                now = time.monotonic()
+                restart_at = self._restart_at[index]
+                if restart_at is None:
+                    process.join()
+                    failed = now - self._started_at[index] < self._min_uptime
+                    failures = self._failures[index] = self._failures[index] + 1 if failed else 0
+                    if failures >= WORKER_STARTUP_FAILURES:
+                        raise WorkerStartupError(
+                            f"Worker process {process.pid} exited with code {process.exitcode}, "
+                            f"{failures} workers in a row exited right after their start"
+                        )
+                    delay = min(self._check_interval * 2 ** (failures - 1), WORKER_RESTART_BACKOFF_MAX) if failed else 0
+                    logger.warning(
+                        "Worker process %s exited with code %s, restarting in %.1f seconds",
+                        process.pid,
+                        process.exitcode,
+                        delay,
+                    )
+                    restart_at = self._restart_at[index] = now + delay
+                if now >= restart_at:
+                    self._restart_at[index] = None
+                    self._replace_worker(index)
+                continue
+
+            rss = worker_rss(process.pid) if self._max_memory and process.pid else None
+            if rss is not None and self._max_memory and rss > self._max_memory:
+                logger.warning("Worker process %s uses %d bytes of memory, restarting", process.pid, rss)
+                process.terminate()
+                self._retiring.append((process, time.monotonic() + WORKER_SHUTDOWN_GRACE))
+                self._replace_worker(index)
+
+        for process, deadline in list(self._retiring):
+            if not process.is_alive():
+                process.join()
+                self._retiring.remove((process, deadline))
+            elif time.monotonic() > deadline:
+                logger.warning("Worker process %s did not shut down in time, killing it", process.pid)
+                process.kill()
+
+    def _shutdown(self) -> None:
+        processes = self._running + [process for process, _ in self._retiring]
+        for process in processes:
+            process.terminate()
+
+        deadline = time.monotonic() + WORKER_SHUTDOWN_GRACE
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+        self._running = []
+        self._retiring = []
+
+    def stop(self) -> None:
+        """Ask the supervisor to shut down the workers and return from run()."""
+        self._stopping.set()
+
+    def run(self) -> None:
+        """
+        Start the workers and supervise them until stopped.
+
+        Raises:
+            WorkerStartupError: If workers keep exiting right after their start
+        """
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop())
+
+        self._started_at = [time.monotonic()] * self._workers
+        self._failures = [0] * self._workers
+        self._restart_at = [None] * self._workers
+        self._running = [self._start_worker() for _ in range(self._workers)]
+        try:
+            while not self._stopping.wait(self._check_interval):
+                self._check_workers()
+        finally:
+            logger.info("Shutting down %d worker processes", len(self._running))
+            self._shutdown()
@@ -0,0 +1,234 @@
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from types import FrameType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Characters of tool names kept in file names
+_UNSAFE_CHARS = re.compile(r"[^\w.-]")
+
+
+class _SampledCall:
+    """Call being sampled: the frame of its wrapper, under which its stacks are collected, and its stack counts."""
+
+    __slots__ = ("root", "stacks")
+
+    root: FrameType
+    stacks: Counter[str]
+
+    def __init__(self, root: FrameType) -> None:
+        self.root = root
+        self.stacks = Counter()
+
+
+def collapse_stack(frame: FrameType, root: FrameType | None = None) -> str:
+    """
+    Return a stack in collapsed format, from its outermost frame to frame, separated by semicolons.
+    Frames from root outwards are left out.
+    """
+    names = []
+    current: FrameType | None = frame
+    while current is not None and current is not root:
+        code = current.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        current = current.f_back
+    return ";".join(reversed(names))
+
+
+class CallProfiler:
+    """
+    Profiles the calls of synchronous tools, and saves the profiles of slow calls per tool, to find out
+    why they are slow.
+    - In "cprofile" mode, the selected calls run under cProfile. Their profiles are added up per tool and
+      saved as a pstats file, to open with python -m pstats or snakeviz.
+    - In "sample" mode, a background thread samples the stack of the threads running the selected calls
+      every interval seconds. Counts of the stacks are added up per tool and saved as a collapsed-stack
+      file, to render with flamegraph.pl or speedscope. Overhead does not depend on the depth of the calls.
+
+    A fraction rate of the calls is selected, and the profile of a selected call is kept when it lasts at
+    least threshold seconds. Files are named after the tool and the process id, so that the workers of a
+    server do not overwrite each other's, and are rewritten with each kept profile.
+
+    cProfile hooks the whole process from Python 3.12, so in "cprofile" mode one call is profiled at a time:
+    calls selected while another one is profiled, or while another profiler such as a debugger is active,
+    run unprofiled. Failures of the profiler never change the result or the exception of a call.
+    """
+
+    mode: str
+    directory: str
+    threshold: float
+    rate: float
+    interval: float
+    captured: int
+
+    _lock: threading.Lock
+    _cprofile_lock: threading.Lock
+    _profiles: dict[str, pstats.Stats]
+    _stacks: dict[str, Counter[str]]
+    _sampled: dict[int, _SampledCall]
+    _calls_started: threading.Condition
+    _sampler: threading.Thread | None
+
+    def __init__(
+        self, mode: str, directory: str, threshold: float = 0.1, rate: float = 1.0, interval: float = 0.005
+    ) -> None:
+        """
+        Args:
+            mode: "cprofile" or "sample"
+            directory: Directory of the profile files, created on first write
+            threshold: Minimum duration in seconds of a call for its profile to be kept
+            rate: Fraction of the calls profiled, between 0 and 1
+            interval: Interval in seconds between two samples, in "sample" mode
+        """
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Invalid profile mode '{mode}', must be 'cprofile' or 'sample'")
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+
+        self.mode = mode
+        self.directory = directory
+        self.threshold = threshold
+        self.rate = rate
+        self.interval = interval
+        self.captured = 0
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._profiles = {}
+        self._stacks = {}
+        self._sampled = {}
+        self._calls_started = threading.Condition(self._lock)
+        self._sampler = None
+
+    def path(self, tool_name: str) -> str:
+        """Return the path of the profile file of a tool."""
+        extension = "pstats" if self.mode == "cprofile" else "collapsed"
+        return os.path.join(self.directory, f"{_UNSAFE_CHARS.sub('_', tool_name)}.{os.getpid()}.{extension}")
+
+    def wrap(self, tool_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of func whose calls are profiled, to wrap before offloading, so that profiles are
+        taken in the thread running func. Coroutine functions are returned as is, as their profiles would
+        include the other tasks of the event loop. The wrapper keeps the signature and docstring of func,
+        so tool schemas are unaffected.
+        """
+        if inspect.iscoroutinefunction(func):
+            return func
+
+        run = self._run_cprofile if self.mode == "cprofile" else self._run_sampled
+
+        @functools.wraps(func)
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            if self.rate < 1.0 and random.random() >= self.rate:
+                return func(*args, **kwargs)
+            return run(tool_name, func, args, kwargs)
+
+        return profiled
+
+    def _run_cprofile(self, tool_name: str, func: Callable[..., Any], args: tuple, kwargs: dict[str, Any]) -> Any:
+        if not self._cprofile_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is active
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.threshold:
+                    self._keep_profile(tool_name, profile, elapsed)
+        finally:
+            self._cprofile_lock.release()
+
+    def _keep_profile(self, tool_name: str, profile: cProfile.Profile, elapsed: float) -> None:
+        # Called while the call returns or raises, so errors are logged rather than raised
+        with self._lock:
+            try:
+                stats = self._profiles.get(tool_name)
+                if stats is None:
+                    stats = self._profiles[tool_name] = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except Exception as e:
+                logger.warning("Failed to keep profile of tool '%s': %s", tool_name, e)
+                return
+            self.captured += 1
+            self._save(tool_name, elapsed, stats.dump_stats)
+
+    def _run_sampled(self, tool_name: str, func: Callable[..., Any], args: tuple, kwargs: dict[str, Any]) -> Any:
+        thread_id = threading.get_ident()
+        call = _SampledCall(sys._getframe())
+        with self._lock:
+            self._sampled[thread_id] = call
+            self._start_sampler()
+            self._calls_started.notify()
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                del self._sampled[thread_id]
+                if elapsed >= self.threshold and call.stacks:
+                    stacks = self._stacks.setdefault(tool_name, Counter())
+                    stacks.update(call.stacks)
+                    self.captured += 1
+                    self._save(tool_name, elapsed, functools.partial(_write_collapsed, stacks))
+
+    def _start_sampler(self) -> None:
+        # Started on the first sampled call, and kept waiting on the condition while no call is sampled
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_loop, name="minimcp-profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._sampled:
+                    self._calls_started.wait()
+            time.sleep(self.interval)
+
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, call in self._sampled.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        call.stacks[collapse_stack(frame, call.root)] += 1
+            del frames
+
+    def _save(self, tool_name: str, elapsed: float, write: Callable[[str], None]) -> None:
+        """Write the profile file of a tool through a temporary file, so that readers never see it partial."""
+        path = self.path(tool_name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning("Failed to save profile of tool '%s' to '%s': %s", tool_name, path, e)
+            return
+        logger.info("Profiled slow call of tool '%s' (%.3f s), saved to '%s'", tool_name, elapsed, path)
+
+
+def _write_collapsed(stacks: Counter[str], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common() if stack)
@@ -0,0 +1,304 @@
+import json
+import logging
+import math
+from collections.abc import Hashable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeGuard
+
+import anyio
+import mcp.types as types
+from minimcp import Message, MiniMCP, NoMessage, Send
+from minimcp.server.exceptions import InvalidParamsError
+from minimcp.utils.model import to_json
+from pydantic import ValidationError
+
+from minimcp_servers.core.admission import (
+    INVALID_REQUEST,
+    SERVER_BUSY,
+    AdmissionControl,
+    ServerBusyError,
+    message_id,
+)
+from minimcp_servers.core.cache import ResultCache
+from minimcp_servers.core.codec import Codec, get_codec
+from minimcp_servers.core.manifest import Manifest, ToolRegistry
+from minimcp_servers.core.singleflight import SingleFlight
+from minimcp_servers.core.stats import ServerStats
+
+if TYPE_CHECKING:
+    # Imported by mcp_from_module when the memo store or the profiler are enabled, as sqlite3, cProfile and pstats
+    # would slow down the start of every server
+    from minimcp_servers.core.memo import MemoStore
+    from minimcp_servers.core.profiler import CallProfiler
+
+logger = logging.getLogger(__name__)
+
+# Implementation defined JSON-RPC server error, returned when a tool call exceeds its deadline
+REQUEST_TIMEOUT = -32001
+
+# Handler time limit of MiniMCP when tool calls may run without a deadline, a year, as MiniMCP takes an integer
+UNLIMITED_IDLE_TIMEOUT = 365 * 24 * 3600
+
+# Maximum number of messages of a JSON-RPC batch handled at the same time
+BATCH_CONCURRENCY = 32
+
+# Session of the messages being handled, set by transports serving several clients with one server. Requests in
+# flight are keyed on their session and id, so that a client can only cancel its own requests.
+current_session: ContextVar[Hashable | None] = ContextVar("current_session", default=None)
+
+# The message being handled, with its decoded JSON, so that MiniMCP does not decode it again
+_decoded_message: ContextVar[tuple[Message, Any] | None] = ContextVar("decoded_message", default=None)
+
+
+@dataclass
+class _InFlightRequest:
+    cancel_scope: anyio.CancelScope = field(default_factory=anyio.CancelScope)
+    cancelled_by_client: bool = False
+
+
+class ToolServer(MiniMCP):
+    """
+    MiniMCP server that enforces deadlines on tool calls and honors cancellation from the client.
+    - A tool call running past its deadline is cancelled, and a JSON-RPC error with code
+      REQUEST_TIMEOUT is returned.
+    - A request named in a notifications/cancelled message from the client is cancelled, and
+      no response is sent for it. Only requests of the same session, see current_session, can be cancelled.
+    - JSON-RPC batches, arrays of messages, are handled concurrently and answered with one array
+      of responses.
+
+    Messages are decoded once, with the given codec.
+
+    With admission control set, messages over its maximum frame size are rejected before being decoded, and
+    tool calls run once admitted. Calls the server is too busy to run or queue get a SERVER_BUSY error, which
+    clients may retry. Tool calls of a batch are never rejected, they wait for a slot: the batch already
+    bounds how many of them run at the same time.
+
+    Cancelling a call stops tools running in a worker process, as the worker is killed. Tools running
+    in a worker thread are abandoned and their result discarded, and tools running inline on the
+    event loop can only be interrupted once they return.
+    """
+
+    tool: ToolRegistry
+    manifest: Manifest | None
+    result_cache: ResultCache | None
+    memo_store: "MemoStore | None"
+    stats: ServerStats | None
+    profiler: "CallProfiler | None"
+    admission: AdmissionControl | None
+    single_flight: SingleFlight | None
+    codec: Codec
+    _timeout: float | None
+    _tool_timeouts: dict[str, float]
+    _in_flight: dict[tuple[Hashable | None, str | int], _InFlightRequest]
+
+    def __init__(
+        self,
+        name: str,
+        version: str | None = None,
+        instructions: str | None = None,
+        timeout: float | None = None,
+        tool_timeouts: Mapping[str, float] | None = None,
+        codec: Codec | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            name: The name of the MCP server
+            version: The version of the MCP server
+            instructions: The instructions for the MCP server
+            timeout: Deadline in seconds of tool calls, None or 0 for no deadline
+            tool_timeouts: Deadline in seconds by tool name, overriding timeout
+            codec: JSON codec decoding messages, defaults to the fastest installed one
+            kwargs: Other arguments passed to MiniMCP
+        """
+        self._timeout = timeout or None
+        self._tool_timeouts = dict(tool_timeouts or {})
+        self._in_flight = {}
+        self.codec = codec or get_codec()
+
+        # MiniMCP's own handler time limit is kept as a backstop, beyond every tool deadline. When a tool has
+        # no deadline, it is pushed out of reach, as MiniMCP fails calls cancelled by it instead of answering.
+        deadlines = [timeout, *self._tool_timeouts.values()]
+        if all(t and t > 0 for t in deadlines):
+            kwargs.setdefault("idle_timeout", max(30, math.ceil(max(t for t in deadlines if t)) + 1))
+        else:
+            kwargs.setdefault("idle_timeout", UNLIMITED_IDLE_TIMEOUT)
+
+        super().__init__(name, version=version, instructions=instructions, **kwargs)
+        self.tool = ToolRegistry(self._core)  # pyright: ignore[reportIncompatibleVariableOverride]
+        self.manifest = None
+        self.result_cache = None
+        self.memo_store = None
+        self.stats = None
+        self.profiler = None
+        self.admission = None
+        self.single_flight = None
+
+    def tool_timeout(self, tool_name: str) -> float | None:
+        """Return the deadline in seconds of the given tool, None if calls are not limited."""
+        timeout = self._tool_timeouts.get(tool_name, self._timeout)
+        return timeout if timeout and timeout > 0 else None
+
+    async def handle(self, message: Message, send: Send | None = None, scope: Any | None = None) -> Message | NoMessage:
+        if self.admission is not None and self.admission.oversized(message):
+            logger.warning("Rejected message of %d characters, over the maximum frame size", len(message))
+            return _oversized_error(message, self.admission.max_frame_bytes)
+
+        try:
+            rpc_msg = self.codec.loads(message)
+        except ValueError:
+            rpc_msg = None
+
+        if isinstance(rpc_msg, list) and rpc_msg:
+            return await self._handle_batch(rpc_msg, send, scope)
+        return await self._handle_message(rpc_msg, message, send, scope)
+
+    async def _handle_batch(self, rpc_msgs: list[Any], send: Send | None, scope: Any | None) -> Message | NoMessage:
+        """
+        Handle the messages of a JSON-RPC batch concurrently, and return their responses in one array.
+        Nothing is returned when the batch holds only notifications.
+        """
+        responses: list[Message | NoMessage] = [NoMessage.NOTIFICATION] * len(rpc_msgs)
+        limiter = anyio.Semaphore(BATCH_CONCURRENCY)
+
+        async def handle_entry(index: int, rpc_msg: Any) -> None:
+            async with limiter:
+                message = self.codec.dumps(rpc_msg)
+                responses[index] = await self._handle_message(rpc_msg, message, send, scope, wait=True)
+
+        async with anyio.create_task_group() as tg:
+            for index, rpc_msg in enumerate(rpc_msgs):
+                tg.start_soon(handle_entry, index, rpc_msg)
+
+        replies = [response for response in responses if not isinstance(response, NoMessage)]
+        if not replies:
+            return NoMessage.NOTIFICATION
+        return f"[{','.join(replies)}]"
+
+    async def _handle_message(
+        self, rpc_msg: Any, message: Message, send: Send | None, scope: Any | None, wait: bool = False
+    ) -> Message | NoMessage:
+        if not isinstance(rpc_msg, dict):
+            # Invalid messages, nested batches included, are reported by MiniMCP
+            return await super().handle(message, send, scope)
+
+        method = rpc_msg.get("method")
+        if method == "notifications/cancelled":
+            self._cancel(rpc_msg.get("params"))
+            return NoMessage.NOTIFICATION
+
+        request_id = rpc_msg.get("id")
+        if request_id is not None and not _is_request_id(request_id):
+            # MiniMCP fails to report them, as the SDK models of its errors only take string or integer ids
+            return _invalid_id_error(request_id)
+        if request_id is None or not isinstance(method, str):
+            return await self._handle_decoded(rpc_msg, message, send, scope)
+
+        tool_name = None
+        timeout = None
+        if method == "tools/call":
+            params = rpc_msg.get("params")
+            tool_name = params.get("name") if isinstance(params, dict) else None
+            timeout = self.tool_timeout(tool_name) if isinstance(tool_name, str) else None
+
+        request = _InFlightRequest()
+        if timeout is not None:
+            request.cancel_scope.deadline = anyio.current_time() + timeout
+
+        # A request reusing the id of one of its session still in flight runs, but cannot be cancelled
+        key = (current_session.get(), request_id)
+        tracked = key not in self._in_flight
+        if tracked:
+            self._in_flight[key] = request
+        else:
+            logger.warning("Request id %s is already in flight, the request cannot be cancelled", request_id)
+        try:
+            with request.cancel_scope:
+                if self.admission is None or method != "tools/call":
+                    return await self._handle_decoded(rpc_msg, message, send, scope)
+                # Unknown tools do not get a slot of their own, so that their names cannot grow the limits.
+                # Names that are not strings are unknown, and reported as invalid by MiniMCP.
+                known = isinstance(tool_name, str) and tool_name in self.tool
+                async with self.admission.admit(tool_name if known else None, wait):
+                    return await self._handle_decoded(rpc_msg, message, send, scope)
+        except ServerBusyError as e:
+            return _busy_error(request_id, e)
+        finally:
+            if tracked:
+                del self._in_flight[key]
+
+        # Reached only when the request was cancelled
+        if request.cancelled_by_client:
+            logger.info("Request %s cancelled by the client", request_id)
+            return NoMessage.RESPONSE
+
+        logger.warning("Tool '%s' timed out after %s seconds", tool_name, timeout)
+        return _timeout_error(request_id, tool_name, timeout)
+
+    async def _handle_decoded(
+        self, rpc_msg: dict[str, Any], message: Message, send: Send | None, scope: Any | None
+    ) -> Message | NoMessage:
+        """Handle a message with MiniMCP, passing on its decoded JSON."""
+        token = _decoded_message.set((message, rpc_msg))
+        try:
+            return await super().handle(message, send, scope)
+        finally:
+            _decoded_message.reset(token)
+
+    def _parse_message(self, message: Message) -> tuple[str | int, types.JSONRPCMessage]:
+        decoded = _decoded_message.get()
+        if decoded is None or decoded[0] is not message:
+            return super()._parse_message(message)
+
+        rpc_msg = decoded[1]
+        try:
+            return rpc_msg.get("id", ""), types.JSONRPCMessage.model_validate(rpc_msg)
+        except ValidationError as e:
+            raise InvalidParamsError(str(e)) from e
+
+    def _cancel(self, params: Any) -> None:
+        request_id = params.get("requestId") if isinstance(params, dict) else None
+        request = self._in_flight.get((current_session.get(), request_id)) if _is_request_id(request_id) else None
+        if request is None:
+            logger.debug("Ignoring cancellation of unknown request %s", request_id)
+            return
+
+        logger.debug("Cancelling request %s: %s", request_id, params.get("reason"))
+        request.cancelled_by_client = True
+        request.cancel_scope.cancel()
+
+
+def _is_request_id(request_id: Any) -> TypeGuard[str | int]:
+    return isinstance(request_id, (str, int)) and not isinstance(request_id, bool)
+
+
+def _timeout_error(request_id: str | int, tool_name: str | None, timeout: float | None) -> Message:
+    error = types.ErrorData(
+        code=REQUEST_TIMEOUT,
+        message=f"Tool '{tool_name}' timed out after {timeout} seconds",
+        data={"tool": tool_name, "timeout": timeout},
+    )
+    return to_json(types.JSONRPCMessage(types.JSONRPCError(jsonrpc="2.0", id=request_id, error=error)))
+
+
+def _busy_error(request_id: str | int, e: ServerBusyError) -> Message:
+    error = types.ErrorData(code=SERVER_BUSY, message=str(e), data={"tool": e.tool_name, "retryable": True})
+    return to_json(types.JSONRPCMessage(types.JSONRPCError(jsonrpc="2.0", id=request_id, error=error)))
+
+
+def _invalid_id_error(request_id: Any) -> Message:
+    # Built by hand, with a null id, see _oversized_error
+    error = {"code": INVALID_REQUEST, "message": f"Invalid request id {request_id!r}, a string or integer is expected"}
+    return json.dumps({"jsonrpc": "2.0", "id": None, "error": error}, separators=(",", ":"))
+
+
+def _oversized_error(message: Message, max_frame_bytes: int) -> Message:
+    # Built by hand, as JSON-RPC errors have a null id when the id of the request cannot be read, which
+    # the models of the MCP SDK do not allow
+    error = {
+        "code": INVALID_REQUEST,
+        "message": f"Message exceeds the maximum frame size of {max_frame_bytes} bytes",
+        "data": {"maxFrameBytes": max_frame_bytes},
+    }
+    return json.dumps({"jsonrpc": "2.0", "id": message_id(message), "error": error}, separators=(",", ":"))
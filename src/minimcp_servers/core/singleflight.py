@@ -0,0 +1,111 @@
+import functools
+import json
+from collections.abc import Callable
+from typing import Any
+
+import anyio
+
+
+def _canonical_dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Flight:
+    """Call in flight. The event is only created once a second caller waits for the call."""
+
+    __slots__ = ("done", "finished", "result", "error")
+
+    done: anyio.Event | None
+    finished: bool
+    result: Any
+    error: Exception | None
+
+    def __init__(self) -> None:
+        self.done = None
+        self.finished = False
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Merges identical concurrent calls of idempotent tools: while a call runs, later calls with the same tool name and
+    arguments wait for it and get its result, or its exception, instead of running again.
+
+    When the running call is cancelled, by its client or its deadline, the calls waiting for it are not: one of
+    them runs the call in turn. Calls are merged on the event loop only, the registry is not thread-safe.
+    """
+
+    merged: int
+
+    _dumps: Callable[[Any], str]
+    _flights: dict[str, _Flight]
+
+    def __init__(self, dumps: Callable[[Any], str] | None = None) -> None:
+        """
+        Args:
+            dumps: JSON encoder of the arguments of calls, defaults to the standard library with sorted keys.
+                Arguments are validated before the call, so their keys are in a canonical order unless they
+                hold dicts of their own, which an encoder not sorting keys only fails to merge.
+        """
+        self.merged = 0
+        self._dumps = dumps or _canonical_dumps
+        self._flights = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def key(self, tool_name: str, kwargs: dict[str, Any]) -> str | None:
+        """Return the key of a call, None if its arguments cannot be encoded."""
+        try:
+            return f"{tool_name}:{self._dumps(kwargs)}"
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    def wrap(self, tool_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a version of the coroutine function func whose identical concurrent calls are merged. The wrapper
+        keeps the signature and docstring of func, so tool schemas are unaffected. Tools are called with keyword
+        arguments only.
+        """
+        flights = self._flights
+
+        @functools.wraps(func)
+        async def single_flight(**kwargs: Any) -> Any:
+            key = self.key(tool_name, kwargs)
+            if key is None:
+                return await func(**kwargs)
+
+            flight = flights.get(key)
+            if flight is not None:
+                self.merged += 1
+                # Loops when the running call was cancelled, until this call runs or waits for another
+                while flight is not None:
+                    if flight.done is None:
+                        flight.done = anyio.Event()
+                    await flight.done.wait()
+                    if flight.finished:
+                        if flight.error is not None:
+                            raise flight.error
+                        return flight.result
+                    flight = flights.get(key)
+
+            flight = flights[key] = _Flight()
+            try:
+                flight.result = await func(**kwargs)
+                flight.finished = True
+                return flight.result
+            except Exception as e:
+                flight.error = e
+                flight.finished = True
+                raise
+            finally:
+                del flights[key]
+                if flight.done is not None:
+                    flight.done.set()
+
+        return single_flight
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of calls in flight, and of calls merged into another one."""
+        return {"in_flight": len(self._flights), "merged": self.merged}
@@ -0,0 +1,252 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, get_origin
+
+import anyio
+import anyio.to_thread
+
+if TYPE_CHECKING:
+    from minimcp_servers.core.server import ToolServer
+
+logger = logging.getLogger(__name__)
+
+STATS_TOOL_NAME = "server_stats"
+
+# Latency bucket i counts the calls lasting less than 2**(i + 10) ns: about 1 µs, 2 µs, 4 µs ... 17 s, and beyond
+LATENCY_BUCKETS = 26
+_LATENCY_SHIFT = 10
+
+# Input size bucket i counts the calls with an input size below 2**i: 0, 1, 2-3, 4-7 ... and beyond
+SIZE_BUCKETS = 32
+
+# Labels of the buckets in the snapshots, by upper bound
+_LATENCY_LABELS = [f"<{2 ** (i + _LATENCY_SHIFT) / 1e6:g}" for i in range(LATENCY_BUCKETS - 1)] + [
+    f">={2 ** (LATENCY_BUCKETS - 2 + _LATENCY_SHIFT) / 1e6:g}"
+]
+_SIZE_LABELS = [f"<{2**i}" for i in range(SIZE_BUCKETS - 1)] + [f">={2 ** (SIZE_BUCKETS - 2)}"]
+
+
+def _histogram(counts: list[int], labels: list[str]) -> dict[str, int]:
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+class ToolStats:
+    """
+    Counters of the calls of a tool. Histograms are lists allocated once, with one counter per bucket,
+    so that recording a call is a few integer operations. The number of calls is the sum of the latency
+    histogram.
+    """
+
+    __slots__ = ("errors", "total_ns", "max_ns", "latency", "sizes")
+
+    errors: int
+    total_ns: int
+    max_ns: int
+    latency: list[int]
+    sizes: list[int]
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.latency = [0] * LATENCY_BUCKETS
+        self.sizes = [0] * SIZE_BUCKETS
+
+    @property
+    def calls(self) -> int:
+        return sum(self.latency)
+
+    def percentile_ms(self, q: float) -> float:
+        """Return an upper bound of the q-th percentile of the latency in ms, from the histogram."""
+        rank = q * self.calls
+        seen = 0
+        for index, count in enumerate(self.latency):
+            seen += count
+            if seen >= rank and count:
+                return min(2 ** (index + _LATENCY_SHIFT), self.max_ns) / 1e6
+        return self.max_ns / 1e6
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters as a JSON serializable dict, with the non-empty buckets only."""
+        calls = self.calls
+        return {
+            "calls": calls,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ns / calls / 1e6, 4) if calls else 0.0,
+            "p50_ms": round(self.percentile_ms(0.5), 4),
+            "p95_ms": round(self.percentile_ms(0.95), 4),
+            "p99_ms": round(self.percentile_ms(0.99), 4),
+            "max_ms": round(self.max_ns / 1e6, 4),
+            "latency_ms": _histogram(self.latency, _LATENCY_LABELS),
+            "input_size": _histogram(self.sizes, _SIZE_LABELS),
+        }
+
+
+def _int_size(value: int) -> int:
+    return value.bit_length() >> 6
+
+
+def size_parameter(func: Callable[..., Any], name: str | None = None) -> tuple[str, Callable[[Any], int]] | None:
+    """
+    Return the parameter of func driving its input size, with the function measuring its value: the
+    parameter of the given name when declared, or else the first required parameter annotated as a string,
+    bytes, a container or an integer. Measures match input_size, containers count their length and integers
+    their 64-bit words.
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return None
+
+    for param in parameters:
+        if name is not None:
+            if param.name != name:
+                continue
+        elif param.default is not param.empty:
+            continue
+        annotation = get_origin(param.annotation) or param.annotation
+        if annotation in (str, bytes, list, tuple, dict):
+            return param.name, len
+        if annotation is int:
+            return param.name, _int_size
+    return None
+
+
+class ServerStats:
+    """
+    Call counts, error counts, latency and input size histograms of the tools of a server.
+
+    Tools are instrumented by wrap, at a cost well below a microsecond per call: two clock reads and a few
+    integer operations. Counters are updated from the event loop only, they are not thread-safe.
+    """
+
+    tools: dict[str, ToolStats]
+    started: float
+
+    def __init__(self) -> None:
+        self.tools = {}
+        self.started = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters of the tools called so far, as a JSON serializable dict."""
+        snapshots = {name: stats.snapshot() for name, stats in sorted(self.tools.items())}
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "tools": {name: snapshot for name, snapshot in snapshots.items() if snapshot["calls"]},
+        }
+
+    def wrap(self, tool_name: str, func: Callable[..., Any], size: str | None = None) -> Callable[..., Any]:
+        """
+        Return a version of func whose calls are counted and timed, with the size of their size argument,
+        inferred from the signature of func if not given. The wrapper keeps the signature and docstring of
+        func, so tool schemas are unaffected. Tools are called with keyword arguments only.
+        """
+        stats = self.tools.setdefault(tool_name, ToolStats())
+        latency = stats.latency
+        sizes = stats.sizes
+        last_latency = LATENCY_BUCKETS - 1
+        last_size = SIZE_BUCKETS - 1
+        clock = time.perf_counter_ns
+        size_param, measure = size_parameter(func, size) or ("", None)
+
+        # Recording is inlined in both wrappers, as a function call would double its cost. The bucket of
+        # a value is its bit length, capped to the last bucket
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def instrumented_async(**kwargs: Any) -> Any:
+                start = clock()
+                try:
+                    return await func(**kwargs)
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    elapsed = clock() - start
+                    stats.total_ns += elapsed
+                    if elapsed > stats.max_ns:
+                        stats.max_ns = elapsed
+                    index = (elapsed >> _LATENCY_SHIFT).bit_length()
+                    latency[index if index < last_latency else last_latency] += 1
+                    index = measure(kwargs[size_param]).bit_length() if measure else 0
+                    sizes[index if index < last_size else last_size] += 1
+
+            return instrumented_async
+
+        @functools.wraps(func)
+        def instrumented(**kwargs: Any) -> Any:
+            start = clock()
+            try:
+                return func(**kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                elapsed = clock() - start
+                stats.total_ns += elapsed
+                if elapsed > stats.max_ns:
+                    stats.max_ns = elapsed
+                index = (elapsed >> _LATENCY_SHIFT).bit_length()
+                latency[index if index < last_latency else last_latency] += 1
+                index = measure(kwargs[size_param]).bit_length() if measure else 0
+                sizes[index if index < last_size else last_size] += 1
+
+        return instrumented
+
+    def dump(self, path: str, server_name: str) -> None:
+        """Append the counters to a file, as one JSON line."""
+        line = json.dumps(
+            {
+                "time": datetime.now(timezone.utc).isoformat(),
+                "server": server_name,
+                "pid": os.getpid(),
+                **self.snapshot(),
+            }
+        )
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"STATS {line}\n")
+
+    async def dump_periodically(self, path: str, server_name: str, interval: float) -> None:
+        """Dump the counters every interval seconds, and once more when cancelled."""
+        try:
+            while True:
+                await anyio.sleep(interval)
+                await self._dump_in_thread(path, server_name)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self._dump_in_thread(path, server_name)
+
+    async def _dump_in_thread(self, path: str, server_name: str) -> None:
+        try:
+            await anyio.to_thread.run_sync(self.dump, path, server_name)
+        except OSError as e:
+            logger.warning("Failed to dump tool stats to '%s': %s", path, e)
+
+
+def server_stats_tool(mcp: "ToolServer") -> Callable[[], Awaitable[dict[str, Any]]]:
+    """Create the server_stats tool of a server, reporting the counters of its tools and caches."""
+
+    async def server_stats() -> dict[str, Any]:
+        """
+        Return the usage statistics of the tools of this server: call and error counts, latency percentiles
+        and histograms in ms, input size histograms, and the counters of the result caches, admission control
+        and merged calls.
+        """
+        report = mcp.stats.snapshot() if mcp.stats is not None else {"tools": {}}
+        if mcp.result_cache is not None:
+            report["result_cache"] = mcp.result_cache.stats()
+        if mcp.memo_store is not None:
+            report["memo_store"] = mcp.memo_store.stats()
+        if mcp.admission is not None:
+            report["admission"] = mcp.admission.stats()
+        if mcp.single_flight is not None:
+            report["single_flight"] = mcp.single_flight.stats()
+        return report
+
+    return server_stats
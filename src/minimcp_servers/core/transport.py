@@ -0,0 +1,116 @@
+import json
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+
+import anyio
+import anyio.to_thread
+import mcp.types as types
+from minimcp import Message, NoMessage, stdio
+
+from minimcp_servers.core.admission import message_id
+
+logger = logging.getLogger(__name__)
+
+StdioRequestHandler = stdio.StdioRequestHandler
+LineWriter = Callable[[str], Awaitable[None]]
+
+# Characters read at a time when skipping the rest of an oversized line
+_SKIP_CHUNK_CHARS = 1024 * 1024
+
+
+async def _write_stdout(line: str) -> None:
+    await stdio.stdout.write(line)
+    await stdio.stdout.flush()
+
+
+async def bounded_lines(file: anyio.AsyncFile[str], max_chars: int) -> AsyncIterator[str]:
+    """
+    Iterate over the lines of a file, holding at most max_chars + 1 characters of a line in memory.
+    Longer lines are cut there and the rest of them is skipped, so that the handler rejects them as oversized
+    without ever reading them whole.
+    """
+    readline = file.wrapped.readline
+    while True:
+        line = await anyio.to_thread.run_sync(readline, max_chars + 1)
+        if not line:
+            return
+
+        rest = line
+        while rest and not rest.endswith("\n"):
+            rest = await anyio.to_thread.run_sync(readline, _SKIP_CHUNK_CHARS)
+        yield line
+
+
+async def concurrent_transport(
+    handler: StdioRequestHandler,
+    max_in_flight: int,
+    stdin: AsyncIterable[str] | None = None,
+    write_line: LineWriter | None = None,
+) -> None:
+    """
+    Serve MiniMCP over stdio, handling messages concurrently.
+
+    Messages are read continuously and dispatched to a task group. Responses are written
+    as soon as they are ready, hence can be out of order; clients match them using the JSON-RPC id.
+    - At most max_in_flight messages are handled at a time. Once the limit is reached, stdin is
+      not read until a handler completes, so backpressure reaches the client.
+    - Writes to stdout are serialized with a lock so that messages are never interleaved.
+    - A handler failing on a message does not stop the others: the error is logged, and reported to the
+      client with an INTERNAL_ERROR response when the message has an id.
+
+    Args:
+        handler: A function that will be called for each incoming message, with the message and
+            a send function to write messages. Message returned by the function is sent back to the client.
+        max_in_flight: Maximum number of messages handled at the same time
+        stdin: Source of incoming lines, defaults to the process stdin
+        write_line: Function writing a line to the client, defaults to writing to the process stdout
+
+    Returns:
+        None
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be >= 1, got {max_in_flight}")
+
+    lines = stdin if stdin is not None else stdio.stdin
+    write = write_line if write_line is not None else _write_stdout
+
+    write_lock = anyio.Lock()
+    in_flight = anyio.Semaphore(max_in_flight)
+
+    async def write_msg(response: Message | NoMessage) -> None:
+        if isinstance(response, NoMessage):
+            return
+
+        logger.info("Writing response message to stdio: %s", response)
+        async with write_lock:
+            await write(response + "\n")
+
+    async def handle_message(line: str) -> None:
+        try:
+            logger.info("Handling incoming message: %s", line)
+            try:
+                response = await handler(line, write_msg)
+            except Exception as e:
+                logger.exception("Failed to handle message: %s", line)
+                response = _internal_error(line, e)
+            await write_msg(response)
+        finally:
+            in_flight.release()
+
+    async with anyio.create_task_group() as tg:
+        async for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            await in_flight.acquire()
+            tg.start_soon(handle_message, line)
+
+
+def _internal_error(line: str, e: Exception) -> Message | NoMessage:
+    request_id = message_id(line)
+    if request_id is None:
+        return NoMessage.NOTIFICATION
+
+    error = {"code": types.INTERNAL_ERROR, "message": f"Internal error: {e}"}
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "error": error}, separators=(",", ":"))
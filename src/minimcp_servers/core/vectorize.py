@@ -0,0 +1,44 @@
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+# Suffix of the name of the twins of unary scalar tools, applying them to each element of a list
+MANY_SUFFIX = "_many"
+
+# Annotations of the argument and result of unary scalar tools
+_SCALAR_ARGUMENTS = (float,)
+_SCALAR_RESULTS = (float, int)
+
+
+def is_unary_scalar(func: Callable[..., Any]) -> bool:
+    """Return whether func takes a single float argument, and returns a float or an integer."""
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return False
+
+    parameters = list(signature.parameters.values())
+    return (
+        len(parameters) == 1
+        and parameters[0].kind in (parameters[0].POSITIONAL_ONLY, parameters[0].POSITIONAL_OR_KEYWORD)
+        and parameters[0].annotation in _SCALAR_ARGUMENTS
+        and signature.return_annotation in _SCALAR_RESULTS
+    )
+
+
+def many_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Return the twin of the unary scalar function func applying it to each element of a list, in one call
+    instead of one per element. Elements are mapped in a single loop, and the first failing one raises.
+    """
+    result = inspect.signature(func).return_annotation
+
+    def many(xs: list[float]) -> list:
+        return list(map(func, xs))
+
+    many.__name__ = many.__qualname__ = f"{func.__name__}{MANY_SUFFIX}"
+    many.__module__ = func.__module__
+    many.__annotations__ = {"xs": list[float], "return": list[result]}
+    summary = (func.__doc__ or "").strip()
+    many.__doc__ = f"Apply {func.__name__} to each element x of xs, and return the list of the results. {summary}"
+    return many
@@ -2,6 +2,20 @@ import calendar
 import datetime
 import time
 
+# Metadata of the tools, see minimcp_servers.core.metadata. The current time changes between calls, it is
+# never cached
+__tools__ = {
+    "epoch_seconds_now": {"pure": False, "cost": "constant"},
+    "iso_utc_now": {"pure": False, "cost": "constant"},
+    "epoch_to_iso_utc": {"cost": "constant"},
+    "iso_utc_to_epoch": {"cost": "linear", "size": "iso_utc"},
+    "is_valid_iso_format": {"cost": "linear", "size": "iso_str"},
+    "duration_seconds": {"cost": "constant"},
+    "format_duration": {"cost": "constant"},
+    "isleap": {"cost": "constant"},
+    "days_in_month": {"cost": "constant"},
+}
+
 # Intentionally avoiding local time functions as the MCP server
 # need not be running on the same machine as the client.
 
@@ -5,6 +5,37 @@ import math as stdlib_math
 # the standard math module are not directly compatible with the MiniMCP protocol.
 
 
+# Metadata of the tools, see minimcp_servers.core.metadata. Reductions of arrays are linear, other tools take
+# floats and are constant
+__tools__ = {
+    "add": {"cost": "linear", "size": "array"},
+    "multiply": {"cost": "linear", "size": "array"},
+    "minimum": {"cost": "linear", "size": "array"},
+    "maximum": {"cost": "linear", "size": "array"},
+    **dict.fromkeys(
+        (
+            "subtract",
+            "divide",
+            "modulo",
+            "floor_divide",
+            "pow",
+            "sign",
+            "clamp",
+            "round_to",
+            "absolute",
+            "sqrt",
+            "ceil",
+            "floor",
+            "trunc",
+            "copysign",
+            "frexp",
+            "ldexp",
+            "modf",
+        ),
+        {"cost": "constant"},
+    ),
+}
+
 # === Elementary Functions ===
 
 
@@ -1,5 +1,43 @@
 import math as stdlib_math
 
+# Metadata of the tools, see minimcp_servers.core.metadata. Distances of arrays of coordinates are linear, other
+# tools take floats and are constant
+__tools__ = {
+    "multidimensional_hypot": {"cost": "linear", "size": "coordinates"},
+    "dist": {"cost": "linear", "size": "p"},
+    **dict.fromkeys(
+        (
+            "sin",
+            "cos",
+            "tan",
+            "asin",
+            "acos",
+            "atan",
+            "atan2",
+            "sinh",
+            "cosh",
+            "tanh",
+            "asinh",
+            "acosh",
+            "atanh",
+            "exp",
+            "expm1",
+            "log",
+            "log10",
+            "log2",
+            "log1p",
+            "degrees",
+            "radians",
+            "hypot",
+            "gamma",
+            "lgamma",
+            "erf",
+            "erfc",
+        ),
+        {"cost": "constant"},
+    ),
+}
+
 # === Trigonometric Functions ===
 
 
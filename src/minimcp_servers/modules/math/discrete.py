@@ -1,5 +1,17 @@
 import math as stdlib_math
 
+# Metadata of the tools, see minimcp_servers.core.metadata. Factorials and binomial coefficients of large integers
+# take seconds to compute, in worker processes, and are kept in the persistent memo store when it is enabled.
+# Integers have arbitrary precision, so other tools grow with the digits of their arguments
+__tools__ = {
+    "isqrt": {"cost": "linear", "size": "x"},
+    "gcd": {"cost": "linear", "size": "a"},
+    "lcm": {"cost": "linear", "size": "a"},
+    "factorial": {"cost": "superlinear", "size": "x", "persistent": True},
+    "combination": {"cost": "superlinear", "size": "n", "persistent": True},
+    "permutation": {"cost": "superlinear", "size": "n", "persistent": True},
+}
+
 # === Square Root ===
 
 
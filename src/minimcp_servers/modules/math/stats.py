@@ -1,5 +1,27 @@
 import statistics
 
+# Metadata of the tools, see minimcp_servers.core.metadata. Sorting statistics, such as the median and quantiles,
+# grow as n log n, close enough to linear that they run in worker threads rather than processes
+__tools__ = {
+    "mean": {"cost": "linear", "size": "data"},
+    "geometric_mean": {"cost": "linear", "size": "data"},
+    "harmonic_mean": {"cost": "linear", "size": "data"},
+    "median": {"cost": "linear", "size": "data"},
+    "median_low": {"cost": "linear", "size": "data"},
+    "median_high": {"cost": "linear", "size": "data"},
+    "median_grouped": {"cost": "linear", "size": "data"},
+    "mode": {"cost": "linear", "size": "data"},
+    "multimode": {"cost": "linear", "size": "data"},
+    "quantiles": {"cost": "linear", "size": "data"},
+    "pvariance": {"cost": "linear", "size": "data"},
+    "variance": {"cost": "linear", "size": "data"},
+    "pstdev": {"cost": "linear", "size": "data"},
+    "stdev": {"cost": "linear", "size": "data"},
+    "covariance": {"cost": "linear", "size": "x"},
+    "correlation": {"cost": "linear", "size": "x"},
+    "linear_regression": {"cost": "linear", "size": "x"},
+}
+
 # === Calculating Averages ===
 
 
@@ -3,6 +3,14 @@ import string
 import sys
 import uuid
 
+# Metadata of the tools, see minimcp_servers.core.metadata. Random values are never cached, nor shared
+# between concurrent calls
+__tools__ = {
+    "generate_uuid": {"pure": False, "idempotent": False, "cost": "constant"},
+    "generate_random_number": {"pure": False, "idempotent": False, "cost": "constant"},
+    "generate_random_text": {"pure": False, "idempotent": False, "cost": "linear", "size": "length"},
+}
+
 
 def generate_uuid() -> str:
     """Generate and return a cryptographically secure random UUID string using uuid4"""
@@ -3,6 +3,29 @@ import hashlib
 import re
 from collections import Counter
 
+# Metadata of the tools, see minimcp_servers.core.metadata. The length of a string is stored with it, other
+# tools scan their input
+__tools__ = {
+    "length": {"cost": "constant"},
+    "count_substr": {"cost": "linear", "size": "text"},
+    "most_common_words": {"cost": "linear", "size": "text"},
+    "first_index_of_substr": {"cost": "linear", "size": "text"},
+    "last_index_of_substr": {"cost": "linear", "size": "text"},
+    "normalize_text": {"cost": "linear", "size": "text"},
+    "slice_text": {"cost": "linear", "size": "text"},
+    "replace_substr": {"cost": "linear", "size": "text"},
+    "md5": {"cost": "linear", "size": "data"},
+    "sha1": {"cost": "linear", "size": "data"},
+    "sha256": {"cost": "linear", "size": "data"},
+    "sha512": {"cost": "linear", "size": "data"},
+    "base64_encode": {"cost": "linear", "size": "data"},
+    "base64_decode": {"cost": "linear", "size": "data"},
+    "base64_urlsafe_encode": {"cost": "linear", "size": "data"},
+    "base64_urlsafe_decode": {"cost": "linear", "size": "data"},
+    "hex_encode": {"cost": "linear", "size": "data"},
+    "hex_decode": {"cost": "linear", "size": "data"},
+}
+
 _ENCODING = "utf-8"
 
 
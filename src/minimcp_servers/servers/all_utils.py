@@ -0,0 +1,67 @@
+import logging
+
+from minimcp_servers.core.builder import mcp_from_module, module_namespace, run_server
+from minimcp_servers.core.config import env_list
+from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
+
+configure_logging()
+
+logger = logging.getLogger(__name__)
+
+# Modules are only imported when one of their tools is first called
+MODULES = [
+    "minimcp_servers.modules.math.arithmetic",
+    "minimcp_servers.modules.math.continuous",
+    "minimcp_servers.modules.math.discrete",
+    "minimcp_servers.modules.math.stats",
+    "minimcp_servers.modules.text",
+    "minimcp_servers.modules.datetime",
+    "minimcp_servers.modules.random_generator",
+]
+
+
+def enabled_modules() -> list[str]:
+    """Return the modules whose namespace is enabled by MCP_SERVER_NAMESPACES, all of them if not set."""
+    namespaces = env_list("MCP_SERVER_NAMESPACES")
+    if namespaces is None:
+        return MODULES
+
+    available = {module_namespace(module): module for module in MODULES}
+    for namespace in sorted(set(namespaces) - available.keys()):
+        logger.warning("Unknown namespace '%s', available namespaces are: %s", namespace, ", ".join(available))
+
+    return [module for namespace, module in available.items() if namespace in namespaces]
+
+
+def create_server() -> ToolServer:
+    modules = enabled_modules()
+    return mcp_from_module(
+        "all-utils",
+        "1.0.0",
+        """
+        All Utils - Every MiniMCP Servers tool in a single server, with tool names prefixed by their namespace.
+
+        It includes:
+        - arithmetic_* - Basic arithmetic, rounding, array and floating-point operations (arithmetic_add, ...)
+        - continuous_* - Trigonometric, hyperbolic, exponential, logarithmic and special functions (continuous_sin, ...)
+        - discrete_* - Integer operations, number theory and combinatorics (discrete_factorial, ...)
+        - stats_* - Central tendency, dispersion, distribution and bivariate statistics (stats_mean, ...)
+        - text_* - Text analysis, manipulation, hashing and encoding (text_sha256, ...)
+        - datetime_* - Current time, format conversion, durations and calendar utilities (datetime_iso_utc_now, ...)
+        - random_generator_* - Cryptographically secure UUIDs, numbers and strings (random_generator_generate_uuid, ...)
+
+        Use this server to get the tools of every other MiniMCP server from one process.
+        Refer to the description of each tool for its arguments and behavior.
+        """,
+        modules,
+        namespaced=True,
+    )
+
+
+def main():
+    run_server(create_server())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,12 @@
-import anyio
-
-import minimcp_servers.modules.math.arithmetic as arithmetic
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "arithmetic-math-utils",
         "1.0.0",
         """
@@ -26,10 +24,12 @@ def main():
         in your applications. All functions handle floating-point numbers and return
         appropriate numeric types.
         """,
-        [arithmetic],
+        ["minimcp_servers.modules.math.arithmetic"],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
-import anyio
-
-import minimcp_servers.modules.math.continuous as continuous
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "continuous-math-utils",
         "1.0.0",
         """
@@ -29,10 +27,12 @@ def main():
         All functions operate on floating-point numbers and handle standard mathematical
         domains and ranges.
         """,
-        [continuous],
+        ["minimcp_servers.modules.math.continuous"],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
-import anyio
-
-import minimcp_servers.modules.math.discrete as discrete
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "discrete-math-utils",
         "1.0.0",
         """
@@ -31,10 +29,12 @@ def main():
         suitable for exact discrete mathematical computations without floating-point
         precision issues.
         """,
-        [discrete],
+        ["minimcp_servers.modules.math.discrete"],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
-import anyio
-
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
-from minimcp_servers.modules.math import arithmetic, continuous, discrete, stats
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "math-utils",
         "1.0.0",
         """
@@ -50,10 +48,17 @@ def main():
         - Educational and academic computations
         - Algorithm development and optimization
         """,
-        [arithmetic, continuous, discrete, stats],
+        [
+            "minimcp_servers.modules.math.arithmetic",
+            "minimcp_servers.modules.math.continuous",
+            "minimcp_servers.modules.math.discrete",
+            "minimcp_servers.modules.math.stats",
+        ],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
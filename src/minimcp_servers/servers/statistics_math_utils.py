@@ -1,14 +1,12 @@
-import anyio
-
-import minimcp_servers.modules.math.stats as statistics
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "statistics-math-utils",
         "1.0.0",
         """
@@ -38,10 +36,12 @@ def main():
         All functions operate on lists of floating-point numbers and provide
         accurate statistical computations for data-driven decision making.
         """,
-        [statistics],
+        ["minimcp_servers.modules.math.stats"],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
-import anyio
-
-import minimcp_servers.modules.text as text
-from minimcp_servers.core.builder import mcp_from_module, stdio_server
+from minimcp_servers.core.builder import mcp_from_module, run_server
 from minimcp_servers.core.logger import configure_logging
+from minimcp_servers.core.server import ToolServer
 
 configure_logging()
 
 
-def main():
-    mcp = mcp_from_module(
+def create_server() -> ToolServer:
+    return mcp_from_module(
         "text-utils",
         "1.0.0",
         """
@@ -46,10 +44,12 @@ def main():
         capabilities for modern applications requiring text analysis, manipulation,
         and secure data handling.
         """,
-        [text],
+        ["minimcp_servers.modules.text"],
     )
 
-    anyio.run(stdio_server(mcp))
+
+def main():
+    run_server(create_server())
 
 
 if __name__ == "__main__":
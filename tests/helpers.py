@@ -0,0 +1,31 @@
+"""Helpers shared by the tests, sending JSON-RPC messages to a server."""
+
+import json
+
+from minimcp_servers.core.server import ToolServer
+
+
+def call_message(request_id: int, name: str, arguments: dict) -> str:
+    """Return the JSON-RPC message calling a tool."""
+    params = {"name": name, "arguments": arguments}
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params})
+
+
+async def handle_json(mcp: ToolServer, message: str) -> dict:
+    """Handle a message, and return its decoded response."""
+    response = await mcp.handle(message)
+    assert isinstance(response, str)
+    return json.loads(response)
+
+
+async def request(mcp: ToolServer, method: str, params: dict | None = None, request_id: int = 1) -> dict:
+    """Send a request to the server, and return its decoded response."""
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return await handle_json(mcp, json.dumps(message))
+
+
+async def call_tool(mcp: ToolServer, name: str, arguments: dict, request_id: int = 1) -> dict:
+    """Call a tool, and return the result of the response."""
+    return (await handle_json(mcp, call_message(request_id, name, arguments)))["result"]
@@ -0,0 +1,294 @@
+"""Tests for minimcp_servers.core.admission module."""
+
+import json
+
+import anyio
+import pytest
+
+from minimcp_servers.core import admission as admission_module
+from minimcp_servers.core.admission import (
+    DEFAULT_LANE,
+    FAST_LANE,
+    HEAVY_LANE,
+    INVALID_REQUEST,
+    SERVER_BUSY,
+    AdmissionControl,
+    ServerBusyError,
+    message_id,
+)
+from minimcp_servers.core.builder import mcp_from_module, tool_lane
+from minimcp_servers.modules import text
+from minimcp_servers.modules.math import arithmetic, discrete
+from tests.helpers import call_message, handle_json
+
+
+class TestMessageId:
+    """Test message_id function."""
+
+    def test_message_id(self):
+        """Test that ids are read from the head of messages, before their params."""
+        assert message_id(call_message(7, "length", {"text": "x" * 10_000})) == 7
+        assert message_id('{"jsonrpc": "2.0", "id": "a\\"b", "method": "ping"}') == 'a"b'
+        assert message_id('{"jsonrpc": "2.0", "id": -3}') == -3
+        assert message_id('{"params": {"id": 1}, "id": 2}') is None
+        assert message_id("x" * 10_000) is None
+
+
+class TestAdmissionControl:
+    """Test AdmissionControl class."""
+
+    def test_oversized(self):
+        """Test the maximum frame size, 0 for no limit."""
+        assert AdmissionControl(max_frame_bytes=10).oversized("x" * 11)
+        assert not AdmissionControl(max_frame_bytes=10).oversized("x" * 10)
+        assert not AdmissionControl().oversized("x" * 10_000)
+
+    @pytest.mark.asyncio
+    async def test_limits(self):
+        """Test that calls over the limits wait, up to max_pending of them, and later ones are rejected."""
+        admission = AdmissionControl(max_calls=2, max_pending=1, tool_concurrency=1)
+        release = anyio.Event()
+        order = []
+
+        async def call(tool_name: str) -> None:
+            async with admission.admit(tool_name):
+                order.append(tool_name)
+                await release.wait()
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call, "heavy")
+                tg.start_soon(call, "heavy")
+                await anyio.sleep(0.01)
+                assert (admission.running, admission.pending, admission.rejected) == (1, 1, 0)
+
+                # Calls waiting for their tool do not hold a slot of the server
+                tg.start_soon(call, "cheap")
+                await anyio.sleep(0.01)
+                assert order == ["heavy", "cheap"]
+
+                with pytest.raises(ServerBusyError):
+                    async with admission.admit("heavy"):
+                        pass
+                release.set()
+
+        assert order == ["heavy", "cheap", "heavy"]
+        assert (admission.running, admission.pending, admission.rejected) == (0, 0, 1)
+
+    @pytest.mark.asyncio
+    async def test_tool_limits(self):
+        """Test that limits by tool override tool_concurrency."""
+        admission = AdmissionControl(max_pending=0, tool_concurrency=1, tool_limits={"wide": 2})
+
+        async with admission.admit("wide"), admission.admit("wide"):
+            with pytest.raises(ServerBusyError):
+                async with admission.admit("wide"):
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_waiting(self):
+        """Test that calls cancelled while waiting leave the queue."""
+        admission = AdmissionControl(max_calls=1, max_pending=1)
+
+        async with admission.admit("a"):
+            with anyio.move_on_after(0.01):
+                async with admission.admit("b"):
+                    pass
+            assert admission.pending == 0
+
+
+class TestLanes:
+    """Test the lanes of AdmissionControl."""
+
+    @pytest.mark.asyncio
+    async def test_lanes_are_independent(self):
+        """Test that a full lane does not hold up the calls of the others."""
+        admission = AdmissionControl(
+            max_pending=0, lane_limits={HEAVY_LANE: 1}, tool_lanes={"factorial": HEAVY_LANE, "sign": FAST_LANE}
+        )
+
+        async with admission.admit("factorial"):
+            with pytest.raises(ServerBusyError):
+                async with admission.admit("factorial"):
+                    pass
+            async with admission.admit("sign"), admission.admit("mean"):
+                lanes = admission.stats()["lanes"]
+
+        assert lanes[HEAVY_LANE] == {"running": 1, "pending": 0, "limit": 1}
+        assert lanes[FAST_LANE]["limit"] is None
+        assert admission.lane("mean") == DEFAULT_LANE
+
+    @pytest.mark.asyncio
+    async def test_slow_tools_leave_the_fast_lane(self, monkeypatch):
+        """Test that tools of the fast lane running slow are moved to the default lane, and back once fast."""
+        now = 0
+        delay = admission_module.FAST_LANE_BUDGET_NS
+        monkeypatch.setattr(admission_module.time, "perf_counter_ns", lambda: now)
+        admission = AdmissionControl(tool_lanes={"sign": FAST_LANE})
+
+        def sign(x: float) -> float:
+            nonlocal now
+            now += delay
+            return 1.0 if x > 0 else 0.0
+
+        timed = admission.timed("sign", sign)
+
+        # Time holding a slot is not run time
+        for _ in range(admission_module.FAST_LANE_STRIKES):
+            async with admission.admit("sign"):
+                now += delay
+        assert admission.lane("sign") == FAST_LANE
+
+        for _ in range(admission_module.FAST_LANE_STRIKES):
+            assert admission.lane("sign") == FAST_LANE
+            async with admission.admit("sign"):
+                timed(x=1.0)
+        assert admission.lane("sign") == DEFAULT_LANE
+
+        delay = 0
+        for _ in range(admission_module.FAST_LANE_STRIKES * admission_module.FAST_LANE_RECOVERY_CALLS - 1):
+            timed(x=1.0)
+        assert admission.lane("sign") == DEFAULT_LANE
+        timed(x=1.0)
+        assert admission.lane("sign") == FAST_LANE
+
+    @pytest.mark.asyncio
+    async def test_timed_async(self, monkeypatch):
+        """Test that coroutine functions are timed, and tools out of the fast lane are not."""
+        now = 0
+        monkeypatch.setattr(admission_module.time, "perf_counter_ns", lambda: now)
+        admission = AdmissionControl(tool_lanes={"sign": FAST_LANE})
+
+        async def sign(x: float) -> float:
+            nonlocal now
+            now += admission_module.FAST_LANE_BUDGET_NS
+            return 1.0
+
+        timed = admission.timed("sign", sign)
+        for _ in range(admission_module.FAST_LANE_STRIKES):
+            assert await timed(x=1.0) == 1.0
+        assert admission.lane("sign") == DEFAULT_LANE
+
+        admission.assign("mean", DEFAULT_LANE)
+        timed = admission.timed("mean", sign)
+        for _ in range(admission_module.FAST_LANE_STRIKES):
+            await timed(x=1.0)
+        assert admission.lane("mean") == DEFAULT_LANE
+        assert admission._strikes == {"sign": admission_module.FAST_LANE_STRIKES}
+
+    def test_unknown_lane(self):
+        """Test that unknown lanes are rejected."""
+        with pytest.raises(ValueError):
+            AdmissionControl(tool_lanes={"sign": "slow"})
+        with pytest.raises(ValueError):
+            AdmissionControl(lane_limits={"slow": 1})
+
+
+class TestToolLane:
+    """Test tool_lane function and the lanes of mcp_from_module."""
+
+    def test_tool_lane(self):
+        """Test that lanes follow the declared cost of tools."""
+        scalar = {"inputSchema": {"properties": {"x": {"type": "number"}, "exact": {"type": "boolean"}}}}
+        integer = {"inputSchema": {"properties": {"n": {"type": "integer"}}}}
+
+        assert tool_lane(scalar, "auto") == FAST_LANE
+        assert tool_lane({"inputSchema": {"properties": {}}}, "auto") == FAST_LANE
+        assert tool_lane(integer, "auto") == DEFAULT_LANE
+        assert tool_lane(scalar, "process") == HEAVY_LANE
+
+    @pytest.mark.parametrize("use_manifest", [True, False])
+    def test_mcp_from_module(self, use_manifest):
+        """Test the lanes of the tools of a server, overridden by tool or function name."""
+        mcp = mcp_from_module(
+            "test",
+            "1.0.0",
+            "",
+            [arithmetic, discrete],
+            offload={"factorial": "process"},
+            lanes={"gcd": FAST_LANE, "pow": DEFAULT_LANE},
+            use_manifest=use_manifest,
+        )
+        assert mcp.admission is not None
+
+        assert mcp.admission.lane("sign") == FAST_LANE
+        assert mcp.admission.lane("add") == DEFAULT_LANE
+        assert mcp.admission.lane("factorial") == HEAVY_LANE
+        assert mcp.admission.lane("gcd") == FAST_LANE
+        assert mcp.admission.lane("pow") == DEFAULT_LANE
+
+
+class TestToolServerAdmission:
+    """Test admission control of the tool calls of a server."""
+
+    @pytest.mark.asyncio
+    async def test_oversized_message(self):
+        """Test that oversized messages are rejected with their id."""
+        mcp = mcp_from_module("test", "1.0.0", "", [text], max_frame_bytes=1000)
+
+        response = await handle_json(mcp, call_message(4, "length", {"text": "x" * 2000}))
+
+        assert response["id"] == 4
+        assert response["error"]["code"] == INVALID_REQUEST
+        assert response["error"]["data"] == {"maxFrameBytes": 1000}
+
+        response = await handle_json(mcp, call_message(5, "length", {"text": "x" * 100}))
+        assert response["result"]["structuredContent"] == {"result": 100}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name", ['["x"]', '{"a": 1}', "3"])
+    async def test_invalid_tool_name(self, name):
+        """Test that calls whose tool name is not a string get an error, instead of failing the server."""
+        mcp = mcp_from_module("test", "1.0.0", "", [text])
+        message = f'{{"jsonrpc":"2.0","id":2,"method":"tools/call","params":{{"name":{name},"arguments":{{}}}}}}'
+
+        response = await handle_json(mcp, message)
+
+        assert response["id"] == 2
+        assert "error" in response
+
+    @pytest.mark.asyncio
+    async def test_server_busy(self):
+        """Test that calls past the pending queue get a retryable error, and other tools keep running."""
+        mcp = mcp_from_module("test", "1.0.0", "", [text], tool_concurrency=1, max_pending=0)
+        release = anyio.Event()
+
+        async def wait() -> str:
+            """Wait until released."""
+            await release.wait()
+            return "done"
+
+        mcp.tool.add(wait)
+        responses = {}
+
+        async def call(request_id: int, name: str, arguments: dict) -> None:
+            responses[request_id] = await handle_json(mcp, call_message(request_id, name, arguments))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call, 1, "wait", {})
+                await anyio.sleep(0.01)
+                await call(2, "wait", {})
+                await call(3, "length", {"text": "abc"})
+                release.set()
+
+        assert responses[1]["result"]["structuredContent"] == {"result": "done"}
+        assert responses[2]["error"]["code"] == SERVER_BUSY
+        assert responses[2]["error"]["data"] == {"tool": "wait", "retryable": True}
+        assert responses[3]["result"]["structuredContent"] == {"result": 3}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [10, 20_000])
+    async def test_batch(self, size):
+        """Test that the calls of a batch wider than the limits wait for a slot rather than being rejected."""
+        mcp = mcp_from_module("test", "1.0.0", "", [text])
+        batch = [json.loads(call_message(i, "sha256", {"data": f"{i:0{size}d}"})) for i in range(50)]
+
+        with anyio.fail_after(10):
+            response = await mcp.handle(json.dumps(batch))
+        assert isinstance(response, str)
+        responses = json.loads(response)
+
+        assert sorted(response["id"] for response in responses) == list(range(50))
+        assert all("result" in response for response in responses)
+        assert mcp.admission is not None and mcp.admission.rejected == 0
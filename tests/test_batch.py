@@ -0,0 +1,141 @@
+"""Tests for minimcp_servers.core.batch module."""
+
+import time
+
+import anyio
+import pytest
+
+from minimcp_servers.core.admission import FAST_LANE
+from minimcp_servers.core.batch import MAX_BATCH_STEPS, DependencyError, resolve_references, step_references
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.modules.math import arithmetic
+from tests.helpers import call_tool
+
+
+class TestReferences:
+    """Test step_references and resolve_references functions."""
+
+    def test_nested_references(self):
+        """Test that references are found and replaced at any depth."""
+        arguments = {"a": {"$ref": 0}, "b": [1, {"$ref": 2}], "c": {"d": {"$ref": 0}}}
+
+        assert step_references(arguments) == {0, 2}
+        assert resolve_references(arguments, [10, None, 30]) == {"a": 10, "b": [1, 30], "c": {"d": 10}}
+
+    def test_invalid_reference(self):
+        """Test that a reference must be a step index."""
+        with pytest.raises(DependencyError):
+            step_references({"a": {"$ref": "zero"}})
+
+
+class TestBatchTool:
+    """Test the batch tool of mcp_from_module."""
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that the batch tool is only registered when enabled."""
+        monkeypatch.delenv("MCP_SERVER_BATCH_TOOL", raising=False)
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic])
+        assert "batch" not in [tool.name for tool in mcp.tool.list()]
+
+    @pytest.mark.asyncio
+    async def test_chained_steps(self):
+        """Test that steps can use the results of earlier steps."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], batch=True)
+        steps = [
+            {"tool": "add", "arguments": {"array": [1, 2]}},
+            {"tool": "multiply", "arguments": {"array": [{"$ref": 0}, 2.5]}},
+            {"tool": "round_to", "arguments": {"x": {"$ref": 1}}},
+        ]
+
+        result = await call_tool(mcp, "batch", {"steps": steps})
+
+        assert not result["isError"]
+        assert result["structuredContent"]["result"] == [{"result": 3}, {"result": 7.5}, {"result": 8.0}]
+
+    @pytest.mark.asyncio
+    async def test_step_errors(self):
+        """Test that failing steps are reported without stopping the other steps."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], batch=True)
+        steps = [
+            {"tool": "divide", "arguments": {"a": 1, "b": 0}},
+            {"tool": "unknown", "arguments": {}},
+            {"tool": "subtract", "arguments": {"a": {"$ref": 0}, "b": 1}},
+            {"tool": "subtract", "arguments": {"a": {"$ref": 3}, "b": 1}},
+            {"tool": "subtract", "arguments": {"a": 3, "b": 1}},
+            {"tool": "batch", "arguments": {"steps": []}},
+        ]
+
+        outcomes = (await call_tool(mcp, "batch", {"steps": steps}))["structuredContent"]["result"]
+
+        assert [list(outcome) for outcome in outcomes] == [["error"]] * 4 + [["result"], ["error"]]
+        assert "step 0, which failed" in outcomes[2]["error"]
+        assert "not an earlier step" in outcomes[3]["error"]
+        assert outcomes[4] == {"result": 2}
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self):
+        """Test that independent steps do not wait for each other."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], batch=True)
+
+        async def wait(seconds: float) -> float:
+            await anyio.sleep(seconds)
+            return seconds
+
+        mcp.tool.add(wait)
+
+        start = time.perf_counter()
+        result = await call_tool(mcp, "batch", {"steps": [{"tool": "wait", "arguments": {"seconds": 0.2}}] * 5})
+
+        assert time.perf_counter() - start < 0.6
+        assert result["structuredContent"]["result"] == [{"result": 0.2}] * 5
+
+    @pytest.mark.asyncio
+    async def test_step_timeout(self):
+        """Test that each step is subject to the deadline of its tool."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], batch=True, tool_timeouts={"wait": 0.05})
+
+        async def wait(seconds: float) -> float:
+            await anyio.sleep(seconds)
+            return seconds
+
+        mcp.tool.add(wait)
+
+        steps = [{"tool": "wait", "arguments": {"seconds": 5}}]
+        outcomes = (await call_tool(mcp, "batch", {"steps": steps}))["structuredContent"]
+        assert "timed out" in outcomes["result"][0]["error"]
+
+    @pytest.mark.asyncio
+    async def test_too_many_steps(self):
+        """Test that batches are limited to MAX_BATCH_STEPS steps."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], batch=True)
+        steps = [{"tool": "subtract", "arguments": {"a": 1, "b": 1}}] * (MAX_BATCH_STEPS + 1)
+
+        assert (await call_tool(mcp, "batch", {"steps": steps}))["isError"]
+
+    @pytest.mark.asyncio
+    async def test_steps_are_admitted(self):
+        """Test that steps wait for a slot of their lane, and the batch itself takes none."""
+        mcp = mcp_from_module(
+            "test", "1.0.0", "", [arithmetic], batch=True, stats_tool=True, max_calls=1, max_pending=0
+        )
+        assert mcp.admission is not None
+        running = peak = 0
+
+        async def wait(seconds: float) -> float:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await anyio.sleep(seconds)
+            running -= 1
+            return seconds
+
+        mcp.tool.add(wait)
+
+        with anyio.fail_after(5):
+            result = await call_tool(mcp, "batch", {"steps": [{"tool": "wait", "arguments": {"seconds": 0.01}}] * 5})
+
+        assert result["structuredContent"]["result"] == [{"result": 0.01}] * 5
+        assert peak == 1
+        assert mcp.admission.rejected == 0
+        assert mcp.admission.lane("batch") == FAST_LANE
+        assert mcp.admission.lane("server_stats") == FAST_LANE
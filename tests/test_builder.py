@@ -0,0 +1,130 @@
+"""Tests for minimcp_servers.core.builder module."""
+
+import json
+import os
+import subprocess
+import sys
+
+import anyio
+import pytest
+
+from minimcp_servers.core.builder import DEFAULT_MAX_IN_FLIGHT, mcp_from_module, module_namespace
+from minimcp_servers.modules import text
+from minimcp_servers.modules.math import discrete, stats
+from tests.helpers import call_message, call_tool, handle_json, request
+
+
+class TestMcpFromModule:
+    """Test mcp_from_module function."""
+
+    @pytest.mark.asyncio
+    async def test_registers_public_functions(self):
+        """Test that all public functions of the module are registered as tools."""
+        mcp = mcp_from_module("test", "1.0.0", "instructions", [discrete])
+
+        response = await request(mcp, "tools/list")
+        names = {tool["name"] for tool in response["result"]["tools"]}
+
+        assert names == {"isqrt", "factorial", "gcd", "lcm", "combination", "permutation"}
+
+    @pytest.mark.asyncio
+    async def test_offload_keeps_tool_schemas(self):
+        """Test that offloaded tools expose the same schemas as inline ones."""
+        inline = mcp_from_module("test", "1.0.0", "", [discrete], offload=dict.fromkeys(["factorial"], "inline"))
+        offloaded = mcp_from_module("test", "1.0.0", "", [discrete], offload=dict.fromkeys(["factorial"], "thread"))
+
+        assert (await request(inline, "tools/list")) == (await request(offloaded, "tools/list"))
+
+    @pytest.mark.asyncio
+    async def test_offloaded_tool_call(self):
+        """Test calling tools with each offload policy."""
+        mcp = mcp_from_module(
+            "test",
+            "1.0.0",
+            "",
+            [discrete],
+            offload={"factorial": "thread", "gcd": "inline"},
+            offload_threshold=1,
+        )
+
+        assert (await call_tool(mcp, "factorial", {"x": 5}))["structuredContent"] == {"result": 120}
+        assert (await call_tool(mcp, "gcd", {"a": 12, "b": 18}))["structuredContent"] == {"result": 6}
+        assert (await call_tool(mcp, "lcm", {"a": 4, "b": 6}))["structuredContent"] == {"result": 12}
+
+        error = await call_tool(mcp, "factorial", {"x": -1})
+        assert error["isError"] is True
+
+    @pytest.mark.asyncio
+    async def test_process_offload(self):
+        """Test calling tools in worker processes."""
+        mcp = mcp_from_module("test", "1.0.0", "", [discrete], offload={"factorial": "process"}, process_workers=1)
+
+        assert (await call_tool(mcp, "factorial", {"x": 5}))["structuredContent"] == {"result": 120}
+        assert (await call_tool(mcp, "factorial", {"x": -1}))["isError"] is True
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls(self, monkeypatch):
+        """Test that as many concurrent calls of one tool as messages handled concurrently are all served."""
+        for name in ("MCP_SERVER_MAX_CALLS", "MCP_SERVER_MAX_PENDING", "MCP_SERVER_TOOL_CONCURRENCY"):
+            monkeypatch.delenv(name, raising=False)
+        mcp = mcp_from_module("test", "1.0.0", "", [stats])
+        responses = []
+
+        async def call(request_id: int) -> None:
+            message = call_message(request_id, "mean", {"data": [float(request_id), 1.0]})
+            responses.append(await handle_json(mcp, message))
+
+        async with anyio.create_task_group() as tg:
+            for request_id in range(DEFAULT_MAX_IN_FLIGHT):
+                tg.start_soon(call, request_id)
+
+        assert [response for response in responses if "error" in response] == []
+
+    @pytest.mark.asyncio
+    async def test_namespaced(self):
+        """Test that tool names are prefixed by the namespace of their module."""
+        mcp = mcp_from_module("test", "1.0.0", "", [discrete, text], namespaced=True, offload={"factorial": "thread"})
+
+        response = await request(mcp, "tools/list")
+        names = {tool["name"] for tool in response["result"]["tools"]}
+
+        assert "discrete_factorial" in names
+        assert "text_sha256" in names
+        assert "factorial" not in names
+        assert (await call_tool(mcp, "discrete_factorial", {"x": 4}))["structuredContent"] == {"result": 24}
+
+    @pytest.mark.parametrize(
+        ("env", "expected"),
+        [
+            ({}, []),
+            (
+                {"MCP_SERVER_MEMO_PATH": "{tmp}/memo.db", "MCP_SERVER_PROFILE": "cprofile"},
+                ["cProfile", "pstats", "sqlite3"],
+            ),
+        ],
+    )
+    def test_optional_imports(self, tmp_path, env, expected):
+        """Test that the modules of the memo store and the profiler are only imported when they are enabled."""
+        script = """
+import json, sys
+from minimcp_servers.servers.math_utils import create_server
+
+create_server()
+print(json.dumps(sorted(name for name in ("cProfile", "pstats", "sqlite3") if name in sys.modules)))
+"""
+        env = {
+            **{name: value for name, value in os.environ.items() if not name.startswith("MCP_SERVER_")},
+            **{name: value.format(tmp=tmp_path) for name, value in env.items()},
+        }
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+
+        assert json.loads(output.stdout) == expected
+
+
+class TestModuleNamespace:
+    """Test module_namespace function."""
+
+    def test_module_namespace(self):
+        """Test that the namespace is the last part of the module name."""
+        assert module_namespace(stats) == "stats"
+        assert module_namespace(text) == "text"
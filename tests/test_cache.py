@@ -0,0 +1,156 @@
+"""Tests for minimcp_servers.core.cache module."""
+
+import inspect
+
+import pytest
+
+from minimcp_servers.core import cache as cache_module
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.cache import ResultCache, cache_key
+from minimcp_servers.modules import random_generator
+from minimcp_servers.modules.math import discrete
+from tests.helpers import call_tool
+
+
+class TestCacheKey:
+    """Test cache_key function."""
+
+    def test_canonical_arguments(self):
+        """Test that keys do not depend on the order of the arguments."""
+        assert cache_key("gcd", {"a": 1, "b": 2}) == cache_key("gcd", {"b": 2, "a": 1})
+        assert cache_key("gcd", {"a": 1, "b": 2}) != cache_key("lcm", {"a": 1, "b": 2})
+        assert cache_key("tool", {"value": object()}) is None
+
+
+class TestResultCache:
+    """Test ResultCache class."""
+
+    def test_hits_and_misses(self):
+        """Test that cached results are returned and counted."""
+        cache = ResultCache(10, 1024 * 1024)
+
+        assert cache.get("a") == (False, None)
+        cache.put("a", 1)
+        assert cache.get("a") == (True, 1)
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used results are evicted past max_entries."""
+        cache = ResultCache(2, 1024 * 1024)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.get("c") == (True, 3)
+        assert cache.evictions == 1
+
+    def test_byte_budget(self):
+        """Test that results are evicted to stay within max_bytes, and oversized ones are not cached."""
+        cache = ResultCache(100, 2000)
+        cache.put("a", "x" * 1000)
+        cache.put("b", "x" * 1000)
+
+        assert len(cache) == 1
+        assert cache.get("b")[0]
+        assert cache.size_bytes <= 2000
+
+        cache.put("c", "x" * 5000)
+        assert not cache.get("c")[0]
+
+    def test_ttl(self, monkeypatch):
+        """Test that results expire after the ttl."""
+        now = 1000.0
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+        cache = ResultCache(10, 1024 * 1024, ttl=5)
+
+        cache.put("a", 1)
+        now += 4
+        assert cache.get("a") == (True, 1)
+        now += 2
+        assert cache.get("a") == (False, None)
+        assert len(cache) == 0
+
+    def test_large_inputs_are_not_cached(self):
+        """Test that calls with an input size above max_input_size are not cached."""
+        cache = ResultCache(10, 1024 * 1024, max_input_size=100)
+
+        assert cache.key("sum", {"array": [1.0] * 10}) is not None
+        assert cache.key("sum", {"array": [1.0] * 1000}) is None
+
+    def test_wrap_sync(self):
+        """Test caching a synchronous function, errors excluded."""
+        calls = []
+
+        def square(x: int) -> int:
+            """Square x."""
+            calls.append(x)
+            if x < 0:
+                raise ValueError("negative")
+            return x * x
+
+        cache = ResultCache(10, 1024 * 1024)
+        cached = cache.wrap("square", square)
+
+        assert cached(x=3) == 9
+        assert cached(x=3) == 9
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                cached(x=-1)
+
+        assert calls == [3, -1, -1]
+        assert inspect.signature(cached) == inspect.signature(square)
+        assert cached.__doc__ == square.__doc__
+
+    @pytest.mark.asyncio
+    async def test_wrap_async(self):
+        """Test caching a coroutine function."""
+        calls = []
+
+        async def double(x: int) -> int:
+            calls.append(x)
+            return x * 2
+
+        cached = ResultCache(10, 1024 * 1024).wrap("double", double)
+
+        assert inspect.iscoroutinefunction(cached)
+        assert await cached(x=4) == 8
+        assert await cached(x=4) == 8
+        assert calls == [4]
+
+
+class TestMcpFromModuleCache:
+    """Test result caching of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    async def test_pure_tools_are_cached(self):
+        """Test that repeated calls of a pure tool hit the cache."""
+        mcp = mcp_from_module("test", "1.0.0", "", [discrete], cache_size=16)
+        assert mcp.result_cache is not None
+
+        for _ in range(3):
+            result = await call_tool(mcp, "combination", {"n": 10, "k": 3})
+            assert result["structuredContent"] == {"result": 120}
+
+        assert mcp.result_cache.stats()["hits"] == 2
+        assert mcp.result_cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_impure_tools_are_not_cached(self):
+        """Test that tools listed as impure by their module are never cached."""
+        mcp = mcp_from_module("test", "1.0.0", "", [random_generator], cache_size=16)
+        assert mcp.result_cache is not None
+
+        first = await call_tool(mcp, "generate_uuid", {})
+        second = await call_tool(mcp, "generate_uuid", {})
+
+        assert first["structuredContent"] != second["structuredContent"]
+        assert len(mcp.result_cache) == 0
+
+    def test_cache_disabled(self):
+        """Test that a cache size of 0 disables the cache."""
+        assert mcp_from_module("test", "1.0.0", "", [discrete], cache_size=0).result_cache is None
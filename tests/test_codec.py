@@ -0,0 +1,85 @@
+"""Tests for minimcp_servers.core.codec module."""
+
+import json
+
+import pytest
+
+from minimcp_servers.core.codec import CODECS, get_codec
+from minimcp_servers.core.server import ToolServer
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return get_codec(request.param)
+
+
+class TestCodecs:
+    """Test the codecs, each one when its library is installed."""
+
+    def test_round_trip(self, codec):
+        """Test that messages are decoded and encoded like the standard library does."""
+        message = {"id": 1, "params": {"data": [0.1, -2.5, 3], "text": "héllo", "flag": True, "none": None}}
+        encoded = json.dumps(message)
+
+        assert codec.loads(encoded) == message
+        assert codec.loads(encoded.encode()) == message
+        assert json.loads(codec.dumps(message)) == message
+
+    def test_big_integers(self, codec):
+        """Test that integers beyond 64 bits keep all their digits."""
+        encoded = json.dumps({"a": 10**40, "b": [1.5, -(3**100)], "c": 1e300})
+        decoded = codec.loads(encoded)
+
+        assert decoded == {"a": 10**40, "b": [1.5, -(3**100)], "c": 1e300}
+        assert isinstance(decoded["a"], int)
+        assert json.loads(codec.dumps(decoded)) == decoded
+
+    def test_invalid_json(self, codec):
+        """Test that invalid messages raise ValueError, and that NaN is accepted like the standard library does."""
+        with pytest.raises(ValueError):
+            codec.loads("not json")
+        assert codec.loads("[NaN]")[0] != codec.loads("[NaN]")[0]
+
+
+class TestGetCodec:
+    """Test get_codec function."""
+
+    def test_names(self):
+        """Test that codecs are picked by name, falling back on unknown ones."""
+        assert get_codec("json").name == "json"
+        assert get_codec(" JSON ").name == "json"
+        assert get_codec("auto").name in CODECS
+        assert get_codec("unknown").name == get_codec("auto").name
+
+    def test_missing_library(self, monkeypatch):
+        """Test that a codec whose library is not installed falls back to the standard library."""
+
+        def missing():
+            raise ImportError("not installed")
+
+        monkeypatch.setitem(CODECS, "orjson", missing)
+        assert get_codec("orjson").name == "json"
+
+
+class TestToolServerDecoding:
+    """Test the decoding of messages by ToolServer."""
+
+    @pytest.mark.asyncio
+    async def test_messages_are_decoded_once(self):
+        """Test that MiniMCP reuses the JSON decoded by ToolServer."""
+        decoded = []
+        base = get_codec("json")
+
+        def loads(data):
+            decoded.append(data)
+            return base.loads(data)
+
+        mcp = ToolServer("test", codec=type(base)("counting", loads, base.dumps))
+
+        response = await mcp.handle(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}))
+
+        assert isinstance(response, str)
+        assert json.loads(response)["result"] == {}
+        assert len(decoded) == 1
@@ -0,0 +1,64 @@
+"""Tests for minimcp_servers.core.config module."""
+
+from minimcp_servers.core.config import env_bool, env_choice_map, env_float, env_float_map, env_int, env_list
+
+
+class TestConfig:
+    """Test reading settings from the environment."""
+
+    def test_env_int(self, monkeypatch):
+        """Test reading integers, with fallback to the default."""
+        assert env_int("MCP_SERVER_TEST", 5) == 5
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "12")
+        assert env_int("MCP_SERVER_TEST", 5) == 12
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "twelve")
+        assert env_int("MCP_SERVER_TEST", 5) == 5
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "0")
+        assert env_int("MCP_SERVER_TEST", 5, minimum=1) == 5
+
+    def test_env_float(self, monkeypatch):
+        """Test reading floats, with fallback to the default."""
+        assert env_float("MCP_SERVER_TEST", 1.5) == 1.5
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "0.25")
+        assert env_float("MCP_SERVER_TEST", 1.5) == 0.25
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "-1")
+        assert env_float("MCP_SERVER_TEST", 1.5) == 1.5
+
+    def test_env_float_map(self, monkeypatch):
+        """Test reading mappings, skipping invalid entries."""
+        assert env_float_map("MCP_SERVER_TEST") == {}
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "factorial=5, permutation = 2.5,bad,=3,sha256=x,")
+        assert env_float_map("MCP_SERVER_TEST") == {"factorial": 5.0, "permutation": 2.5}
+
+    def test_env_choice_map(self, monkeypatch):
+        """Test reading mappings to choices, skipping invalid entries."""
+        assert env_choice_map("MCP_SERVER_TEST", ("fast", "heavy")) == {}
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "sign=fast, sha512 = heavy,bad,=fast,mean=slow,")
+        assert env_choice_map("MCP_SERVER_TEST", ("fast", "heavy")) == {"sign": "fast", "sha512": "heavy"}
+
+    def test_env_list(self, monkeypatch):
+        """Test reading lists of names."""
+        assert env_list("MCP_SERVER_TEST") is None
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "stats, text,,")
+        assert env_list("MCP_SERVER_TEST") == ["stats", "text"]
+
+    def test_env_bool(self, monkeypatch):
+        """Test reading booleans, with fallback to the default."""
+        assert env_bool("MCP_SERVER_TEST", True) is True
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "0")
+        assert env_bool("MCP_SERVER_TEST", True) is False
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "Yes")
+        assert env_bool("MCP_SERVER_TEST", False) is True
+
+        monkeypatch.setenv("MCP_SERVER_TEST", "maybe")
+        assert env_bool("MCP_SERVER_TEST", False) is False
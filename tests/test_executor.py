@@ -0,0 +1,189 @@
+"""Tests for minimcp_servers.core.executor module."""
+
+import inspect
+import os
+import threading
+import time
+
+import anyio
+import anyio.to_thread
+import pytest
+
+from minimcp_servers.core.executor import ProcessPool, ThreadOffloader, input_size
+from minimcp_servers.modules.math import discrete
+
+
+def _thread_name(data: str = "") -> str:
+    """Return the name of the thread running the call."""
+    return threading.current_thread().name
+
+
+class TestInputSize:
+    """Test input_size function."""
+
+    def test_input_size(self):
+        """Test sizes of different argument types."""
+        assert input_size((), {}) == 0
+        assert input_size(("hello",), {}) == 5
+        assert input_size(([1.0, 2.0, 3.0],), {"text": "ab"}) == 5
+        assert input_size((1.5, True, None), {}) == 0
+        assert input_size((2**640,), {}) == 10
+
+
+class TestThreadOffloader:
+    """Test ThreadOffloader class."""
+
+    def test_invalid_arguments(self):
+        """Test that invalid workers and policies are rejected."""
+        with pytest.raises(ValueError):
+            ThreadOffloader(0, 10)
+        with pytest.raises(ValueError):
+            ThreadOffloader(1, 10).wrap(_thread_name, "process")  # type: ignore[arg-type]
+
+    def test_inline_returns_function(self):
+        """Test that the inline policy does not wrap the function."""
+        assert ThreadOffloader(1, 10).wrap(_thread_name, "inline") is _thread_name
+
+    def test_wrapper_keeps_signature(self):
+        """Test that the wrapper keeps name, docstring and signature."""
+        wrapped = ThreadOffloader(1, 10).wrap(_thread_name, "auto")
+        assert wrapped.__name__ == "_thread_name"
+        assert wrapped.__doc__ == _thread_name.__doc__
+        assert inspect.signature(wrapped) == inspect.signature(_thread_name)
+
+    @pytest.mark.asyncio
+    async def test_thread_policy(self):
+        """Test that the thread policy always runs in a worker thread."""
+        wrapped = ThreadOffloader(1, 10).wrap(_thread_name, "thread")
+        assert await wrapped() != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_auto_policy(self):
+        """Test that the auto policy offloads only from the threshold."""
+        wrapped = ThreadOffloader(1, 10).wrap(_thread_name, "auto")
+        loop_thread = threading.current_thread().name
+
+        assert await wrapped(data="small") == loop_thread
+        assert await wrapped(data="x" * 10) != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Test that other tasks progress while an offloaded call runs."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking() -> str:
+            started.set()
+            release.wait(5)
+            return "done"
+
+        wrapped = ThreadOffloader(1, 10).wrap(blocking, "thread")
+        results = []
+
+        async def run():
+            results.append(await wrapped())
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(run)
+            await anyio.to_thread.run_sync(started.wait, 5)
+            results.append("loop")
+            release.set()
+
+        assert results == ["loop", "done"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_calls_keep_slot(self):
+        """Test that a thread abandoned by a cancelled call keeps its slot until it returns."""
+        release = threading.Event()
+        lock = threading.Lock()
+        running = []
+
+        def blocking() -> None:
+            with lock:
+                running.append(threading.current_thread().name)
+            release.wait(5)
+
+        offloader = ThreadOffloader(2, 10)
+        wrapped = offloader.wrap(blocking, "thread")
+
+        async def run():
+            with anyio.move_on_after(0.1):
+                await wrapped()
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(6):
+                tg.start_soon(run)
+
+        assert len(running) == 2
+        assert offloader._limiter.borrowed_tokens == 2
+
+        release.set()
+        with anyio.fail_after(5):
+            while offloader._limiter.borrowed_tokens:
+                await anyio.sleep(0.01)
+        assert len(running) == 2
+
+
+class TestProcessPool:
+    """Test ProcessPool class."""
+
+    def test_invalid_arguments(self):
+        """Test that invalid workers and timeout are rejected."""
+        with pytest.raises(ValueError):
+            ProcessPool(0, 1.0)
+        with pytest.raises(ValueError):
+            ProcessPool(1, 0)
+
+    @pytest.mark.asyncio
+    async def test_run_in_worker_process(self):
+        """Test that calls run in a warm worker process, which is reused."""
+        pool = ProcessPool(1, 10.0, ["minimcp_servers.modules.math.discrete"])
+        try:
+            first_pid = await pool.run(os.getpid)
+            assert first_pid != os.getpid()
+            assert await pool.run(os.getpid) == first_pid
+
+            assert await pool.run(discrete.factorial, 5) == 120
+            assert await pool.wrap(discrete.combination)(n=5, k=2) == 10
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_tool_exception(self):
+        """Test that exceptions raised by the tool are propagated and the worker is kept."""
+        pool = ProcessPool(1, 10.0)
+        try:
+            pid = await pool.run(os.getpid)
+            with pytest.raises(ValueError):
+                await pool.run(discrete.factorial, -1)
+            assert await pool.run(os.getpid) == pid
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_worker(self):
+        """Test that a call exceeding its budget is stopped and its worker replaced."""
+        pool = ProcessPool(1, 0.5)
+        try:
+            pid = await pool.run(os.getpid)
+
+            start = time.monotonic()
+            with pytest.raises(TimeoutError):
+                await pool.run(time.sleep, 30)
+            assert time.monotonic() - start < 10
+
+            assert await pool.run(os.getpid) != pid
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_worker(self):
+        """Test that cancelling a call stops its worker."""
+        pool = ProcessPool(1, 30.0)
+        try:
+            pid = await pool.run(os.getpid)
+            with anyio.move_on_after(0.5):
+                await pool.run(time.sleep, 30)
+            assert await pool.run(os.getpid) != pid
+        finally:
+            pool.close()
@@ -0,0 +1,106 @@
+"""Tests for minimcp_servers.core.http module."""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.http import SESSION_HEADER, create_app
+from minimcp_servers.core.server import ToolServer
+from minimcp_servers.modules import text
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+@pytest.fixture
+def client():
+    with TestClient(create_app(mcp_from_module("text-utils", "1.0.0", "", [text]))) as client:
+        yield client
+
+
+class TestCreateApp:
+    """Test the Streamable HTTP application."""
+
+    def test_initialize(self, client):
+        """Test the initialize request."""
+        params = {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}}
+        message = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": params}
+
+        response = client.post("/mcp", json=message, headers=HEADERS)
+
+        assert response.status_code == 200
+        assert response.json()["result"]["serverInfo"]["name"] == "text-utils"
+
+    def test_tool_calls_share_connection(self, client):
+        """Test multiple tool calls over the same client."""
+        for request_id, data in enumerate(["a", "b", "c"]):
+            params = {"name": "length", "arguments": {"text": data * request_id}}
+            message = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params}
+
+            response = client.post("/mcp", json=message, headers=HEADERS)
+
+            assert response.status_code == 200
+            assert response.json()["result"]["structuredContent"] == {"result": request_id}
+
+    def test_notification(self, client):
+        """Test that notifications are accepted without content."""
+        message = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+        response = client.post("/mcp", json=message, headers=HEADERS)
+
+        assert response.status_code == 202
+
+    def test_oversized_body(self):
+        """Test that bodies over the maximum frame size are rejected before being read."""
+        mcp = mcp_from_module("text-utils", "1.0.0", "", [text], max_frame_bytes=1000)
+        params = {"name": "length", "arguments": {"text": "x" * 2000}}
+        message = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": params}
+
+        with TestClient(create_app(mcp)) as client:
+            assert client.post("/mcp", json=message, headers=HEADERS).status_code == 413
+
+    def test_unsupported_method(self, client):
+        """Test that only POST is supported."""
+        assert client.get("/mcp", headers=HEADERS).status_code == 405
+
+    def test_sessions(self, client):
+        """Test that requests without a session get a new one, and requests with one keep it."""
+        message = {"jsonrpc": "2.0", "id": 1, "method": "ping"}
+
+        first = client.post("/mcp", json=message, headers=HEADERS).headers[SESSION_HEADER]
+        second = client.post("/mcp", json=message, headers=HEADERS).headers[SESSION_HEADER]
+        kept = client.post("/mcp", json=message, headers=HEADERS | {SESSION_HEADER: first}).headers[SESSION_HEADER]
+
+        assert first != second
+        assert kept == first
+
+    def test_cancel_own_requests(self):
+        """Test that a client cancelling a request id only cancels its own request, not another client's."""
+
+        async def slow(seconds: float) -> str:
+            await anyio.sleep(seconds)
+            return "done"
+
+        mcp = ToolServer("test", "1.0.0", "")
+        mcp.tool.add(slow)
+
+        def call(session: str, seconds: float):
+            params = {"name": "slow", "arguments": {"seconds": seconds}}
+            message = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": params}
+            return client.post("/mcp", json=message, headers=HEADERS | {SESSION_HEADER: session})
+
+        with TestClient(create_app(mcp)) as client, ThreadPoolExecutor(2) as executor:
+            other = executor.submit(call, "b", 0.5)
+            time.sleep(0.1)
+            cancelled = executor.submit(call, "a", 10)
+            time.sleep(0.1)
+
+            cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 1}}
+            client.post("/mcp", json=cancel, headers=HEADERS | {SESSION_HEADER: "a"})
+
+            assert json.loads(other.result(5).text)["result"]["structuredContent"] == {"result": "done"}
+            assert "result" not in cancelled.result(5).text
@@ -0,0 +1,97 @@
+"""Tests for minimcp_servers.core.logger module."""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import textwrap
+from queue import Queue
+
+from minimcp_servers.core.logger import BoundedQueueHandler, JsonFormatter
+
+
+def _record(msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+class TestJsonFormatter:
+    """Test JsonFormatter class."""
+
+    def test_format(self):
+        """Test that records are formatted as JSON objects, with their exception."""
+        entry = json.loads(JsonFormatter().format(_record("Registered %d tools", 3)))
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test"
+        assert entry["message"] == "Registered 3 tools"
+        assert "exception" not in entry
+
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            record = _record("Failed")
+            record.exc_info = sys.exc_info()
+        assert "ValueError: bad" in json.loads(JsonFormatter().format(record))["exception"]
+
+
+class TestBoundedQueueHandler:
+    """Test BoundedQueueHandler class."""
+
+    def test_records_are_not_formatted(self):
+        """Test that records are queued as is, to be formatted by the listener."""
+        records = Queue(10)
+        record = _record("Registered %d tools", 3)
+        BoundedQueueHandler(records).handle(record)
+
+        assert records.get_nowait() is record
+        assert record.args == (3,)
+
+    def test_drop(self):
+        """Test that records are dropped when the queue is full, and reported once it has room."""
+        records = Queue(2)
+        handler = BoundedQueueHandler(records, block=False)
+        for i in range(4):
+            handler.handle(_record(f"record {i}"))
+
+        assert handler.dropped == 2
+        assert [records.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+        handler.handle(_record("record 4"))
+        assert records.get_nowait().getMessage() == "record 4"
+        assert records.get_nowait().getMessage() == "Dropped 2 log records, the log queue was full"
+        assert records.empty()
+
+
+class TestConfigureLogging:
+    """Test configure_logging function in queue mode."""
+
+    def test_queue_mode(self, tmp_path):
+        """Test that records of the process, and of its forked children, are written as JSON lines."""
+        log_file = tmp_path / "server.log"
+        script = textwrap.dedent(
+            """
+            import logging, os
+            from minimcp_servers.core.logger import configure_logging, stop_logging
+
+            configure_logging()
+            logging.getLogger("parent").info("before fork")
+            pid = os.fork()
+            if pid == 0:
+                logging.getLogger("child").info("in child")
+                stop_logging()
+                os._exit(0)
+            os.waitpid(pid, 0)
+            logging.getLogger("parent").info("after fork")
+            """
+        )
+        env = {
+            **os.environ,
+            "MCP_SERVER_LOG_FILE": str(log_file),
+            "MCP_SERVER_LOG_LEVEL": "INFO",
+            "MCP_SERVER_LOG_FORMAT": "json",
+            "MCP_SERVER_LOG_QUEUE_SIZE": "100",
+        }
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, timeout=30)
+
+        messages = sorted(json.loads(line)["message"] for line in log_file.read_text().splitlines())
+        assert messages == ["after fork", "before fork", "in child"]
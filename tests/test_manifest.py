@@ -0,0 +1,208 @@
+"""Tests for minimcp_servers.core.manifest module."""
+
+import importlib
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+
+import pytest
+from minimcp.server.managers import tool_manager
+
+import minimcp_servers.servers
+from minimcp_servers.core import manifest as manifest_module
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.manifest import (
+    DeferredFuncDetails,
+    LazyTool,
+    Manifest,
+    ToolEntry,
+    ToolRegistry,
+    load_manifest,
+    manifest_fingerprint,
+    write_manifest,
+)
+from minimcp_servers.core.server import ToolServer
+from minimcp_servers.modules import text
+from minimcp_servers.modules.math import arithmetic, continuous, discrete, stats
+from tests.helpers import request
+
+MATH_MODULES = [arithmetic, continuous, discrete, stats]
+
+
+def _server_modules():
+    for module_info in pkgutil.iter_modules(minimcp_servers.servers.__path__):
+        yield importlib.import_module(f"minimcp_servers.servers.{module_info.name}")
+
+
+class TestManifestFingerprint:
+    """Test manifest_fingerprint function."""
+
+    def test_fingerprint(self):
+        """Test that the fingerprint depends on the modules and on namespacing."""
+        fingerprint = manifest_fingerprint([text.__name__], False)
+
+        assert fingerprint == manifest_fingerprint([text.__name__], False)
+        assert fingerprint != manifest_fingerprint([text.__name__], True)
+        assert fingerprint != manifest_fingerprint([text.__name__, discrete.__name__], False)
+
+
+class TestManifestFiles:
+    """Test writing and loading manifest files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a written manifest is loaded back with a matching fingerprint."""
+        entry = ToolEntry("length", "minimcp_servers.modules.text", "length", {"name": "length", "inputSchema": {}})
+        write_manifest("test", Manifest("abc", [entry]), tmp_path)
+
+        assert load_manifest("test", "abc", tmp_path) == Manifest("abc", [entry])
+
+    def test_missing_stale_or_invalid(self, tmp_path):
+        """Test that unusable manifests are ignored."""
+        assert load_manifest("test", "abc", tmp_path) is None
+
+        write_manifest("test", Manifest("abc", []), tmp_path)
+        assert load_manifest("test", "def", tmp_path) is None
+
+        (tmp_path / "test.json").write_text("not json")
+        assert load_manifest("test", "abc", tmp_path) is None
+
+
+class TestLazyTool:
+    """Test LazyTool class."""
+
+    def test_binds_on_first_call(self):
+        """Test that the function is imported and bound once, on first call."""
+        bound = []
+
+        def bind(func):
+            bound.append(func)
+            return func
+
+        tool = LazyTool(text.__name__, "length", bind)
+        assert bound == []
+
+        assert tool(text="abcd") == 4
+        assert tool(text="ab") == 2
+        assert bound == [text.length]
+
+    def test_deferred_details(self):
+        """Test that the details of a lazy tool are those of its function."""
+        details = DeferredFuncDetails(LazyTool(text.__name__, "length", lambda func: func))
+
+        assert details.meta.arg_model.model_json_schema()["required"] == ["text"]
+
+
+class TestToolRegistry:
+    """Test ToolRegistry class."""
+
+    def test_add_definition(self):
+        """Test that tools added from definitions build their validators on first use."""
+        mcp = ToolServer("test")
+        definition = mcp.tool.add(text.length).model_dump(mode="json", by_alias=True, exclude_none=True)
+        registry = ToolRegistry(mcp._core)
+
+        tool = registry.add_definition(text.length, definition)
+        details = registry._tools["length"][2]
+
+        assert tool.name == "length"
+        assert isinstance(details, DeferredFuncDetails)
+        assert not details.built
+
+        assert details.meta.arg_model.model_validate({"text": "abc"})
+        assert details.built
+
+        with pytest.raises(ValueError):
+            registry.add_definition(text.length, definition)
+
+
+class TestMcpFromManifest:
+    """Test building servers from their tool manifest."""
+
+    @pytest.mark.asyncio
+    async def test_same_tools_as_introspection(self):
+        """Test that tools registered from the manifest match the introspected ones."""
+        introspected = mcp_from_module("math-utils", "1.0.0", "", MATH_MODULES, use_manifest=False)
+        precomputed = mcp_from_module("math-utils", "1.0.0", "", MATH_MODULES, use_manifest=True)
+
+        assert isinstance(precomputed.tool._tools["add"][2], DeferredFuncDetails)
+        assert (await request(introspected, "tools/list")) == (await request(precomputed, "tools/list"))
+
+    @pytest.mark.asyncio
+    async def test_call_tool(self):
+        """Test calling tools registered from the manifest, including invalid arguments."""
+        mcp = mcp_from_module("text-utils", "1.0.0", "", [text], use_manifest=True)
+
+        response = await request(mcp, "tools/call", {"name": "length", "arguments": {"text": "abc"}})
+        assert response["result"]["structuredContent"] == {"result": 3}
+        assert mcp.tool._tools["length"][2].meta is not None
+
+        response = await request(mcp, "tools/call", {"name": "length", "arguments": {}})
+        assert response["result"]["isError"] is True
+
+    def test_stale_manifest_falls_back(self, monkeypatch, tmp_path):
+        """Test that modules are introspected when there is no matching manifest."""
+        monkeypatch.setattr(manifest_module, "MANIFEST_DIR", tmp_path)
+
+        mcp = mcp_from_module("text-utils", "1.0.0", "", [text], use_manifest=True)
+
+        assert not isinstance(mcp.tool._tools["length"][2], DeferredFuncDetails)
+        assert mcp.manifest is not None
+        assert len(mcp.manifest.tools) == len(mcp.tool.list())
+
+    def test_modules_imported_on_first_call(self):
+        """Test that a server built from its manifest only imports the module of a tool when it is called."""
+        script = """
+import asyncio, json, sys
+from minimcp_servers.servers.math_utils import create_server
+
+mcp = create_server()
+def loaded():
+    modules = [name for name, module in sys.modules.items() if getattr(module, "__file__", None)]
+    return sorted(name.rsplit(".", 1)[-1] for name in modules if name.startswith("minimcp_servers.modules"))
+
+before = loaded()
+message = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "mean", "arguments": {"data": [1, 2]}}}
+asyncio.run(mcp.handle(json.dumps(message)))
+print(json.dumps([before, loaded()]))
+"""
+        env = {**os.environ, "MCP_SERVER_MANIFEST": "1"}
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+
+        assert json.loads(output.stdout) == [[], ["stats"]]
+
+    def test_no_introspection(self, monkeypatch):
+        """Test that a server built from its manifest takes its definitions from it, without introspection."""
+
+        def extract_func_details(func):
+            raise AssertionError(f"Introspected {func.__name__}")
+
+        monkeypatch.setattr(tool_manager, "extract_func_details", extract_func_details)
+
+        mcp = mcp_from_module("math-utils", "1.0.0", "", MATH_MODULES, use_manifest=True)
+
+        assert mcp.manifest is not None
+        assert "mean" in mcp.tool and "factorial" in mcp.tool
+        definitions = [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in mcp.tool.list()]
+        assert definitions == [entry.definition for entry in mcp.manifest.tools]
+        for _, handler, details in mcp.tool._tools.values():
+            assert isinstance(handler, LazyTool) and handler._bound is None
+            assert isinstance(details, DeferredFuncDetails) and not details.built
+
+
+class TestPackagedManifests:
+    """Test the manifests packaged with the servers."""
+
+    @pytest.mark.parametrize("server_module", list(_server_modules()), ids=lambda module: module.__name__)
+    def test_manifest_is_current(self, monkeypatch, server_module):
+        """Test that the packaged manifest of each server matches its modules."""
+        monkeypatch.setenv("MCP_SERVER_MANIFEST", "0")
+        monkeypatch.delenv("MCP_SERVER_NAMESPACES", raising=False)
+
+        mcp = server_module.create_server()
+
+        assert mcp.manifest is not None
+        assert load_manifest(mcp.name, mcp.manifest.fingerprint) == mcp.manifest, (
+            "Regenerate the manifests with: python -m minimcp_servers.core.manifest"
+        )
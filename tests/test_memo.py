@@ -0,0 +1,112 @@
+"""Tests for minimcp_servers.core.memo module."""
+
+import math
+
+import pytest
+
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.memo import MemoStore, decode_int, encode_int
+from minimcp_servers.modules.math import discrete
+from tests.helpers import call_tool
+
+
+class TestIntEncoding:
+    """Test encode_int and decode_int functions."""
+
+    @pytest.mark.parametrize("value", [0, 1, -1, 255, -256, 2**64, -(3**500), math.factorial(1000)])
+    def test_round_trip(self, value):
+        """Test that integers of any sign and size are decoded back."""
+        assert decode_int(encode_int(value)) == value
+
+
+class TestMemoStore:
+    """Test MemoStore class."""
+
+    def test_get_and_put(self, tmp_path):
+        """Test that stored results are returned and counted."""
+        store = MemoStore(str(tmp_path / "memo.sqlite3"), 1024 * 1024)
+
+        assert store.get("a") is None
+        store.put("a", math.factorial(500))
+        assert store.get("a") == math.factorial(500)
+        assert store.stats() == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+    def test_shared_across_instances(self, tmp_path):
+        """Test that results stored by one store are read by another one using the same file."""
+        path = str(tmp_path / "nested" / "memo.sqlite3")
+        first = MemoStore(path, 1024 * 1024)
+        first.put("a", 42)
+        first.close()
+
+        assert MemoStore(path, 1024 * 1024).get("a") == 42
+
+    def test_compaction(self, tmp_path):
+        """Test that the least recently read results are deleted past max_bytes."""
+        store = MemoStore(str(tmp_path / "memo.sqlite3"), 2500)
+        value = 1 << 7000  # 876 bytes
+        store.put("a", value)
+        store.put("b", value)
+        store.get("a")
+        store.put("c", value)
+
+        assert store.get("b") is None
+        assert store.get("a") == value
+        assert store.get("c") == value
+        assert store.evictions == 1
+
+    def test_database_errors(self, tmp_path):
+        """Test that an unusable database is reported without raising."""
+        store = MemoStore(str(tmp_path), 1024)
+
+        store.put("a", 1)
+        assert store.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_wrap(self, tmp_path):
+        """Test that integer results of slow enough calls are stored and reused."""
+        calls = []
+
+        def square(x: int) -> int:
+            calls.append(x)
+            return x * x
+
+        store = MemoStore(str(tmp_path / "memo.sqlite3"), 1024 * 1024, min_time=0)
+        memoized = store.wrap("square", square)
+
+        assert await memoized(x=3) == 9
+        assert await memoized(x=3) == 9
+        assert calls == [3]
+
+        slow_only = MemoStore(str(tmp_path / "other.sqlite3"), 1024 * 1024, min_time=60).wrap("square", square)
+        assert await slow_only(x=4) == 16
+        assert await slow_only(x=4) == 16
+        assert calls == [3, 4, 4]
+
+
+class TestMcpFromModuleMemo:
+    """Test the persistent memo store of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    async def test_results_are_shared_between_servers(self, tmp_path):
+        """Test that a server reuses the results stored by another one, whatever the tool names."""
+        path = str(tmp_path / "memo.sqlite3")
+        first = mcp_from_module("first", "1.0.0", "", [discrete], cache_size=0, memo_path=path, memo_min_time=0)
+        second = mcp_from_module(
+            "second", "1.0.0", "", [discrete], cache_size=0, memo_path=path, memo_min_time=0, namespaced=True
+        )
+        assert first.memo_store is not None
+        assert second.memo_store is not None
+
+        result = await call_tool(first, "factorial", {"x": 30})
+        assert result["structuredContent"] == {"result": math.factorial(30)}
+        await call_tool(first, "gcd", {"a": 12, "b": 18})
+        assert first.memo_store.writes == 1
+
+        result = await call_tool(second, "discrete_factorial", {"x": 30})
+        assert result["structuredContent"] == {"result": math.factorial(30)}
+        assert second.memo_store.hits == 1
+
+    def test_memo_disabled_by_default(self, monkeypatch):
+        """Test that the memo store is only enabled with a path."""
+        monkeypatch.delenv("MCP_SERVER_MEMO_PATH", raising=False)
+        assert mcp_from_module("test", "1.0.0", "", [discrete]).memo_store is None
@@ -0,0 +1,152 @@
+"""Tests for minimcp_servers.core.metadata module."""
+
+import importlib
+import inspect
+import sys
+from importlib.machinery import ModuleSpec
+from pathlib import Path
+from types import ModuleType
+
+import anyio
+import pytest
+
+from minimcp_servers.core.admission import DEFAULT_LANE, FAST_LANE, HEAVY_LANE
+from minimcp_servers.core.builder import cost_policy, mcp_from_module, tool_lane
+from minimcp_servers.core.metadata import TOOL_METADATA, module_metadata
+from minimcp_servers.modules import datetime, random_generator
+from minimcp_servers.modules.math import discrete
+from tests.helpers import call_message
+
+# Modules of the servers, a namespace package
+MODULES_DIR = Path(datetime.__file__).parent
+
+
+def _module(**attributes) -> ModuleType:
+    module = ModuleType("tools")
+    module.__spec__ = ModuleSpec("tools", None)
+
+    def repeat(text: str, times: int = 2) -> str:
+        return text * times
+
+    def now() -> float:
+        return 0.0
+
+    module.repeat = repeat  # pyright: ignore[reportAttributeAccessIssue]
+    module.now = now  # pyright: ignore[reportAttributeAccessIssue]
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    return module
+
+
+class TestModuleMetadata:
+    """Test module_metadata function."""
+
+    def test_module_metadata(self):
+        """Test that declared metadata is completed with the defaults."""
+        metadata = module_metadata(_module(__tools__={"repeat": {"cost": "linear", "size": "text", "timeout": 5}}))
+
+        assert metadata == {"repeat": TOOL_METADATA | {"cost": "linear", "size": "text", "timeout": 5}}
+
+    @pytest.mark.parametrize(
+        "tools",
+        [
+            {"missing": {"pure": False}},
+            {"repeat": {"cheap": True}},
+            {"repeat": {"cost": "quadratic"}},
+            {"repeat": {"size": "length"}},
+        ],
+    )
+    def test_invalid_metadata(self, tools):
+        """Test that metadata of unknown functions, unknown fields, cost classes or arguments is rejected."""
+        with pytest.raises(ValueError):
+            module_metadata(_module(__tools__=tools))
+
+    def test_modules(self):
+        """Test the metadata declared by the modules of the servers."""
+        assert module_metadata(discrete)["factorial"]["cost"] == "superlinear"
+        assert module_metadata(datetime)["iso_utc_now"]["pure"] is False
+        assert module_metadata(datetime)["iso_utc_now"]["idempotent"] is True
+        assert module_metadata(random_generator)["generate_uuid"]["idempotent"] is False
+
+    @pytest.mark.parametrize(
+        "module_name",
+        [
+            ".".join(("minimcp_servers.modules", *path.relative_to(MODULES_DIR).with_suffix("").parts))
+            for path in sorted(MODULES_DIR.rglob("*.py"))
+        ],
+    )
+    def test_functions_declared(self, module_name):
+        """Test that every function of the modules of the servers declares its metadata, its cost included."""
+        module = importlib.import_module(module_name)
+        functions = {
+            name
+            for name, attr in vars(module).items()
+            if not name.startswith("_") and (inspect.isfunction(attr) or inspect.isbuiltin(attr))
+        }
+        declared = module_metadata(module)
+        assert functions - declared.keys() == set()
+        assert all(fields["cost"] is not None for fields in declared.values())
+
+
+class TestCostClasses:
+    """Test the offload policy and lane of each cost class."""
+
+    def test_cost_policy(self):
+        """Test that the policy follows the declared cost, "auto" if not declared."""
+        assert cost_policy("constant") == "inline"
+        assert cost_policy("linear") == "auto"
+        assert cost_policy("superlinear") == "process"
+        assert cost_policy(None) == "auto"
+
+    def test_tool_lane(self):
+        """Test that the declared cost takes precedence over the arguments of the tool."""
+        scalar = {"inputSchema": {"properties": {"x": {"type": "number"}}}}
+
+        assert tool_lane(scalar, "auto", "linear") == DEFAULT_LANE
+        assert tool_lane(scalar, "auto", "superlinear") == HEAVY_LANE
+        assert tool_lane(scalar, "process", "constant") == HEAVY_LANE
+        assert tool_lane({"inputSchema": {"properties": {}}}, "auto", "constant") == FAST_LANE
+
+
+class TestMcpFromModuleMetadata:
+    """Test the use of the declared metadata by mcp_from_module."""
+
+    @pytest.mark.parametrize("use_manifest", [True, False])
+    def test_lanes(self, use_manifest):
+        """Test that tools run in the lane of their declared cost, with or without the manifest."""
+        mcp = mcp_from_module(
+            "discrete-math-utils", "1.0.0", "", ["minimcp_servers.modules.math.discrete"], use_manifest=use_manifest
+        )
+        assert mcp.admission is not None
+        assert mcp.manifest is not None
+
+        assert mcp.admission.lane("factorial") == HEAVY_LANE
+        assert mcp.admission.lane("gcd") == DEFAULT_LANE
+        assert {entry.name: entry.size for entry in mcp.manifest.tools}["combination"] == "n"
+
+    def test_declared_timeout(self, monkeypatch):
+        """Test that declared timeouts are the defaults of their tools, overridden by tool_timeouts."""
+        module = _module(__tools__={"repeat": {"timeout": 5}, "now": {"timeout": 5}})
+        monkeypatch.setitem(sys.modules, "tools", module)
+        mcp = mcp_from_module("test", "1.0.0", "", [module], timeout=30, tool_timeouts={"now": 1})
+
+        assert mcp.tool_timeout("repeat") == 5
+        assert mcp.tool_timeout("now") == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("idempotent", [True, False])
+    async def test_impure_tools(self, monkeypatch, idempotent):
+        """Test that impure tools are never cached, and their concurrent calls only merged when idempotent."""
+        module = _module(__tools__={"repeat": {"pure": False, "idempotent": idempotent}})
+        monkeypatch.setitem(sys.modules, "tools", module)
+        mcp = mcp_from_module("test", "1.0.0", "", [module], offload={"repeat": "thread"})
+        assert mcp.result_cache is not None and mcp.single_flight is not None
+        message = call_message(1, "repeat", {"text": "ab"})
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                for _ in range(4):
+                    tg.start_soon(mcp.handle, message)
+
+        assert len(mcp.result_cache) == 0
+        assert (mcp.single_flight.merged > 0) is idempotent
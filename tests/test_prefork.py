@@ -0,0 +1,146 @@
+"""Tests for minimcp_servers.core.prefork module."""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from minimcp_servers.core import prefork
+from minimcp_servers.core.prefork import Supervisor, WorkerStartupError, reuse_port_socket, worker_rss
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Pre-forking is tested on Linux")
+
+
+def _supervise(supervisor: Supervisor, until, timeout: float = 10.0) -> None:
+    thread = threading.Thread(target=supervisor.run)
+    thread.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        supervisor.stop()
+        thread.join(timeout)
+
+
+class TestReusePortSocket:
+    """Test reuse_port_socket function."""
+
+    def test_sockets_share_port(self):
+        """Test that several sockets can bind to the same port."""
+        first = reuse_port_socket("127.0.0.1", 0)
+        port = first.getsockname()[1]
+        second = reuse_port_socket("127.0.0.1", port)
+        try:
+            assert second.getsockname()[1] == port
+        finally:
+            first.close()
+            second.close()
+
+
+class TestWorkerRss:
+    """Test worker_rss function."""
+
+    def test_worker_rss(self):
+        """Test reading the resident memory of a process."""
+        assert (worker_rss(os.getpid()) or 0) > 0
+        assert worker_rss(2**22 + 1) is None
+
+
+class TestSupervisor:
+    """Test Supervisor class."""
+
+    def test_invalid_workers(self):
+        """Test that the number of workers must be positive."""
+        with pytest.raises(ValueError):
+            Supervisor(lambda: None, 0)
+
+    def test_restarts_exited_workers(self):
+        """Test that workers are started, and restarted when they exit."""
+        started = multiprocessing.get_context("fork").Queue()
+        pids = set()
+
+        def target():
+            started.put(os.getpid())
+            time.sleep(0.2)
+
+        def restarted() -> bool:
+            while not started.empty():
+                pids.add(started.get())
+            return len(pids) >= 4
+
+        _supervise(Supervisor(target, 2, check_interval=0.05, min_uptime=0.1), restarted)
+
+        assert len(pids) >= 4
+
+    def test_workers_failing_at_startup(self):
+        """Test that workers exiting at startup are restarted with an exponential backoff, then given up."""
+        started = multiprocessing.get_context("fork").Queue()
+        errors = []
+
+        def target():
+            started.put(time.monotonic())
+            sys.exit(1)
+
+        def run():
+            try:
+                Supervisor(target, 1, check_interval=0.05).run()
+            except WorkerStartupError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join(10)
+
+        assert not thread.is_alive()
+        assert len(errors) == 1
+        times = [started.get(timeout=1) for _ in range(prefork.WORKER_STARTUP_FAILURES)]
+        assert started.empty()
+        delays = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert delays[-1] > 2 * delays[0]
+
+    def test_restarts_workers_over_memory_ceiling(self):
+        """Test that a worker exceeding the memory ceiling is replaced."""
+        started = multiprocessing.get_context("fork").Queue()
+        pids = set()
+
+        def target():
+            started.put(os.getpid())
+            memory = bytearray(64 * 1024 * 1024)  # noqa: F841
+            time.sleep(30)
+
+        def restarted() -> bool:
+            while not started.empty():
+                pids.add(started.get())
+            return len(pids) >= 2
+
+        rss = worker_rss(os.getpid()) or 0
+        _supervise(Supervisor(target, 1, max_memory=rss + 32 * 1024 * 1024, check_interval=0.05), restarted)
+
+        assert len(pids) >= 2
+
+    def test_stop_shuts_down_workers(self):
+        """Test that stopping the supervisor terminates the workers."""
+        started = multiprocessing.get_context("fork").Queue()
+
+        def target():
+            started.put(os.getpid())
+            time.sleep(30)
+
+        pids = set()
+
+        def running() -> bool:
+            while not started.empty():
+                pids.add(started.get())
+            return len(pids) == 2
+
+        _supervise(Supervisor(target, 2, check_interval=0.05), running)
+
+        assert len(pids) == 2
+
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -0,0 +1,206 @@
+"""Tests for minimcp_servers.core.profiler module."""
+
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+
+import pytest
+
+from minimcp_servers.core import profiler as profiler_module
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.logger import get_profile_mode
+from minimcp_servers.core.profiler import CallProfiler, collapse_stack
+from minimcp_servers.modules.math import discrete
+from tests.helpers import call_tool
+
+
+def busy_loop(seconds: float) -> int:
+    """Spin for the given number of seconds."""
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+class TestCollapseStack:
+    """Test collapse_stack function."""
+
+    def test_collapse_stack(self):
+        """Test that stacks run from the outermost frame, and stop at root."""
+
+        def inner():
+            return collapse_stack(sys._getframe(), root)
+
+        def outer():
+            return inner()
+
+        root = sys._getframe()
+        stack = outer()
+
+        assert stack.startswith("outer (test_profiler.py:")
+        assert ";inner (test_profiler.py:" in stack
+        assert "test_collapse_stack" not in stack
+
+
+class TestCallProfiler:
+    """Test CallProfiler class."""
+
+    def test_cprofile(self, tmp_path):
+        """Test that profiles of slow calls are added up in a pstats file per tool."""
+        profiler = CallProfiler("cprofile", str(tmp_path), threshold=0.01)
+        profiled = profiler.wrap("busy", busy_loop)
+
+        assert profiled(seconds=0.0) >= 0
+        assert not os.path.exists(profiler.path("busy"))
+
+        profiled(seconds=0.02)
+        profiled(seconds=0.02)
+
+        assert profiler.captured == 2
+        stats = pstats.Stats(profiler.path("busy"))
+        calls = {func[2]: stat[1] for func, stat in stats.stats.items()}  # pyright: ignore[reportAttributeAccessIssue]
+        assert calls["busy_loop"] == 2
+
+    def test_sample(self, tmp_path):
+        """Test that stacks of slow calls are sampled into a collapsed-stack file per tool."""
+        profiler = CallProfiler("sample", str(tmp_path), threshold=0.01, interval=0.001)
+        profiled = profiler.wrap("busy", busy_loop)
+
+        profiled(seconds=0.1)
+
+        assert profiler.captured == 1
+        with open(profiler.path("busy")) as f:
+            lines = f.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("busy_loop (test_profiler.py:")
+            assert int(count) > 0
+
+    def test_rate(self, tmp_path):
+        """Test that no call is profiled with a rate of 0."""
+        profiler = CallProfiler("cprofile", str(tmp_path), threshold=0.0, rate=0.0)
+        profiler.wrap("busy", busy_loop)(seconds=0.01)
+
+        assert profiler.captured == 0
+
+    def test_concurrent_calls(self, tmp_path):
+        """Test that calls started while another one is profiled with cProfile run unprofiled."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def wait(started: threading.Event, release: threading.Event) -> str:
+            started.set()
+            release.wait(5)
+            return "done"
+
+        profiler = CallProfiler("cprofile", str(tmp_path), threshold=0.0)
+        profiled = profiler.wrap("wait", wait)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(profiled(started=started, release=release)))
+        thread.start()
+        try:
+            assert started.wait(5)
+            done = threading.Event()
+            done.set()
+            assert profiled(started=threading.Event(), release=done) == "done"
+        finally:
+            release.set()
+            thread.join(5)
+
+        assert results == ["done"]
+        assert profiler.captured == 1
+
+    def test_profiler_errors(self, tmp_path, monkeypatch):
+        """Test that failures of the profiler never replace the result or the exception of a call."""
+
+        class ActiveProfile:
+            def enable(self) -> None:
+                raise ValueError("Another profiling tool is already active")
+
+        def fail() -> None:
+            raise KeyError("tool error")
+
+        profiler = CallProfiler("cprofile", str(tmp_path), threshold=0.0)
+        monkeypatch.setattr(profiler_module.cProfile, "Profile", ActiveProfile)
+        assert profiler.wrap("busy", busy_loop)(seconds=0.0) >= 0
+
+        monkeypatch.undo()
+        monkeypatch.setattr(profiler_module.pstats, "Stats", lambda profile: 1 / 0)
+        assert profiler.wrap("busy", busy_loop)(seconds=0.0) >= 0
+        with pytest.raises(KeyError):
+            profiler.wrap("fail", fail)()
+        assert profiler.captured == 0
+
+    def test_wrap(self, tmp_path):
+        """Test that wrappers keep the signature of functions, and coroutine functions are left as is."""
+
+        async def double(x: float) -> float:
+            return x * 2
+
+        profiler = CallProfiler("sample", str(tmp_path))
+        profiled = profiler.wrap("busy", busy_loop)
+
+        assert inspect.signature(profiled) == inspect.signature(busy_loop)
+        assert profiled.__doc__ == busy_loop.__doc__
+        assert profiler.wrap("double", double) is double
+
+    def test_unsafe_tool_names(self, tmp_path):
+        """Test that tool names are sanitized in file names."""
+        path = CallProfiler("cprofile", str(tmp_path)).path("../tool")
+
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.basename(path) == f".._tool.{os.getpid()}.pstats"
+
+    def test_invalid_mode(self, tmp_path):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            CallProfiler("perf", str(tmp_path))
+
+
+class TestProfileMode:
+    """Test get_profile_mode function."""
+
+    def test_profile_mode(self, monkeypatch):
+        """Test that the mode is read from MCP_SERVER_PROFILE, and invalid values turn it off."""
+        monkeypatch.delenv("MCP_SERVER_PROFILE", raising=False)
+        assert get_profile_mode() == "off"
+
+        monkeypatch.setenv("MCP_SERVER_PROFILE", " CProfile ")
+        assert get_profile_mode() == "cprofile"
+
+        monkeypatch.setenv("MCP_SERVER_PROFILE", "perf")
+        assert get_profile_mode() == "off"
+
+
+class TestMcpFromModuleProfile:
+    """Test profiling of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    async def test_profile(self, tmp_path):
+        """Test that calls of the tools running in the server process are profiled."""
+        mcp = mcp_from_module(
+            "test",
+            "1.0.0",
+            "",
+            [discrete],
+            process_workers=0,
+            profile="cprofile",
+            profile_dir=str(tmp_path),
+            profile_threshold=0.0,
+        )
+        assert mcp.profiler is not None
+
+        result = await call_tool(mcp, "factorial", {"x": 10})
+        assert result["structuredContent"] == {"result": 3628800}
+        assert os.path.exists(mcp.profiler.path("factorial"))
+
+    def test_profile_disabled(self, monkeypatch):
+        """Test that profiling is off by default."""
+        monkeypatch.delenv("MCP_SERVER_PROFILE", raising=False)
+
+        assert mcp_from_module("test", "1.0.0", "", [discrete]).profiler is None
@@ -0,0 +1,171 @@
+"""Tests for minimcp_servers.core.server module."""
+
+import json
+
+import anyio
+import pytest
+from minimcp import NoMessage
+
+from minimcp_servers.core.admission import INVALID_REQUEST
+from minimcp_servers.core.server import REQUEST_TIMEOUT, UNLIMITED_IDLE_TIMEOUT, ToolServer
+from tests.helpers import call_message, handle_json
+
+
+async def slow(seconds: float) -> str:
+    """Sleep for the given seconds."""
+    await anyio.sleep(seconds)
+    return "done"
+
+
+def _server(**kwargs) -> ToolServer:
+    mcp = ToolServer("test", "1.0.0", "", **kwargs)
+    mcp.tool.add(slow)
+    return mcp
+
+
+class TestToolServer:
+    """Test ToolServer class."""
+
+    def test_tool_timeout(self):
+        """Test resolution of per-tool and global deadlines."""
+        mcp = _server(timeout=10, tool_timeouts={"slow": 2, "fast": 0})
+
+        assert mcp.tool_timeout("slow") == 2
+        assert mcp.tool_timeout("fast") is None
+        assert mcp.tool_timeout("other") == 10
+        assert _server().tool_timeout("slow") is None
+
+    @pytest.mark.parametrize(
+        ("timeout", "tool_timeouts", "idle_timeout"),
+        [
+            (40, {"slow": 5}, 41),
+            (5, {}, 30),
+            (0, {}, UNLIMITED_IDLE_TIMEOUT),
+            (None, {"slow": 5}, UNLIMITED_IDLE_TIMEOUT),
+            (10, {"slow": 0}, UNLIMITED_IDLE_TIMEOUT),
+        ],
+    )
+    def test_idle_timeout(self, timeout, tool_timeouts, idle_timeout):
+        """Test that MiniMCP's handler time limit is beyond every deadline, out of reach when one is disabled."""
+        mcp = _server(timeout=timeout, tool_timeouts=tool_timeouts)
+
+        assert mcp._limiter._idle_timeout == idle_timeout
+
+    @pytest.mark.asyncio
+    async def test_call_within_deadline(self):
+        """Test that calls completing within their deadline are unaffected."""
+        mcp = _server(timeout=5)
+
+        response = await handle_json(mcp, call_message(1, "slow", {"seconds": 0}))
+
+        assert response["result"]["structuredContent"] == {"result": "done"}
+
+    @pytest.mark.asyncio
+    async def test_call_past_deadline(self):
+        """Test that a call past its deadline returns a JSON-RPC error."""
+        mcp = _server(timeout=5, tool_timeouts={"slow": 0.1})
+
+        response = await handle_json(mcp, call_message(7, "slow", {"seconds": 10}))
+
+        assert response["id"] == 7
+        assert response["error"]["code"] == REQUEST_TIMEOUT
+        assert response["error"]["data"] == {"tool": "slow", "timeout": 0.1}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_by_client(self):
+        """Test that a cancellation notification stops the request, without any response."""
+        mcp = _server()
+        responses = []
+
+        async def call():
+            responses.append(await mcp.handle(call_message(3, "slow", {"seconds": 10})))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call)
+                await anyio.sleep(0.05)
+
+                cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 3}}
+                assert await mcp.handle(json.dumps(cancel)) == NoMessage.NOTIFICATION
+
+        assert responses == [NoMessage.RESPONSE]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_request_id(self):
+        """Test that a request reusing the id of one in flight never takes over its cancellation."""
+        mcp = _server()
+        responses = {}
+
+        async def call(name: str, seconds: float):
+            responses[name] = await mcp.handle(call_message(3, "slow", {"seconds": seconds}))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call, "first", 10)
+                await anyio.sleep(0.05)
+                tg.start_soon(call, "second", 0.2)
+                await anyio.sleep(0.05)
+
+                cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 3}}
+                await mcp.handle(json.dumps(cancel))
+
+        assert responses["first"] == NoMessage.RESPONSE
+        assert isinstance(responses["second"], str) and "done" in responses["second"]
+        assert not mcp._in_flight
+
+    @pytest.mark.asyncio
+    async def test_other_messages(self):
+        """Test that other messages are handled by MiniMCP."""
+        mcp = _server(timeout=5)
+
+        ping = await handle_json(mcp, json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}))
+        assert ping["result"] == {}
+
+        invalid = await handle_json(mcp, "not json")
+        assert "error" in invalid
+
+        cancel_unknown = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 99}}
+        assert await mcp.handle(json.dumps(cancel_unknown)) == NoMessage.NOTIFICATION
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("request_id", [[1], {}, True, 1.5])
+    async def test_invalid_request_id(self, request_id):
+        """Test that requests whose id is not a string or integer get an error with a null id."""
+        mcp = _server()
+        message = json.loads(call_message(1, "slow", {"seconds": 0}))
+
+        response = await handle_json(mcp, json.dumps(message | {"id": request_id}))
+
+        assert response["id"] is None
+        assert response["error"]["code"] == INVALID_REQUEST
+        assert not mcp._in_flight
+
+    @pytest.mark.asyncio
+    async def test_batch(self):
+        """Test that the messages of a JSON-RPC batch are handled concurrently, and answered in one array."""
+        mcp = _server(timeout=5, tool_timeouts={"slow": 1})
+        batch = [
+            json.loads(call_message(1, "slow", {"seconds": 0.2})),
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            json.loads(call_message(2, "slow", {"seconds": 0.2})),
+            json.loads(call_message(3, "slow", {"seconds": 5})),
+            {"jsonrpc": "2.0", "id": 4, "method": "ping"},
+            [],
+        ]
+
+        with anyio.fail_after(1.5):
+            responses = await handle_json(mcp, json.dumps(batch))
+
+        assert [response.get("id") for response in responses[:4]] == [1, 2, 3, 4]
+        assert responses[0]["result"]["structuredContent"] == {"result": "done"}
+        assert responses[2]["error"]["code"] == REQUEST_TIMEOUT
+        assert "error" in responses[4]
+
+    @pytest.mark.asyncio
+    async def test_batch_of_notifications(self):
+        """Test that no response is returned for a batch of notifications, and that empty batches are invalid."""
+        mcp = _server()
+        notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+        assert await mcp.handle(json.dumps([notification, notification])) == NoMessage.NOTIFICATION
+        assert "error" in await handle_json(mcp, "[]")
@@ -0,0 +1,226 @@
+"""Tests for minimcp_servers.core.singleflight module."""
+
+import inspect
+import sys
+import threading
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+
+import anyio
+import pytest
+
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.singleflight import SingleFlight
+from minimcp_servers.modules import text
+from minimcp_servers.modules.math import arithmetic
+from tests.helpers import call_tool
+
+
+class TestSingleFlight:
+    """Test SingleFlight class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_merged(self):
+        """Test that identical concurrent calls run once and share their result, and different ones do not."""
+        single_flight = SingleFlight()
+        release = anyio.Event()
+        calls = []
+
+        async def upper(text: str) -> str:
+            calls.append(text)
+            await release.wait()
+            return text.upper()
+
+        merged = single_flight.wrap("upper", upper)
+        results = []
+
+        async def call(text: str) -> None:
+            results.append(await merged(text=text))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                for value in ("a", "a", "a", "b"):
+                    tg.start_soon(call, value)
+                await anyio.sleep(0.01)
+                assert single_flight.stats() == {"in_flight": 2, "merged": 2}
+                release.set()
+
+        assert sorted(calls) == ["a", "b"]
+        assert sorted(results) == ["A", "A", "A", "B"]
+        assert len(single_flight) == 0
+
+        # Calls after the first one finished run again
+        assert await merged(text="a") == "A"
+        assert calls.count("a") == 2
+
+    @pytest.mark.asyncio
+    async def test_exceptions_are_shared(self):
+        """Test that the waiting calls get the exception of the call they waited for."""
+        single_flight = SingleFlight()
+        release = anyio.Event()
+        calls = 0
+
+        async def fail() -> None:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError("bad")
+
+        merged = single_flight.wrap("fail", fail)
+        errors = []
+
+        async def call() -> None:
+            try:
+                await merged()
+            except ValueError as e:
+                errors.append(e)
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call)
+                tg.start_soon(call)
+                await anyio.sleep(0.01)
+                release.set()
+
+        assert calls == 1
+        assert len(errors) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call(self):
+        """Test that a waiting call runs in turn when the call it waited for is cancelled."""
+        single_flight = SingleFlight()
+        release = anyio.Event()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return calls
+
+        merged = single_flight.wrap("work", work)
+        leader = anyio.CancelScope()
+        results = []
+
+        async def lead() -> None:
+            with leader:
+                await merged()
+
+        async def follow() -> None:
+            results.append(await merged())
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(lead)
+                await anyio.sleep(0.01)
+                tg.start_soon(follow)
+                await anyio.sleep(0.01)
+                leader.cancel()
+                await anyio.sleep(0.01)
+                release.set()
+
+        assert results == [2]
+        assert len(single_flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_unencodable_arguments(self):
+        """Test that calls whose arguments cannot be encoded run on their own."""
+        single_flight = SingleFlight()
+
+        async def identity(value: object) -> object:
+            return value
+
+        value = object()
+        assert single_flight.key("identity", {"value": value}) is None
+        assert await single_flight.wrap("identity", identity)(value=value) is value
+
+    def test_wrap(self):
+        """Test that wrappers keep the signature and docstring of functions."""
+
+        async def double(x: float) -> float:
+            """Double x."""
+            return x * 2
+
+        merged = SingleFlight().wrap("double", double)
+
+        assert inspect.iscoroutinefunction(merged)
+        assert inspect.signature(merged) == inspect.signature(double)
+        assert merged.__doc__ == double.__doc__
+
+
+class TestMcpFromModuleSingleFlight:
+    """Test merged calls of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """Test that identical concurrent calls of an offloaded pure tool are merged."""
+        mcp = mcp_from_module("test", "1.0.0", "", [text], offload={"length": "thread"}, cache_size=0)
+        assert mcp.single_flight is not None
+        results = []
+
+        async def call(request_id: int) -> None:
+            results.append(await call_tool(mcp, "length", {"text": "x" * 100_000}, request_id))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                for request_id in range(4):
+                    tg.start_soon(call, request_id)
+
+        assert [result["structuredContent"] for result in results] == [{"result": 100_000}] * 4
+        assert mcp.single_flight.stats()["in_flight"] == 0
+        assert mcp.single_flight.stats()["merged"] > 0
+
+    @pytest.mark.asyncio
+    async def test_scalar_tools_are_not_merged(self):
+        """Test that tools without sized arguments are left as is."""
+        mcp = mcp_from_module("test", "1.0.0", "", [arithmetic], offload={"sign": "thread"}, cache_size=0)
+        results = []
+
+        async def call(request_id: int) -> None:
+            results.append(await call_tool(mcp, "sign", {"x": -2.5}, request_id))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                for request_id in range(4):
+                    tg.start_soon(call, request_id)
+
+        assert [result["structuredContent"] for result in results] == [{"result": -1}] * 4
+        assert mcp.single_flight is not None and mcp.single_flight.stats() == {"in_flight": 0, "merged": 0}
+
+    @pytest.mark.asyncio
+    async def test_impure_idempotent_tools_are_merged(self, monkeypatch):
+        """Test that merging keys on idempotent: calls of an impure but idempotent tool are merged."""
+        module = ModuleType("tools")
+        module.__spec__ = ModuleSpec("tools", None)
+        release = threading.Event()
+        calls = []
+
+        def lookup(key: str) -> str:
+            calls.append(key)
+            release.wait(5)
+            return key.upper()
+
+        module.lookup = lookup  # pyright: ignore[reportAttributeAccessIssue]
+        module.__tools__ = {"lookup": {"pure": False, "idempotent": True}}  # pyright: ignore[reportAttributeAccessIssue]
+        monkeypatch.setitem(sys.modules, "tools", module)
+        mcp = mcp_from_module("test", "1.0.0", "", [module], offload={"lookup": "thread"})
+        assert mcp.single_flight is not None
+        results = []
+
+        async def call(request_id: int) -> None:
+            results.append(await call_tool(mcp, "lookup", {"key": "ab"}, request_id))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as tg:
+                for request_id in range(4):
+                    tg.start_soon(call, request_id)
+                await anyio.sleep(0.05)
+                release.set()
+
+        assert [result["structuredContent"] for result in results] == [{"result": "AB"}] * 4
+        assert calls == ["ab"]
+        assert mcp.single_flight.stats()["merged"] == 3
+
+    def test_single_flight_disabled(self):
+        """Test that calls are not merged when disabled."""
+        assert mcp_from_module("test", "1.0.0", "", [text], single_flight=False).single_flight is None
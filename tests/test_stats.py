@@ -0,0 +1,178 @@
+"""Tests for minimcp_servers.core.stats module."""
+
+import inspect
+import json
+
+import pytest
+
+from minimcp_servers.core import stats as stats_module
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.stats import (
+    LATENCY_BUCKETS,
+    STATS_TOOL_NAME,
+    ServerStats,
+    ToolStats,
+    size_parameter,
+)
+from minimcp_servers.modules.math import discrete
+from tests.helpers import call_tool
+
+
+class TestToolStats:
+    """Test ToolStats class."""
+
+    def test_percentiles(self):
+        """Test that percentiles are upper bounds of the latency, from the histogram."""
+        stats = ToolStats()
+        stats.latency[0] = 98
+        stats.latency[10] = 2
+        stats.max_ns = 800_000
+
+        assert stats.calls == 100
+        assert stats.percentile_ms(0.5) == 1024 / 1e6
+        assert stats.percentile_ms(0.99) == 0.8
+
+    def test_snapshot(self):
+        """Test that snapshots only hold the non-empty buckets."""
+        stats = ToolStats()
+        stats.latency[1] = 2
+        stats.sizes[3] = 2
+        stats.total_ns = 3000
+        stats.max_ns = 2000
+
+        snapshot = stats.snapshot()
+        assert snapshot["calls"] == 2
+        assert snapshot["mean_ms"] == 0.0015
+        assert snapshot["latency_ms"] == {"<0.002048": 2}
+        assert snapshot["input_size"] == {"<8": 2}
+        assert ToolStats().snapshot()["mean_ms"] == 0.0
+
+
+class TestSizeParameter:
+    """Test size_parameter function."""
+
+    def test_size_parameter(self):
+        """Test that the first required sized parameter is found and measured."""
+
+        def mean(array: list[float], precision: int = 2) -> float:
+            return 0.0
+
+        def factorial(n: int) -> int:
+            return 1
+
+        def sign(x: float) -> int:
+            return 0
+
+        array = size_parameter(mean)
+        assert array is not None
+        assert array[0] == "array"
+        assert array[1]([1.0] * 5) == 5
+
+        integer = size_parameter(factorial)
+        assert integer is not None
+        assert integer[0] == "n"
+        assert integer[1](1 << 640) == 10
+
+        assert size_parameter(sign) is None
+
+
+class TestServerStats:
+    """Test ServerStats class."""
+
+    def test_wrap_sync(self):
+        """Test that calls and errors of a synchronous function are counted."""
+
+        def root(x: list[int]) -> int:
+            """Return the first item."""
+            return x[0]
+
+        stats = ServerStats()
+        wrapped = stats.wrap("root", root)
+
+        assert wrapped(x=[1, 2, 3]) == 1
+        with pytest.raises(IndexError):
+            wrapped(x=[])
+
+        tool = stats.tools["root"]
+        assert tool.calls == 2
+        assert tool.errors == 1
+        assert tool.sizes[0] == 1
+        assert tool.sizes[2] == 1
+        assert sum(tool.latency) == 2
+        assert tool.max_ns > 0
+        assert inspect.signature(wrapped) == inspect.signature(root)
+        assert wrapped.__doc__ == root.__doc__
+
+    @pytest.mark.asyncio
+    async def test_wrap_async(self):
+        """Test that calls of a coroutine function are counted."""
+
+        async def double(x: float) -> float:
+            return x * 2
+
+        stats = ServerStats()
+        wrapped = stats.wrap("double", double)
+
+        assert inspect.iscoroutinefunction(wrapped)
+        assert await wrapped(x=2.0) == 4.0
+        assert stats.tools["double"].calls == 1
+
+    def test_latency_cap(self, monkeypatch):
+        """Test that calls slower than the last bucket are counted in it."""
+        ticks = iter([0, 1 << 60])
+        monkeypatch.setattr(stats_module.time, "perf_counter_ns", lambda: next(ticks))
+        stats = ServerStats()
+
+        stats.wrap("slow", lambda: None)()
+        assert stats.tools["slow"].latency[LATENCY_BUCKETS - 1] == 1
+
+    def test_snapshot_skips_uncalled_tools(self):
+        """Test that snapshots only hold the tools called so far."""
+        stats = ServerStats()
+        stats.wrap("a", lambda: None)()
+        stats.wrap("b", lambda: None)
+
+        assert list(stats.snapshot()["tools"]) == ["a"]
+
+    def test_dump(self, tmp_path):
+        """Test that dumps append a STATS JSON line."""
+        stats = ServerStats()
+        stats.wrap("a", lambda: None)()
+        path = tmp_path / "server.log"
+
+        stats.dump(str(path), "test")
+        stats.dump(str(path), "test")
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith("STATS ")
+        record = json.loads(lines[0].removeprefix("STATS "))
+        assert record["server"] == "test"
+        assert record["tools"]["a"]["calls"] == 1
+
+
+class TestMcpFromModuleStats:
+    """Test call stats of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    async def test_stats_tool(self):
+        """Test that the server_stats tool reports the calls of the other tools."""
+        mcp = mcp_from_module("test", "1.0.0", "", [discrete], cache_size=16, stats_tool=True)
+
+        await call_tool(mcp, "combination", {"n": 10, "k": 3})
+        await call_tool(mcp, "combination", {"n": 10, "k": 3})
+        result = await call_tool(mcp, "factorial", {"x": -1})
+        assert result["isError"]
+
+        report = (await call_tool(mcp, STATS_TOOL_NAME, {}))["structuredContent"]
+        # Cache hits are counted, as calls of the tool
+        assert report["tools"]["combination"]["calls"] == 2
+        assert report["tools"]["factorial"]["errors"] == 1
+        assert report["result_cache"]["hits"] == 1
+
+    def test_stats_disabled(self):
+        """Test that stats can be disabled, along with the server_stats tool."""
+        mcp = mcp_from_module("test", "1.0.0", "", [discrete], stats=False)
+
+        assert mcp.stats is None
+        assert STATS_TOOL_NAME not in mcp.tool._tools
@@ -0,0 +1,123 @@
+"""Tests for minimcp_servers.core.transport module."""
+
+import json
+
+import anyio
+import pytest
+from minimcp import NoMessage
+
+from minimcp_servers.core.transport import bounded_lines, concurrent_transport
+
+
+async def _lines(*lines: str):
+    for line in lines:
+        yield line
+
+
+class TestConcurrentTransport:
+    """Test the concurrent stdio transport."""
+
+    @pytest.mark.asyncio
+    async def test_responses_are_written_as_they_complete(self):
+        """Test that a slow message does not hold up the ones after it."""
+        written = []
+
+        async def handler(message, send):
+            if message == "slow":
+                await anyio.sleep(0.05)
+            return f"done:{message}"
+
+        async def write_line(line):
+            written.append(line)
+
+        await concurrent_transport(handler, 4, _lines("slow\n", "fast\n"), write_line)
+
+        assert written == ["done:fast\n", "done:slow\n"]
+
+    @pytest.mark.asyncio
+    async def test_max_in_flight(self):
+        """Test that no more than max_in_flight messages are handled at a time."""
+        active = 0
+        peak = 0
+
+        async def handler(message, send):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await anyio.sleep(0.01)
+            active -= 1
+            return message
+
+        async def write_line(line):
+            pass
+
+        await concurrent_transport(handler, 2, _lines(*[f"{i}\n" for i in range(10)]), write_line)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_notifications_and_blank_lines(self):
+        """Test that blank lines are skipped and NoMessage responses are not written."""
+        handled = []
+        written = []
+
+        async def handler(message, send):
+            handled.append(message)
+            await send("progress")
+            return NoMessage.NOTIFICATION
+
+        async def write_line(line):
+            written.append(line)
+
+        await concurrent_transport(handler, 2, _lines("\n", "  \n", "note\n"), write_line)
+
+        assert handled == ["note"]
+        assert written == ["progress\n"]
+
+    @pytest.mark.asyncio
+    async def test_handler_errors(self):
+        """Test that a handler failing on a message gets an error response, and does not stop the others."""
+        written = []
+
+        async def handler(message, send):
+            if "bad" in message:
+                raise RuntimeError("boom")
+            await anyio.sleep(0.01)
+            return message
+
+        async def write_line(line):
+            written.append(line)
+
+        messages = ['{"id": 1, "method": "bad"}\n', '{"method": "bad"}\n', '{"id": 2, "method": "good"}\n']
+        await concurrent_transport(handler, 4, _lines(*messages), write_line)
+
+        assert len(written) == 2
+        error = json.loads(written[0])
+        assert error["id"] == 1
+        assert error["error"]["code"] == -32603
+        assert json.loads(written[1]) == {"id": 2, "method": "good"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_max_in_flight(self):
+        """Test that max_in_flight must be positive."""
+
+        async def handler(message, send):
+            return message
+
+        with pytest.raises(ValueError):
+            await concurrent_transport(handler, 0, _lines())
+
+
+class TestBoundedLines:
+    """Test bounded_lines function."""
+
+    @pytest.mark.asyncio
+    async def test_long_lines_are_cut(self, tmp_path):
+        """Test that lines over max_chars are cut, and the rest of them skipped."""
+        path = tmp_path / "stdin"
+        path.write_text("short\n" + "x" * 100 + "\n" + "end")
+
+        with open(path) as f:
+            lines = [line async for line in bounded_lines(anyio.wrap_file(f), 10)]
+
+        assert lines == ["short\n", "x" * 11, "end"]
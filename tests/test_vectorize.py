@@ -0,0 +1,87 @@
+"""Tests for minimcp_servers.core.vectorize module."""
+
+import inspect
+
+import pytest
+
+from minimcp_servers.core.admission import DEFAULT_LANE, FAST_LANE
+from minimcp_servers.core.builder import mcp_from_module
+from minimcp_servers.core.manifest import manifest_fingerprint
+from minimcp_servers.core.vectorize import is_unary_scalar, many_tool
+from minimcp_servers.modules.math import arithmetic, continuous
+from tests.helpers import call_tool
+
+
+class TestIsUnaryScalar:
+    """Test is_unary_scalar function."""
+
+    def test_is_unary_scalar(self):
+        """Test that only functions of a single float returning a float or an integer are unary scalar."""
+        assert is_unary_scalar(continuous.sin)
+        assert is_unary_scalar(arithmetic.ceil)
+        assert not is_unary_scalar(continuous.atan2)
+        assert not is_unary_scalar(continuous.log)
+        assert not is_unary_scalar(arithmetic.frexp)
+        assert not is_unary_scalar(arithmetic.add)
+        assert not is_unary_scalar(len)
+
+
+class TestManyTool:
+    """Test many_tool function."""
+
+    def test_many_tool(self):
+        """Test that the twin applies the function to each element, with its own signature and docstring."""
+        sin_many = many_tool(continuous.sin)
+
+        assert sin_many(xs=[0.0, 1.0]) == [continuous.sin(0.0), continuous.sin(1.0)]
+        assert sin_many(xs=[]) == []
+        assert sin_many.__name__ == "sin_many"
+        assert str(inspect.signature(sin_many)) == "(xs: list[float]) -> list[float]"
+        assert str(inspect.signature(many_tool(arithmetic.ceil))) == "(xs: list[float]) -> list[int]"
+        assert sin_many.__doc__ is not None and "sine of x" in sin_many.__doc__
+
+    def test_errors(self):
+        """Test that the first failing element raises."""
+        with pytest.raises(ValueError):
+            many_tool(continuous.log10)(xs=[10.0, -1.0])
+
+
+class TestMcpFromModuleManyTools:
+    """Test the twins of the tools of mcp_from_module."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_manifest", [True, False])
+    async def test_many_tools(self, use_manifest):
+        """Test that unary scalar tools get a twin, and others do not."""
+        mcp = mcp_from_module(
+            "continuous-math-utils", "1.0.0", "", [continuous], many_tools=True, use_manifest=use_manifest
+        )
+        assert mcp.admission is not None
+
+        result = await call_tool(mcp, "erf_many", {"xs": [0, 0.5, 1]})
+        assert result["structuredContent"] == {"result": [continuous.erf(0), continuous.erf(0.5), continuous.erf(1)]}
+        assert (await call_tool(mcp, "log10_many", {"xs": [10, -1]}))["isError"] is True
+
+        assert "sin_many" in mcp.tool._tools
+        assert "atan2_many" not in mcp.tool._tools
+        assert mcp.admission.lane("sin") == FAST_LANE
+        assert mcp.admission.lane("sin_many") == DEFAULT_LANE
+
+    def test_function_settings(self):
+        """Test that offload policies and lanes set by function name do not apply to the twins."""
+        mcp = mcp_from_module(
+            "test", "1.0.0", "", [arithmetic], many_tools=True, offload={"ceil": "process"}, lanes={"ceil": FAST_LANE}
+        )
+        assert mcp.admission is not None
+
+        assert mcp.admission.lane("ceil") == FAST_LANE
+        assert mcp.admission.lane("ceil_many") == DEFAULT_LANE
+
+    def test_many_tools_disabled(self, monkeypatch):
+        """Test that twins are not registered by default, and have manifests of their own."""
+        monkeypatch.delenv("MCP_SERVER_MANY_TOOLS", raising=False)
+
+        assert "sin_many" not in mcp_from_module("test", "1.0.0", "", [continuous]).tool._tools
+        assert manifest_fingerprint([continuous.__name__], False) != manifest_fingerprint(
+            [continuous.__name__], False, many=True
+        )